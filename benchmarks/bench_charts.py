@@ -0,0 +1,34 @@
+import pytest
+
+from conftest import ROWS
+from streamlit_data_viz_helper.visualization import (
+    create_bar_chart,
+    create_histogram,
+    create_line_chart,
+    create_scatter_plot,
+)
+
+@pytest.mark.parametrize("rows", ROWS)
+def bench_create_scatter_plot(run, datasets, rows):
+    df = datasets.long(rows)
+    run(create_scatter_plot, df, x="Count", y="Value", legend="City", max_points=10_000, rounds=3)
+
+@pytest.mark.parametrize("rows", ROWS)
+def bench_create_line_chart(run, datasets, rows):
+    df = datasets.long(rows)
+    run(create_line_chart, df, x="Count", y="Value", max_points=2_000, rounds=3)
+
+@pytest.mark.parametrize("rows", ROWS)
+def bench_create_bar_chart(run, datasets, rows):
+    df = datasets.long(rows)
+    run(create_bar_chart, df, x="City", y="Value", legend="Category", aggregate='sum', rounds=3)
+
+@pytest.mark.parametrize("rows", ROWS)
+def bench_create_histogram(run, datasets, rows):
+    df = datasets.long(rows)
+    run(create_histogram, df, x="Value", aggregate=True, rounds=3)
+
+@pytest.mark.parametrize("rows", ROWS)
+def bench_serialize_scatter_plot(run, datasets, rows):
+    fig = create_scatter_plot(datasets.long(rows), x="Count", y="Value", legend="City", max_points=10_000)
+    run(fig.to_json, rounds=3)
@@ -0,0 +1,24 @@
+from unittest import mock
+
+import pytest
+
+from conftest import ROWS
+from streamlit_data_viz_helper.export import dataframe_to_csv_bytes
+from streamlit_data_viz_helper.streamlit_helpers import download_csv_jis
+
+@pytest.mark.parametrize("rows", ROWS)
+@pytest.mark.parametrize("compression", [None, "gzip"])
+def bench_dataframe_to_csv_bytes(run, datasets, rows, compression):
+    run(dataframe_to_csv_bytes, datasets.long(rows), compression=compression, use_cache=False, rounds=3)
+
+def _download(df):
+    # Render the button headless, then click it by calling the data callable
+    with mock.patch("streamlit.download_button") as button:
+        download_csv_jis(df, "export")
+        return button.call_args.kwargs["data"]()
+
+@pytest.mark.parametrize("rows", ROWS)
+def bench_download_csv_jis(run, datasets, rows):
+    df = datasets.long(rows)
+    with mock.patch("streamlit_data_viz_helper.streamlit_helpers.dataframe_to_csv_bytes", side_effect=lambda *args, **kwargs: dataframe_to_csv_bytes(*args, **{**kwargs, "use_cache": False})):
+        run(_download, df, rounds=3)
@@ -0,0 +1,102 @@
+import time
+
+import pandas as pd
+import pytest
+
+from conftest import ROWS
+from streamlit_data_viz_helper.filtering import (
+    FilterSpec,
+    apply_filter_spec,
+    clear_profile_cache,
+    coerce_datetimes,
+    index_dataframe,
+    profile_dataframe,
+)
+
+# Distinct values of the high-cardinality column
+CARDINALITIES = (100, 10_000, 100_000)
+
+def _profile_uncached(df):
+    clear_profile_cache()
+    return profile_dataframe(df)
+
+def _elapsed(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+def _filter_spec():
+    return (
+        FilterSpec()
+        .isin("City", ["東京都", "大阪府"])
+        .between("Value", 90, 110)
+        .between("Date", pd.Timestamp("2024-01-02"), pd.Timestamp("2024-01-20"))
+    )
+
+@pytest.mark.parametrize("rows", ROWS)
+def bench_profile_dataframe(run, datasets, rows):
+    run(_profile_uncached, datasets.long(rows), rounds=3)
+
+@pytest.mark.parametrize("rows", ROWS)
+def bench_profile_dataframe_warm(run, datasets, rows):
+    # A fresh object, so the cold call also pays for hashing the content
+    df = datasets.long(rows).copy()
+    clear_profile_cache()
+    cold = _elapsed(profile_dataframe, df)
+
+    run(profile_dataframe, df)
+    warm = min(_elapsed(profile_dataframe, df) for _ in range(5))
+    # A rerun with the same frame must not read its rows again
+    assert warm * 10 < cold
+
+@pytest.mark.parametrize("rows", ROWS)
+def bench_apply_filter_spec(run, datasets, rows):
+    df = coerce_datetimes(datasets.long(rows))
+    run(apply_filter_spec, df, _filter_spec())
+
+@pytest.mark.parametrize("rows", ROWS)
+def bench_apply_filter_spec_indexed(run, datasets, rows):
+    df = datasets.long(rows)
+    index = index_dataframe(df)
+    run(apply_filter_spec, df, _filter_spec(), index=index)
+
+@pytest.mark.parametrize("cardinality", CARDINALITIES)
+def bench_high_cardinality_filter(run, datasets, cardinality):
+    df = datasets.high_cardinality(ROWS[-1], cardinality)
+    keys = list(df["Key"].unique()[:50])
+    index = index_dataframe(df)
+    run(apply_filter_spec, df, FilterSpec().isin("Key", keys), index=index)
+
+@pytest.mark.parametrize("cardinality", CARDINALITIES)
+def bench_contains_filter(run, datasets, cardinality):
+    df = datasets.high_cardinality(ROWS[-1], cardinality)
+    run(apply_filter_spec, df, FilterSpec().contains("Key", "key-00012"))
+
+@pytest.mark.parametrize("cardinality", CARDINALITIES)
+def bench_contains_filter_indexed(run, datasets, cardinality):
+    df = datasets.high_cardinality(ROWS[-1], cardinality)
+    index = index_dataframe(df)
+    index.column(df, "Key")
+    run(apply_filter_spec, df, FilterSpec().contains("Key", "key-00012"), index=index)
+
+def _filter_app(path):
+    import pandas as pd
+    import streamlit as st
+    from streamlit_data_viz_helper.streamlit_helpers import filter_dataframe
+
+    st.session_state["result"] = filter_dataframe(pd.read_pickle(path))
+
+def _run_filter_app(path):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_function(_filter_app, kwargs={"path": path}, default_timeout=60).run()
+    at.checkbox[0].check().run()
+    at.multiselect[0].select("City").select("Value").run()
+    at.multiselect[1].unselect("東京都").run()
+    return at.session_state["result"]
+
+@pytest.mark.parametrize("rows", ROWS[:1])
+def bench_filter_dataframe_app(run, datasets, tmp_path, rows):
+    path = tmp_path / "frame.pkl"
+    datasets.long(rows).to_pickle(path)
+    run(_run_filter_app, str(path), rounds=3)
@@ -0,0 +1,34 @@
+import pytest
+
+from conftest import ROWS
+from streamlit_data_viz_helper.data_processing import load_all_files_in_folder, load_csv_to_dataframe
+
+# Number of files the mixed-encoding folder is split into
+FOLDER_FILES = 8
+
+@pytest.mark.parametrize("rows", ROWS)
+def bench_load_long_csv(run, datasets, rows):
+    path = datasets.csv('long', rows)
+    run(load_csv_to_dataframe, path, rounds=3)
+
+@pytest.mark.parametrize("rows", ROWS)
+def bench_load_wide_csv(run, datasets, rows):
+    path = datasets.csv('wide', rows // 10)
+    run(load_csv_to_dataframe, path, rounds=3)
+
+@pytest.mark.parametrize("rows", ROWS)
+def bench_load_wide_csv_columns_and_where(run, datasets, rows):
+    path = datasets.csv('wide', rows // 10)
+    columns = ["Date", "label_0", "metric_1", "metric_2", "metric_3", "metric_4"]
+    run(load_csv_to_dataframe, path, columns=columns, where={"label_0": ["食品", "家電"]}, rounds=3)
+
+@pytest.mark.parametrize("rows", ROWS)
+@pytest.mark.parametrize("max_workers", [None, 4])
+def bench_load_mixed_encoding_folder(run, datasets, rows, max_workers):
+    folder = datasets.mixed_encoding_folder(FOLDER_FILES, rows // FOLDER_FILES)
+    run(load_all_files_in_folder, folder, file_types=('csv',), encodings=['utf-8', 'cp932'], max_workers=max_workers, rounds=3)
+
+@pytest.mark.parametrize("rows", ROWS)
+def bench_load_mixed_encoding_folder_with_schema(run, datasets, rows):
+    folder = datasets.mixed_encoding_folder(FOLDER_FILES, rows // FOLDER_FILES)
+    run(load_all_files_in_folder, folder, file_types=('csv',), encodings=['utf-8', 'cp932'], schema='infer', source_column="Source", rounds=3)
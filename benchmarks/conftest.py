@@ -0,0 +1,99 @@
+"""
+Shared fixtures for the benchmark suite.
+
+Run it with pytest-benchmark installed::
+
+    pytest benchmarks
+    BENCH_SCALE=large pytest benchmarks --benchmark-json=results.json
+
+Each benchmark also records the peak Python heap usage of one extra call, measured with
+tracemalloc, in ``extra_info['peak_memory_mb']``. It is printed after the timing table.
+"""
+import os
+import sys
+import tracemalloc
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+sys.path.insert(0, os.path.dirname(__file__))
+
+import synthetic  # noqa: E402
+
+# Row counts benchmarked at each BENCH_SCALE
+SCALES = {
+    'small': (10_000, 100_000),
+    'large': (10_000, 100_000, 1_000_000),
+}
+ROWS = SCALES[os.environ.get('BENCH_SCALE', 'small')]
+
+_peak_memory = {}
+
+class Datasets:
+    """Synthetic frames and files, generated once per session and reused across benchmarks."""
+
+    def __init__(self, tmp_path_factory):
+        self._tmp_path_factory = tmp_path_factory
+        self._cache = {}
+
+    def _memoize(self, key, build):
+        if key not in self._cache:
+            self._cache[key] = build()
+        return self._cache[key]
+
+    def long(self, rows):
+        return self._memoize(('long', rows), lambda: synthetic.long_frame(rows))
+
+    def wide(self, rows):
+        return self._memoize(('wide', rows), lambda: synthetic.wide_frame(rows))
+
+    def high_cardinality(self, rows, cardinality):
+        return self._memoize(('high_cardinality', rows, cardinality), lambda: synthetic.high_cardinality_frame(rows, cardinality))
+
+    def csv(self, kind, rows):
+        def build():
+            path = self._tmp_path_factory.mktemp(f"{kind}_{rows}") / f"{kind}.csv"
+            getattr(self, kind)(rows).to_csv(path, index=False)
+            return str(path)
+        return self._memoize(('csv', kind, rows), build)
+
+    def mixed_encoding_folder(self, files, rows):
+        def build():
+            folder = self._tmp_path_factory.mktemp(f"mixed_{files}x{rows}")
+            return synthetic.make_mixed_encoding_folder(str(folder), files, rows)
+        return self._memoize(('folder', files, rows), build)
+
+@pytest.fixture(scope='session')
+def datasets(tmp_path_factory):
+    return Datasets(tmp_path_factory)
+
+@pytest.fixture
+def run(benchmark, request):
+    """
+    Benchmark ``func(*args, **kwargs)`` and record its peak memory.
+
+    Slow targets can pass ``rounds`` to run a fixed number of single-call rounds instead of
+    letting pytest-benchmark calibrate.
+    """
+    def run(func, *args, rounds=None, **kwargs):
+        tracemalloc.start()
+        try:
+            func(*args, **kwargs)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        benchmark.extra_info['peak_memory_mb'] = round(peak / 1024 ** 2, 2)
+        _peak_memory[request.node.nodeid] = peak
+
+        if rounds is None:
+            return benchmark(func, *args, **kwargs)
+        return benchmark.pedantic(func, args=args, kwargs=kwargs, rounds=rounds, iterations=1)
+    return run
+
+def pytest_terminal_summary(terminalreporter):
+    if not _peak_memory:
+        return
+    terminalreporter.section("peak memory (tracemalloc)")
+    width = max(len(nodeid) for nodeid in _peak_memory)
+    for nodeid, peak in sorted(_peak_memory.items()):
+        terminalreporter.write_line(f"{nodeid:<{width}}  {peak / 1024 ** 2:10.2f} MiB")
@@ -0,0 +1,51 @@
+"""
+Compare SVG and WebGL traces for create_scatter_plot and create_line_chart.
+
+For each row count the script reports the time to build the figure and the size of its
+serialized JSON, which is what Streamlit sends to the browser.
+
+Usage:
+    python benchmarks/render_mode.py [ROWS ...]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from streamlit_data_viz_helper.visualization import create_line_chart, create_scatter_plot
+
+DEFAULT_ROWS = (10_000, 100_000, 1_000_000)
+
+def make_dataframe(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "x": np.arange(rows),
+        "y": rng.normal(size=rows).cumsum(),
+        "category": rng.choice(["A", "B", "C"], size=rows),
+    })
+
+def measure(builder, df, render_mode):
+    start = time.perf_counter()
+    fig = builder(df, x="x", y="y", legend="category", render_mode=render_mode)
+    build_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    payload = fig.to_json()
+    serialize_seconds = time.perf_counter() - start
+    return fig.data[0].type, build_seconds, serialize_seconds, len(payload)
+
+def main(row_counts):
+    print(f"{'chart':<8} {'rows':>10} {'trace':<10} {'build [s]':>10} {'to_json [s]':>12} {'json [MB]':>10}")
+    for rows in row_counts:
+        df = make_dataframe(rows)
+        for name, builder in (("scatter", create_scatter_plot), ("line", create_line_chart)):
+            for render_mode in ("svg", "webgl"):
+                trace, build_seconds, serialize_seconds, size = measure(builder, df, render_mode)
+                print(f"{name:<8} {rows:>10,} {trace:<10} {build_seconds:>10.3f} {serialize_seconds:>12.3f} {size / 1e6:>10.2f}")
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_ROWS)
@@ -0,0 +1,62 @@
+"""
+Deterministic synthetic datasets for the benchmarks.
+
+Every generator takes a row count and a seed, so the same call always produces the same data.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+CITIES = ["東京都", "大阪府", "愛知県", "北海道", "福岡県", "京都府", "神奈川県", "兵庫県"]
+CATEGORIES = ["食品", "衣料", "家電", "書籍", "玩具"]
+
+# Encodings rotated through by make_mixed_encoding_folder
+FOLDER_ENCODINGS = ("utf-8", "cp932", "utf_8_sig")
+
+def long_frame(rows, seed=0):
+    """A narrow, tall frame: dates, low-cardinality text, numbers and a unique id."""
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "Date": pd.date_range("2024-01-01", periods=rows, freq="min").strftime("%Y-%m-%d %H:%M"),
+        "City": rng.choice(CITIES, rows),
+        "Category": rng.choice(CATEGORIES, rows),
+        "Value": rng.normal(100, 15, rows).round(2),
+        "Count": rng.integers(0, 1000, rows),
+        "Id": [f"ID{i:08d}" for i in range(rows)],
+    })
+
+def wide_frame(rows, columns=120, seed=0):
+    """A frame with ``columns`` columns, mostly numeric, like a dashboard export."""
+    rng = np.random.default_rng(seed)
+    data = {"Date": pd.date_range("2024-01-01", periods=rows, freq="min").strftime("%Y-%m-%d %H:%M")}
+    for i in range(columns - 1):
+        if i % 10 == 0:
+            data[f"label_{i}"] = rng.choice(CATEGORIES, rows)
+        else:
+            data[f"metric_{i}"] = rng.normal(size=rows).round(4)
+    return pd.DataFrame(data)
+
+def high_cardinality_frame(rows, cardinality, seed=0):
+    """A frame whose ``Key`` column has ``cardinality`` distinct values."""
+    rng = np.random.default_rng(seed)
+    keys = np.array([f"key-{i:07d}" for i in range(cardinality)], dtype=object)
+    return pd.DataFrame({
+        "Key": keys[rng.integers(0, cardinality, rows)],
+        "Value": rng.normal(size=rows),
+        "Flag": rng.integers(0, 2, rows).astype(bool),
+    })
+
+def make_mixed_encoding_folder(folder_path, files, rows, seed=0):
+    """
+    Write ``files`` CSV files of ``rows`` rows each, rotating through FOLDER_ENCODINGS.
+
+    Returns:
+        str: ``folder_path``.
+    """
+    os.makedirs(folder_path, exist_ok=True)
+    for i in range(files):
+        encoding = FOLDER_ENCODINGS[i % len(FOLDER_ENCODINGS)]
+        df = long_frame(rows, seed=seed + i)
+        df.to_csv(os.path.join(folder_path, f"part_{i:03d}.csv"), index=False, encoding=encoding)
+    return folder_path
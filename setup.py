@@ -14,9 +14,13 @@ setup(
     author="Your Name",
     packages=find_packages(),
     install_requires=[
-        "streamlit",
-        "pandas",
+        "streamlit>=1.50",
+        "pandas>=3.0",
         "plotly",
         "chardet"
     ],
+    extras_require={
+        "cache": ["pyarrow"],
+        "duckdb": ["duckdb"],
+    },
 )
@@ -1 +1,32 @@
-__version__ = "0.1.3"
\ No newline at end of file
+import importlib
+
+__version__ = "0.1.3"
+
+# Submodules are imported on first attribute access, so importing the package stays cheap
+_SUBMODULES = (
+    'background',
+    'cache',
+    'config',
+    'data_processing',
+    'dataset',
+    'downsampling',
+    'dtypes',
+    'encoding',
+    'export',
+    'filtering',
+    'instrumentation',
+    'registry',
+    'schema',
+    'sketches',
+    'streamlit_helpers',
+    'utils',
+    'visualization',
+)
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(list(globals()) + list(_SUBMODULES))
@@ -0,0 +1,385 @@
+import os
+import json
+import time
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+from functools import partial
+
+import pandas as pd
+
+from .config import BACKGROUND_JOBS_KEPT, BACKGROUND_WORKERS, CHUNKSIZE, ENCODING_SAMPLE_SIZE
+from .data_processing import (
+    EXECUTORS,
+    _combine_results,
+    _find_files,
+    _folder_read_options,
+    _load_file,
+    _optimize,
+    _read_columns,
+    _select,
+)
+from .encoding import read_with_fallback, resolve_encoding
+from .filtering import FilterSpec, build_mask
+
+logger = logging.getLogger(__name__)
+
+# Jobs by request key, shared by every session of the process; finished ones are kept in LRU order
+_jobs = OrderedDict()
+_jobs_lock = threading.Lock()
+_pool = None
+
+def _executor():
+    global _pool
+    if _pool is None:
+        _pool = ThreadPoolExecutor(max_workers=BACKGROUND_WORKERS, thread_name_prefix='streamlit_data_viz_helper_load')
+    return _pool
+
+class LoadJob:
+    """
+    A folder or CSV load running in a background thread.
+
+    Jobs are created by :func:`start_folder_load` and :func:`start_csv_load` and are shared by
+    everyone who requests the same load, so read-only access is safe from any thread.
+
+    Attributes:
+        key (str): The request key identical loads are deduplicated on.
+        kind (str): 'folder' or 'csv'.
+        path (str): The folder or file being loaded.
+        status (str): 'running', 'done', 'failed' or 'cancelled'.
+        files_total (int): Number of files to load.
+        files_done (int): Number of files loaded or failed so far.
+        bytes_total (int): Size of the files to load.
+        bytes_done (int): Bytes read so far.
+        errors (list of FileLoadResult): The files that failed to load.
+        error (str or None): The error message if the whole job failed.
+        started_at (float): When the job started, as ``time.time()``.
+        finished_at (float or None): When the job finished.
+    """
+
+    def __init__(self, key, kind, path):
+        self.key = key
+        self.kind = kind
+        self.path = path
+        self.status = 'running'
+        self.files_total = 0
+        self.files_done = 0
+        self.bytes_total = 0
+        self.bytes_done = 0
+        self.errors = []
+        self.error = None
+        self.started_at = time.time()
+        self.finished_at = None
+        self._parts = []
+        self._combine = None
+        self._partial = (0, None)
+        self._result = None
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+        self._future = None
+
+    @property
+    def done(self):
+        """bool: True once the job is no longer running."""
+        return self.status != 'running'
+
+    @property
+    def progress(self):
+        """float: The fraction of the work done, between 0 and 1, for ``st.progress``."""
+        if self.status == 'done':
+            return 1.0
+        if self.bytes_total:
+            return min(self.bytes_done / self.bytes_total, 1.0)
+        if self.files_total:
+            return self.files_done / self.files_total
+        return 0.0
+
+    def describe(self):
+        """
+        Summarize the progress for display, e.g. '3/10 files, 1.2 of 4.0 MB'.
+
+        Returns:
+            str: The description.
+        """
+        parts = []
+        if self.kind == 'folder':
+            parts.append(f"{self.files_done}/{self.files_total} files")
+        if self.bytes_total:
+            parts.append(f"{self.bytes_done / 1024 ** 2:.1f} of {self.bytes_total / 1024 ** 2:.1f} MB")
+        if self.errors:
+            parts.append(f"{len(self.errors)} failed")
+        if self.status != 'running':
+            parts.append(self.status)
+        return ", ".join(parts)
+
+    def partial(self):
+        """
+        Return the rows loaded so far.
+
+        The parts are combined once per new file or chunk, so polling this from every rerun is cheap.
+
+        Returns:
+            pd.DataFrame or None: The rows loaded so far, or None before the first file or chunk.
+        """
+        if self.status == 'done':
+            return self._result
+        with self._lock:
+            parts = list(self._parts)
+            count, df = self._partial
+        if not parts:
+            return None
+        if len(parts) == count:
+            return df
+        df = self._combine(parts)
+        with self._lock:
+            if len(parts) > self._partial[0]:
+                self._partial = (len(parts), df)
+        return df
+
+    def result(self, timeout=None):
+        """
+        Wait for the job and return the loaded DataFrame.
+
+        Args:
+            timeout (float, optional): Seconds to wait. None waits until the job finishes (default is None).
+
+        Returns:
+            pd.DataFrame: The loaded DataFrame.
+        """
+        return self._future.result(timeout=timeout)
+
+    def cancel(self):
+        """
+        Ask the job to stop after the current file or chunk.
+
+        A cancelled job is not reused; the next identical request starts a new one.
+        """
+        self._cancelled.set()
+        if self._future.cancel():
+            self._finish('cancelled')
+
+    def __await__(self):
+        import asyncio
+
+        return asyncio.wrap_future(self._future).__await__()
+
+    def __repr__(self):
+        return f"<LoadJob {self.kind} {self.path!r} {self.status}: {self.describe()}>"
+
+    def _add(self, part, nbytes=0):
+        with self._lock:
+            self._parts.append(part)
+            self.bytes_done += nbytes
+
+    def _check_cancelled(self):
+        if self._cancelled.is_set():
+            raise CancelledError()
+
+    def _finish(self, status, error=None, result=None):
+        self.error = error
+        self._result = result
+        self.finished_at = time.time()
+        if status == 'done':
+            with self._lock:
+                # The result holds the data now
+                self._parts = []
+                self._partial = (0, None)
+        self.status = status
+
+def _job_key(kind, path, files, options):
+    # Files are identified by size and mtime, so a changed folder or file starts a new load
+    signature = [(os.path.relpath(file_path, path) if kind == 'folder' else '', os.path.getsize(file_path), os.path.getmtime(file_path)) for file_path in files]
+    return json.dumps([kind, os.path.abspath(path), signature, options], sort_keys=True, default=repr)
+
+def _run(job, work):
+    try:
+        df = work(job)
+    except CancelledError:
+        job._finish('cancelled')
+        raise
+    except Exception as e:
+        logger.warning(f"Background load of {job.path} failed: {e}")
+        job._finish('failed', error=str(e))
+        raise
+    job._finish('done', result=df)
+    return df
+
+def _start(kind, path, files, options, work):
+    key = _job_key(kind, path, files, options)
+    with _jobs_lock:
+        job = _jobs.get(key)
+        if job is not None and job.status in ('running', 'done'):
+            _jobs.move_to_end(key)
+            return job
+
+        job = LoadJob(key, kind, path)
+        job._future = _executor().submit(_run, job, work)
+        _jobs[key] = job
+        # Running jobs are never evicted, only the least recently requested finished ones
+        finished = [old_key for old_key, old_job in _jobs.items() if old_job.done]
+        for old_key in finished[:max(0, len(finished) - BACKGROUND_JOBS_KEPT)]:
+            del _jobs[old_key]
+        return job
+
+def _load_folder(job, folder_path, file_paths, max_workers, executor, source_column, optimize, read_options):
+    sizes = [os.path.getsize(file_path) for file_path in file_paths]
+    job.files_total = len(file_paths)
+    job.bytes_total = sum(sizes)
+    job._combine = partial(_combine_results, folder_path=folder_path, source_column=source_column)
+
+    options = _folder_read_options(file_paths, **read_options)
+    pool = None
+    if max_workers is not None and max_workers > 1 and len(file_paths) > 1:
+        # map() yields in submission order, so partial results grow file by file
+        pool = EXECUTORS[executor](max_workers=max_workers)
+        results = pool.map(partial(_load_file, **options), file_paths)
+    else:
+        results = (_load_file(file_path, **options) for file_path in file_paths)
+
+    loaded = []
+    try:
+        for result, size in zip(results, sizes):
+            job._check_cancelled()
+            loaded.append(result)
+            if result.ok:
+                job._add(result, size)
+            else:
+                logger.warning(result.error)
+                job.errors.append(result)
+                with job._lock:
+                    job.bytes_done += size
+            job.files_done += 1
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+    return _combine_results(loaded, folder_path, source_column=source_column, optimize=optimize)
+
+def start_folder_load(folder_path, file_types=('csv', 'xlsx'), include_subfolders=False, max_workers=None, executor='thread', optimize=False, source_column=None, **read_options):
+    """
+    Start loading a folder like :func:`~streamlit_data_viz_helper.data_processing.load_all_files_in_folder`
+    in a background thread, and return at once.
+
+    Identical requests, from any session, share one job while it runs and reuse its result
+    afterwards, until the files change. Files are loaded in sorted order, so :meth:`LoadJob.partial`
+    returns the first files while the rest are loading.
+
+    Example:
+        >>> job = start_folder_load("data", schema="infer")
+        >>> df = show_load_progress(job)
+
+    Args:
+        folder_path (str): The path to the folder containing the files.
+        file_types (tuple): Tuple of file extensions to include (default is ('csv', 'xlsx')).
+        include_subfolders (bool): Whether to include files in subfolders (default is False).
+        max_workers (int, optional): Number of parallel workers used by the job. None or 1 loads files
+            one after another (default is None).
+        executor (str): 'thread' or 'process' (default is 'thread').
+        optimize (bool): Whether to compact the dtypes of the final DataFrame (default is False).
+        source_column (str, optional): Name of a categorical column recording the file of each row (default is None).
+        **read_options: Other keyword arguments of ``load_all_files_in_folder``, such as
+            ``encoding``, ``schema``, ``columns`` or ``where``.
+
+    Returns:
+        LoadJob: The running or finished job.
+    """
+    if executor not in EXECUTORS:
+        raise ValueError(f"executor must be one of {list(EXECUTORS)}, got {executor!r}")
+
+    file_paths = _find_files(folder_path, file_types=file_types, include_subfolders=include_subfolders)
+    options = dict(read_options, optimize=optimize, source_column=source_column)
+    work = partial(_load_folder, folder_path=folder_path, file_paths=file_paths, max_workers=max_workers, executor=executor, source_column=source_column, optimize=optimize, read_options=read_options)
+    return _start('folder', folder_path, file_paths, options, work)
+
+def _concat_chunks(parts):
+    return pd.concat(parts)
+
+def _load_csv(job, file_path, encoding, sep, header, index_col, encodings, sample_size, chunksize, dtype, usecols, columns, where, optimize):
+    job.files_total = 1
+    job.bytes_total = os.path.getsize(file_path)
+    job._combine = _concat_chunks
+    spec = FilterSpec.from_dict(where) if where is not None else None
+    read_columns = _read_columns(columns, spec, index_col, usecols)
+
+    def read(encoding):
+        parts = []
+        with job._lock:
+            # A retry with another encoding starts over
+            job._parts = []
+            job._partial = (0, None)
+            job.bytes_done = 0
+        with open(file_path, 'rb') as handle:
+            with pd.read_csv(handle, encoding=encoding, sep=sep, header=header, index_col=index_col, dtype=dtype, usecols=read_columns, chunksize=chunksize) as reader:
+                for chunk in reader:
+                    job._check_cancelled()
+                    if spec is not None and len(spec):
+                        chunk = chunk[build_mask(chunk, spec)]
+                    chunk = _select(chunk, columns=columns)
+                    parts.append(chunk)
+                    with job._lock:
+                        job._parts.append(chunk)
+                        # The parser reads ahead in blocks, so this is the position of its last block
+                        job.bytes_done = handle.tell()
+        return parts
+
+    candidates = encodings or [encoding]
+    encoding = resolve_encoding(file_path, candidates, sample_size=sample_size)
+    # If a part past the sample fails to decode, the other candidates and the detected encoding are tried
+    parts = read_with_fallback(read, file_path, encoding, candidates, sample_size=sample_size)
+
+    job.files_done = 1
+    df = pd.concat(parts, ignore_index=index_col is None)
+    return _optimize(df) if optimize else df
+
+def start_csv_load(file_path, encoding='utf-8', sep=',', header='infer', index_col=None, encodings=None, sample_size=ENCODING_SAMPLE_SIZE, chunksize=CHUNKSIZE, optimize=False, dtype=None, usecols=None, columns=None, where=None):
+    """
+    Start loading a CSV file like :func:`~streamlit_data_viz_helper.data_processing.load_csv_to_dataframe`
+    in a background thread, and return at once.
+
+    The file is read in chunks of ``chunksize`` rows, so :meth:`LoadJob.partial` returns the rows read
+    so far and the progress follows the bytes read. Identical requests share one job, as with
+    :func:`start_folder_load`. If a late part of the file fails to decode, the file is read again
+    with the remaining candidate encodings or the detected encoding, and the partial rows start over.
+
+    Args:
+        file_path (str): The path to the CSV file.
+        encoding (str): The initial encoding to try (default is 'utf-8').
+        sep (str): The delimiter to use (default is ',').
+        header (int, list of int, or 'infer'): Row number(s) to use as column names (default is 'infer').
+        index_col (int, str, sequence of int/str, or False): Column(s) to set as index (default is None).
+        encodings (list of str, optional): Candidate encodings to try in order instead of ``encoding`` (default is None).
+        sample_size (int): Number of bytes sampled for encoding checks (default is config.ENCODING_SAMPLE_SIZE).
+        chunksize (int): Number of rows per chunk (default is config.CHUNKSIZE).
+        optimize (bool): Whether to compact the dtypes of the final DataFrame (default is False).
+        dtype (type name or dict, optional): Data type(s) to parse the columns as (default is None).
+        usecols (list, optional): The columns to read (default is None).
+        columns (list of str, optional): The columns to return, see ``load_csv_to_dataframe`` (default is None).
+        where (dict or FilterSpec, optional): Row filter applied to each chunk (default is None).
+
+    Returns:
+        LoadJob: The running or finished job.
+    """
+    options = dict(encoding=encoding, sep=sep, header=header, index_col=index_col, encodings=encodings, sample_size=sample_size, chunksize=chunksize, optimize=optimize, dtype=dtype, usecols=usecols, columns=columns, where=where)
+    work = partial(_load_csv, file_path=file_path, **options)
+    return _start('csv', file_path, [file_path], options, work)
+
+def list_jobs():
+    """
+    Return the running and kept background loads, least recently requested first.
+
+    Returns:
+        list of LoadJob: The jobs.
+    """
+    with _jobs_lock:
+        return list(_jobs.values())
+
+def clear_jobs():
+    """
+    Cancel the running background loads and forget every job.
+    """
+    with _jobs_lock:
+        jobs = list(_jobs.values())
+        _jobs.clear()
+    for job in jobs:
+        if not job.done:
+            job.cancel()
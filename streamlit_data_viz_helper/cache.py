@@ -0,0 +1,207 @@
+import os
+import json
+import uuid
+import hashlib
+import logging
+import threading
+
+from .config import CACHE_DIR, CACHE_MAX_BYTES
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ('parquet', 'feather')
+
+class FileCache:
+    """
+    An on-disk columnar cache for parsed CSV and Excel files.
+
+    Each parsed file is stored as a Parquet or Feather file keyed by the source file's absolute
+    path, size and modification time plus the options used to read it, so editing the source
+    file or changing the read options never returns stale data. Cached files are read back
+    memory-mapped. When the cache grows beyond ``max_bytes``, the least recently used entries
+    are evicted.
+
+    Pass an instance as the ``cache`` argument of the loaders in ``data_processing``.
+
+    Args:
+        cache_dir (str): Directory holding the cached files (default is config.CACHE_DIR).
+        max_bytes (int): Maximum total size of the cache in bytes (default is config.CACHE_MAX_BYTES).
+        format (str): 'parquet' or 'feather' (default is 'parquet').
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES, format='parquet'):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise ImportError("FileCache requires pyarrow. Install it with `pip install pyarrow`.")
+        if format not in FORMATS:
+            raise ValueError(f"format must be one of {FORMATS}, got {format!r}")
+
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.format = format
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def __getstate__(self):
+        # Locks cannot be pickled; process pools get their own
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _path_prefix(file_path):
+        return hashlib.sha1(os.path.abspath(file_path).encode()).hexdigest()[:16]
+
+    def _entry_path(self, file_path, options):
+        stat = os.stat(file_path)
+        payload = json.dumps([stat.st_size, stat.st_mtime_ns, options], sort_keys=True, default=str)
+        digest = hashlib.sha1(payload.encode()).hexdigest()
+        return os.path.join(self.cache_dir, f"{self._path_prefix(file_path)}-{digest}.{self.format}")
+
+    def _entries(self):
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and entry.name.endswith(f".{self.format}"):
+                yield entry
+
+    def _read_table(self, entry_path, columns=None, filters=None):
+        if self.format == 'feather':
+            import pyarrow.feather as feather
+            return feather.read_table(entry_path, columns=columns, memory_map=True)
+
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        try:
+            return pq.read_table(entry_path, columns=columns, filters=filters, memory_map=True, use_pandas_metadata=True)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError, TypeError) as e:
+            if filters is None:
+                raise
+            # e.g. a datetime bound compared with a text column; the caller filters the rows itself
+            logger.info(f"Reading {entry_path} without filters {filters}: {e}")
+            return pq.read_table(entry_path, columns=columns, memory_map=True, use_pandas_metadata=True)
+
+    def get(self, file_path, options, columns=None, filters=None):
+        """
+        Return the cached DataFrame for a file, or None on a cache miss.
+
+        ``columns`` and ``filters`` are pushed down into the Parquet reader, so only the selected
+        columns and the row groups that can match are read. Filters are a pre-selection: they are
+        skipped for Feather entries and when they do not apply to the stored types, so the caller
+        must still filter the returned rows.
+
+        Args:
+            file_path (str): The path to the source file.
+            options (dict): The options the file was read with.
+            columns (list of str, optional): The columns to read. None reads all of them (default is None).
+            filters (list of tuple, optional): Row filters in the ``pyarrow.parquet.read_table``
+                format, e.g. ``[('Age', '>=', 20)]`` (default is None).
+
+        Returns:
+            pd.DataFrame or None: The cached DataFrame.
+        """
+        try:
+            entry_path = self._entry_path(file_path, options)
+            table = self._read_table(entry_path, columns=columns, filters=filters)
+            # Mark the entry as recently used for LRU eviction
+            os.utime(entry_path)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable cache entry {entry_path}: {e}")
+            return None
+        return table.to_pandas()
+
+    def put(self, file_path, options, df):
+        """
+        Store the DataFrame parsed from a file, then evict old entries if the cache is too large.
+
+        DataFrames that cannot be converted to Arrow (e.g. object columns mixing numbers and
+        strings) are not cached.
+
+        Args:
+            file_path (str): The path to the source file.
+            options (dict): The options the file was read with.
+            df (pd.DataFrame): The parsed DataFrame.
+
+        Returns:
+            bool: True if the DataFrame was cached.
+        """
+        import pyarrow as pa
+
+        try:
+            table = pa.Table.from_pandas(df)
+        except (pa.ArrowException, TypeError, ValueError) as e:
+            logger.info(f"Not caching {file_path}: {e}")
+            return False
+
+        entry_path = self._entry_path(file_path, options)
+        # Write to a temporary file first so readers never see a partial entry
+        tmp_path = f"{entry_path}.{uuid.uuid4().hex}.tmp"
+        try:
+            if self.format == 'parquet':
+                import pyarrow.parquet as pq
+                pq.write_table(table, tmp_path)
+            else:
+                import pyarrow.feather as feather
+                feather.write_feather(table, tmp_path, compression='uncompressed')
+            os.replace(tmp_path, entry_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        self.evict()
+        return True
+
+    def evict(self):
+        """
+        Remove the least recently used entries until the cache fits in ``max_bytes``.
+        """
+        with self._lock:
+            entries = sorted(
+                ((entry.stat().st_mtime_ns, entry.stat().st_size, entry.path) for entry in self._entries()),
+            )
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+
+    def invalidate(self, file_path=None):
+        """
+        Remove cached entries.
+
+        Args:
+            file_path (str, optional): Remove only the entries of this source file.
+                None removes every entry (default is None).
+
+        Returns:
+            int: The number of removed entries.
+        """
+        prefix = None if file_path is None else self._path_prefix(file_path) + '-'
+        removed = 0
+        with self._lock:
+            for entry in list(self._entries()):
+                if prefix is None or entry.name.startswith(prefix):
+                    try:
+                        os.remove(entry.path)
+                        removed += 1
+                    except FileNotFoundError:
+                        pass
+        return removed
+
+    def size(self):
+        """
+        Return the total size of the cached entries in bytes.
+
+        Returns:
+            int: The cache size in bytes.
+        """
+        return sum(entry.stat().st_size for entry in self._entries())
@@ -0,0 +1,59 @@
+import os
+
+# Number of bytes sampled from a file when checking or detecting its encoding
+ENCODING_SAMPLE_SIZE = 1024 * 1024
+
+# Default number of rows per chunk for the streaming loaders
+CHUNKSIZE = 100_000
+
+# Number of rows sampled from each file when inferring a folder schema
+SCHEMA_SAMPLE_ROWS = 1000
+
+# Default location and size limit of the on-disk file cache
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'streamlit_data_viz_helper')
+CACHE_MAX_BYTES = 2 * 1024 ** 3
+
+# Number of DataFrame profiles kept in memory by filtering.profile_dataframe
+PROFILE_CACHE_SIZE = 32
+
+# Columns with fewer unique values than this are filtered with a multiselect
+CATEGORICAL_THRESHOLD = 10
+
+# category columns with more values than this are filtered like text instead of with a multiselect
+CATEGORY_MULTISELECT_MAX = 100
+
+# Text columns with more distinct values than this are never converted to category by dtypes.optimize_dtypes
+CATEGORY_MAX_UNIQUE = 1000
+
+# Number of DataFrame indexes kept in memory by filtering.index_dataframe
+INDEX_CACHE_SIZE = 4
+
+# Scatter and line charts with more rows than this use WebGL traces when render_mode='auto'
+WEBGL_THRESHOLD = 1000
+
+# Number of figures kept by the figure cache used by the chart builders with use_cache=True
+FIGURE_CACHE_SIZE = 128
+
+# Memory budget of the figure cache used by the chart builders with use_cache=True
+FIGURE_CACHE_MAX_BYTES = 256 * 1024 ** 2
+
+# Number of encoded CSV exports kept in memory by export.dataframe_to_csv_bytes
+EXPORT_CACHE_SIZE = 4
+
+# Memory budget of the encoded CSV exports kept by export.dataframe_to_csv_bytes
+EXPORT_CACHE_MAX_BYTES = 256 * 1024 ** 2
+
+# Number of sort orders kept in memory by streamlit_helpers.paginate_dataframe
+SORT_CACHE_SIZE = 8
+
+# Number of worker threads running background loads started by background.start_folder_load / start_csv_load
+BACKGROUND_WORKERS = 2
+
+# Number of finished background loads kept so reruns and other sessions reuse their results
+BACKGROUND_JOBS_KEPT = 8
+
+# Memory budget of the datasets kept by registry.dataset_registry once no session uses them
+REGISTRY_MAX_BYTES = 4 * 1024 ** 3
+
+# Number of rows sampled per column to estimate its cardinality class and quantiles
+SKETCH_SAMPLE_ROWS = 10_000
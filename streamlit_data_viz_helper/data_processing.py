@@ -1,66 +1,493 @@
 import os
+import logging
+import itertools
+import importlib.util
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
 
+import numpy as np
 import pandas as pd
-import chardet
 
-def load_csv_to_dataframe(file_path, encoding='utf-8', sep=',', header='infer', index_col=None):
+from .config import CHUNKSIZE, ENCODING_SAMPLE_SIZE
+from .dtypes import optimize_dtypes
+from .encoding import fallback_encodings, read_with_fallback, resolve_encoding
+from .filtering import FilterSpec, build_mask
+from .instrumentation import instrument
+from .schema import concat_frames, conform_to_schema, infer_schema, read_dtypes, read_sample
+
+logger = logging.getLogger(__name__)
+
+EXECUTORS = {
+    'thread': ThreadPoolExecutor,
+    'process': ProcessPoolExecutor,
+}
+
+@dataclass
+class FileLoadResult:
+    """
+    The outcome of loading a single file from a folder.
+
+    Attributes:
+        file_path (str): The path of the file.
+        dataframe (pd.DataFrame or None): The loaded DataFrame, or None if loading failed.
+        error (str or None): The error message if loading failed, otherwise None.
+    """
+    file_path: str
+    dataframe: pd.DataFrame = None
+    error: str = None
+
+    @property
+    def ok(self):
+        """bool: True if the file was loaded successfully."""
+        return self.error is None
+
+def _read_columns(columns, spec, index_col, usecols):
+    """The columns to parse for ``columns=``: the requested ones plus those filtered on or used as the index."""
+    if columns is None:
+        return usecols
+    if usecols is not None:
+        raise ValueError("Pass either columns or usecols, not both.")
+    extra = spec.columns if spec is not None else []
+    if isinstance(index_col, str):
+        extra = extra + [index_col]
+    elif isinstance(index_col, (list, tuple)):
+        extra = extra + [column for column in index_col if isinstance(column, str)]
+    return list(dict.fromkeys(list(columns) + extra))
+
+def _arrow_filters(spec):
+    """Translate the conditions of a filter spec that Parquet can evaluate into pyarrow filters."""
+    if spec is None:
+        return None
+    filters = []
+    for condition in spec.conditions:
+        if condition.op == 'isin':
+            filters.append((condition.column, 'in', list(condition.value)))
+        elif condition.op == 'between':
+            low, high = condition.value
+            if low is not None:
+                filters.append((condition.column, '>=', low))
+            if high is not None:
+                filters.append((condition.column, '<=', high))
+    return filters or None
+
+def _select(df, spec=None, columns=None, index_col=None):
+    """Keep the rows of a DataFrame matching ``spec`` and its ``columns``."""
+    if isinstance(df, dict):
+        return {name: _select(sheet, spec, columns, index_col) for name, sheet in df.items()}
+    if spec is not None and len(spec):
+        df = df[build_mask(df, spec)]
+        if index_col is None:
+            df = df.reset_index(drop=True)
+    if columns is not None:
+        df = df[[column for column in columns if column not in df.index.names]]
+    return df
+
+def _read_csv(file_path, spec=None, **read_options):
+    """Parse a CSV file. With a filter spec, it is read in chunks and only matching rows are kept."""
+    if spec is None or not len(spec):
+        return pd.read_csv(file_path, **read_options)
+    with pd.read_csv(file_path, chunksize=CHUNKSIZE, **read_options) as reader:
+        parts = [chunk[build_mask(chunk, spec)] for chunk in reader]
+    if not parts:
+        return pd.read_csv(file_path, nrows=0, **read_options)
+    return pd.concat(parts, ignore_index=read_options.get('index_col') is None)
+
+@instrument
+def load_csv_to_dataframe(file_path, encoding='utf-8', sep=',', header='infer', index_col=None, encodings=None, sample_size=ENCODING_SAMPLE_SIZE, cache=None, optimize=False, dtype=None, usecols=None, columns=None, where=None):
     """
     Load a CSV file into a DataFrame with error handling for encoding issues.
 
+    The encoding is checked on a bounded sample of the file before the full parse. If it does
+    not fit, the correct encoding is detected from the same sample instead of the whole file.
+    If a part of the file past the sample fails to decode, the remaining candidate encodings
+    and the detected one are tried before giving up.
+
+    Only the ``columns`` are parsed, and with ``where`` the file is read in chunks of
+    config.CHUNKSIZE rows and only matching rows are kept, so unused data is never materialized.
+    With a ``cache``, the whole file is cached once and both are pushed down into the Parquet reader.
+
     Args:
         file_path (str): The path to the CSV file.
         encoding (str): The initial encoding to try (default is 'utf-8').
         sep (str): The delimiter to use (default is ',').
         header (int, list of int, or 'infer'): Row number(s) to use as column names (default is 'infer').
         index_col (int, str, sequence of int/str, or False): Column(s) to set as index (default is None).
+        encodings (list of str, optional): Candidate encodings to try in order instead of ``encoding``,
+            e.g. ['utf-8', 'cp932', 'euc-jp'] (default is None).
+        sample_size (int): Number of bytes sampled for encoding checks (default is config.ENCODING_SAMPLE_SIZE).
+        cache (FileCache, optional): On-disk cache to read the parsed file from and store it in (default is None).
+        optimize (bool): Whether to compact the dtypes with :func:`~streamlit_data_viz_helper.dtypes.optimize_dtypes`
+            (default is False).
+        dtype (type name or dict, optional): Data type(s) to parse the columns as, passed to ``pd.read_csv`` (default is None).
+        usecols (list, optional): The columns to read, passed to ``pd.read_csv`` (default is None).
+        columns (list of str, optional): The columns to return, in order. Unlike ``usecols``, columns
+            needed by ``where`` or ``index_col`` are read even if not listed (default is None).
+        where (dict or FilterSpec, optional): Row filter, either a FilterSpec or a dict accepted by
+            :meth:`~streamlit_data_viz_helper.filtering.FilterSpec.from_dict`, e.g.
+            ``{"Date": (start, end), "City": ["Tokyo"]}``. Filtered rows are numbered from 0 unless
+            ``index_col`` is set (default is None).
 
     Returns:
         pd.DataFrame: The loaded DataFrame.
     """
-    try:
-        # Try loading the file with the provided encoding
-        df = pd.read_csv(file_path, encoding=encoding, sep=sep, header=header, index_col=index_col)
-        return df
-    except UnicodeDecodeError:
-        # If encoding error occurs, try to detect the correct encoding
-        with open(file_path, 'rb') as f:
-            result = chardet.detect(f.read())
-            detected_encoding = result['encoding']
+    if optimize:
+        df = load_csv_to_dataframe(file_path, encoding=encoding, sep=sep, header=header, index_col=index_col, encodings=encodings, sample_size=sample_size, cache=cache, dtype=dtype, usecols=usecols, columns=columns, where=where)
+        return _optimize(df)
 
-        print(f"Encoding error detected. Retrying with detected encoding: {detected_encoding}")
+    spec = FilterSpec.from_dict(where) if where is not None else None
+    read_columns = _read_columns(columns, spec, index_col, usecols)
 
-        try:
-            # Reload the file with the detected encoding
-            df = pd.read_csv(file_path, encoding=detected_encoding, sep=sep, header=header, index_col=index_col)
-            return df
-        except Exception as e:
-            raise ValueError(f"Failed to load the file even after detecting encoding. Error: {e}")
+    if cache is not None and isinstance(file_path, (str, os.PathLike)):
+        # The whole file is cached, so columns and where are not part of the key
+        options = dict(reader='csv', encoding=encoding, sep=sep, header=header, index_col=index_col, encodings=encodings)
+        if dtype is not None or usecols is not None:
+            options.update(dtype=dtype, usecols=usecols)
+        df = cache.get(file_path, options, columns=read_columns if columns is not None else None, filters=_arrow_filters(spec))
+        if df is None:
+            df = load_csv_to_dataframe(file_path, encoding=encoding, sep=sep, header=header, index_col=index_col, encodings=encodings, sample_size=sample_size, dtype=dtype, usecols=usecols)
+            cache.put(file_path, options, df)
+        return _select(df, spec, columns, index_col)
+
+    def read(encoding):
+        return _read_csv(file_path, spec, encoding=encoding, sep=sep, header=header, index_col=index_col, dtype=dtype, usecols=read_columns)
+
+    try:
+        if isinstance(file_path, (str, os.PathLike)):
+            # Pick the first candidate encoding that decodes a sample of the file. If a later part
+            # of the file does not decode, the other candidates and the detected encoding are tried
+            candidates = encodings or [encoding]
+            encoding = resolve_encoding(file_path, candidates, sample_size=sample_size)
+            df = read_with_fallback(read, file_path, encoding, candidates, sample_size=sample_size)
+        else:
+            df = read(encoding)
+        return _select(df, columns=columns)
+    except UnicodeDecodeError as e:
+        raise ValueError(f"Failed to load the file even after detecting encoding. Error: {e}")
     except Exception as e:
         raise ValueError(f"An error occurred while loading the file: {e}")
 
-def load_excel_to_dataframe(file_path, sheet_name=0, header=0, index_col=None):
+def _excel_engine(engine):
+    """Resolve ``engine='auto'`` to the fastest installed Excel reader, or None for the pandas default."""
+    if engine != 'auto':
+        return engine
+    if importlib.util.find_spec('python_calamine') is not None:
+        return 'calamine'
+    return None
+
+def _is_multi_sheet(sheet_name):
+    return sheet_name is None or isinstance(sheet_name, (list, tuple))
+
+@instrument
+def load_excel_to_dataframe(file_path, sheet_name=0, header=0, index_col=None, cache=None, dtype=None, usecols=None, columns=None, where=None, engine='auto', sheet_column=None, max_workers=None, executor='thread'):
     """
     Load an Excel file into a DataFrame.
 
+    With ``engine='auto'``, the Rust based calamine reader is used when ``python-calamine`` is
+    installed, which parses large workbooks several times faster than openpyxl.
+
+    Several sheets (a list, or None for all of them) are returned as a dict of DataFrames, or as
+    one DataFrame tagged with a categorical ``sheet_column``. With ``max_workers`` or a ``cache``
+    the sheets are read one by one, in parallel when ``max_workers`` is greater than 1.
+
     Args:
         file_path (str): The path to the Excel file.
-        sheet_name (str or int or list): Name or index of the sheet(s) to load (default is 0).
+        sheet_name (str or int or list or None): Name or index of the sheet(s) to load. None loads every sheet (default is 0).
         header (int, list of int, or None): Row number(s) to use as column names (default is 0).
         index_col (int, str, sequence of int/str, or False): Column(s) to set as index (default is None).
+        cache (FileCache, optional): On-disk cache to read the parsed sheets from and store them in (default is None).
+        dtype (type name or dict, optional): Data type(s) to parse the columns as, passed to ``pd.read_excel`` (default is None).
+        usecols (list, optional): The columns to read, passed to ``pd.read_excel`` (default is None).
+        columns (list of str, optional): The columns to return, see :func:`load_csv_to_dataframe` (default is None).
+        where (dict or FilterSpec, optional): Row filter, see :func:`load_csv_to_dataframe`. Excel sheets
+            cannot be read in chunks, so the filter is applied after parsing (default is None).
+        engine (str or None): 'auto', or an engine accepted by ``pd.read_excel`` such as 'calamine'
+            or 'openpyxl'. None lets pandas choose (default is 'auto').
+        sheet_column (str, optional): When several sheets are loaded, combine them into one DataFrame
+            with this categorical column holding the sheet name (default is None).
+        max_workers (int, optional): Number of parallel workers for multi-sheet loads (default is None).
+        executor (str): 'thread' or 'process'. Processes suit openpyxl, which holds the GIL (default is 'thread').
 
     Returns:
-        pd.DataFrame: The loaded DataFrame.
+        pd.DataFrame or dict: The loaded DataFrame, or a dict of DataFrames keyed by sheet name
+        when several sheets are loaded without ``sheet_column``.
     """
+    if executor not in EXECUTORS:
+        raise ValueError(f"executor must be one of {list(EXECUTORS)}, got {executor!r}")
+    engine = _excel_engine(engine)
+    spec = FilterSpec.from_dict(where) if where is not None else None
+    read_columns = _read_columns(columns, spec, index_col, usecols)
+    multi_sheet = _is_multi_sheet(sheet_name)
+
+    if multi_sheet and (cache is not None or (max_workers or 1) > 1):
+        if sheet_name is None:
+            with pd.ExcelFile(file_path, engine=engine) as workbook:
+                sheet_name = workbook.sheet_names
+        # Each sheet goes through the single-sheet path, so it is cached on its own
+        read = partial(load_excel_to_dataframe, file_path, header=header, index_col=index_col, cache=cache, dtype=dtype, usecols=usecols, columns=columns, where=where, engine=engine)
+        if (max_workers or 1) > 1 and len(sheet_name) > 1:
+            with EXECUTORS[executor](max_workers=max_workers) as pool:
+                sheets = dict(zip(sheet_name, pool.map(read, sheet_name)))
+        else:
+            sheets = {name: read(name) for name in sheet_name}
+        return _combine_sheets(sheets, sheet_column, index_col)
+
+    if cache is not None and isinstance(file_path, (str, os.PathLike)) and not multi_sheet:
+        options = dict(reader='excel', sheet_name=sheet_name, header=header, index_col=index_col)
+        if dtype is not None or usecols is not None:
+            options.update(dtype=dtype, usecols=usecols)
+        df = cache.get(file_path, options, columns=read_columns if columns is not None else None, filters=_arrow_filters(spec))
+        if df is None:
+            df = load_excel_to_dataframe(file_path, sheet_name=sheet_name, header=header, index_col=index_col, dtype=dtype, usecols=usecols, engine=engine)
+            cache.put(file_path, options, df)
+        return _select(df, spec, columns, index_col)
+
     try:
-        df = pd.read_excel(file_path, sheet_name=sheet_name, header=header, index_col=index_col)
-        return df
+        df = pd.read_excel(file_path, sheet_name=sheet_name, header=header, index_col=index_col, dtype=dtype, usecols=read_columns, engine=engine)
+        df = _select(df, spec, columns, index_col)
     except Exception as e:
         raise ValueError(f"An error occurred while loading the Excel file: {e}")
+    if multi_sheet:
+        return _combine_sheets(df, sheet_column, index_col)
+    return df
+
+def _combine_sheets(sheets, sheet_column, index_col):
+    """Concatenate the sheets of a workbook into one DataFrame tagged with their names."""
+    if sheet_column is None:
+        return sheets
+    return concat_frames(list(sheets.values()), sources=list(sheets), source_column=sheet_column, ignore_index=index_col is None)
+
+def iter_excel_chunks(file_path, sheet_name=0, chunksize=CHUNKSIZE, header=0):
+    """
+    Stream an .xlsx sheet in chunks without loading the whole workbook into memory.
+
+    The sheet is opened with openpyxl in read-only mode, which parses the worksheet XML as the
+    rows are consumed, so only one chunk of cell values is held at a time.
+
+    Args:
+        file_path (str): The path to the .xlsx file.
+        sheet_name (str or int): Name or index of the sheet (default is 0).
+        chunksize (int): Number of rows per chunk (default is config.CHUNKSIZE).
+        header (int or None): Row number to use as column names. None numbers the columns (default is 0).
+
+    Yields:
+        pd.DataFrame: The next chunk of at most ``chunksize`` rows.
+    """
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        worksheet = workbook.worksheets[sheet_name] if isinstance(sheet_name, int) else workbook[sheet_name]
+        rows = worksheet.iter_rows(values_only=True)
+        names = None
+        if header is not None:
+            for _ in range(header):
+                next(rows, None)
+            names = list(next(rows, ()))
+
+        start = 0
+        while True:
+            records = list(itertools.islice(rows, chunksize))
+            if not records:
+                break
+            chunk = pd.DataFrame.from_records(records, columns=names)
+            chunk.index = pd.RangeIndex(start, start + len(chunk))
+            start += len(chunk)
+            yield chunk
+    finally:
+        workbook.close()
+
+def _optimize(df):
+    """Compact the dtypes of a loaded DataFrame and log how much memory was saved."""
+    df, report = optimize_dtypes(df)
+    logger.info(f"Optimized dtypes, saving {report['bytes_saved'].sum():,} bytes")
+    return df
+
+def _find_files(folder_path, file_types=('csv', 'xlsx'), include_subfolders=False):
+    """
+    List the CSV and Excel files in a folder in a deterministic (sorted) order.
+
+    Args:
+        folder_path (str): The path to the folder containing the files.
+        file_types (tuple): Tuple of file extensions to include (default is ('csv', 'xlsx')).
+        include_subfolders (bool): Whether to include files in subfolders (default is False).
+
+    Returns:
+        list of str: The paths of the matching files.
+    """
+    if include_subfolders:
+        # Walk through all subdirectories
+        candidates = [
+            os.path.join(root, file_name)
+            for root, _, files in os.walk(folder_path)
+            for file_name in files
+        ]
+    else:
+        # Only look in the specified folder
+        candidates = [os.path.join(folder_path, file_name) for file_name in os.listdir(folder_path)]
+
+    file_paths = []
+    for file_path in candidates:
+        file_extension = os.path.basename(file_path).split('.')[-1].lower()
+        if file_extension == 'csv' and 'csv' in file_types:
+            file_paths.append(file_path)
+        elif file_extension in ['xls', 'xlsx'] and 'xlsx' in file_types:
+            file_paths.append(file_path)
+    return sorted(file_paths)
+
+def _read_with_schema(read, file_path, schema, encoding='utf-8', sep=',', header='infer', encodings=None):
+    """Read a file with the columns and dtypes of a schema and conform the result to it."""
+    dtype = read_dtypes(schema)
+    options = dict(dtype=dtype)
+    if os.path.basename(file_path).split('.')[-1].lower() == 'csv':
+        # usecols fails on columns the file does not have, so only ask for the ones in its header
+        columns = read_sample(file_path, nrows=0, encoding=encoding, sep=sep, header=header, encodings=encodings).columns
+        usecols = [column for column in columns if column in schema]
+        options = dict(dtype={column: dtype[column] for column in usecols if column in dtype}, usecols=usecols)
+    return conform_to_schema(read(**options), schema)
+
+def _read_selected_columns(read, file_path, columns, encoding='utf-8', sep=',', header='infer', encodings=None, sheet_column=None):
+    """Read the selected columns of one file of a folder, adding those it lacks as missing values."""
+    if os.path.basename(file_path).split('.')[-1].lower() == 'csv':
+        # usecols fails on columns the file does not have, so only ask for the ones in its header
+        available = read_sample(file_path, nrows=0, encoding=encoding, sep=sep, header=header, encodings=encodings).columns
+        df = read(columns=[column for column in columns if column in available])
+    else:
+        # Excel readers parse every cell anyway, so the columns are selected after reading
+        df = read()
+    selected = [*columns, *[column for column in [sheet_column] if column in df.columns]]
+    return df.reindex(columns=[column for column in selected if column not in df.index.names])
+
+def _load_file(file_path, encoding='utf-8', sep=',', header='infer', index_col=None, encodings=None, cache=None, schema=None, columns=None, where=None, sheet_name=0, sheet_column=None, engine='auto'):
+    """
+    Load a single CSV or Excel file, capturing any error in the result.
+
+    Kept at module level so it can be pickled for process pools.
+
+    Args:
+        file_path (str): The path to the file.
+        encoding (str): The encoding to use for CSV files (default is 'utf-8').
+        sep (str): The delimiter to use for CSV files (default is ',').
+        header (int, list of int, or 'infer'): Row number(s) to use as column names (default is 'infer').
+        index_col (int, str, sequence of int/str, or False): Column(s) to set as index (default is None).
+        encodings (list of str, optional): Candidate encodings for CSV files (default is None).
+        cache (FileCache, optional): On-disk cache for parsed files (default is None).
+        schema (dict, optional): Mapping of column name to dtype. The file is read with these columns
+            and dtypes and conformed to them (default is None).
+        columns (list of str, optional): The columns to return (default is None).
+        where (dict or FilterSpec, optional): Row filter applied while reading (default is None).
+        sheet_name (str or int or list or None): The sheet(s) to load from Excel files (default is 0).
+        sheet_column (str, optional): Column tagging the rows of each sheet when several are loaded (default is None).
+        engine (str or None): The Excel engine, see :func:`load_excel_to_dataframe` (default is 'auto').
+
+    Returns:
+        FileLoadResult: The loaded DataFrame or the error message.
+    """
+    file_name = os.path.basename(file_path)
+    if file_name.split('.')[-1].lower() == 'csv':
+        kind = 'CSV'
+        read = partial(load_csv_to_dataframe, file_path, encoding=encoding, sep=sep, header=header, index_col=index_col, encodings=encodings, cache=cache, where=where)
+    else:
+        kind = 'Excel'
+        read = partial(load_excel_to_dataframe, file_path, sheet_name=sheet_name, header=header, index_col=index_col, cache=cache, where=where, engine=engine, sheet_column=sheet_column)
+
+    try:
+        if schema is None and columns is None:
+            df = read()
+        elif schema is None:
+            # Files of a folder can have different headers, so each one is asked only for the columns it has
+            df = _read_selected_columns(read, file_path, columns, encoding=encoding, sep=sep, header=header, encodings=encodings, sheet_column=sheet_column)
+        else:
+            # The schema already limits the parsed columns, so only the selection is left
+            df = _read_with_schema(read, file_path, schema, encoding=encoding, sep=sep, header=header, encodings=encodings)
+            if columns is not None:
+                df = _select(df, columns=[*columns, *[column for column in [sheet_column] if column in df.columns]])
+        return FileLoadResult(file_path, dataframe=df)
+    except Exception as e:
+        return FileLoadResult(file_path, error=f"Error loading {kind} file {file_name}: {e}")
+
+def _load_files(file_paths, options, max_workers=None, executor='thread'):
+    """
+    Load several files, in parallel when ``max_workers`` is greater than 1.
+
+    Args:
+        file_paths (list of str): The paths of the files.
+        options (dict): Keyword arguments passed to :func:`_load_file`.
+        max_workers (int, optional): Number of parallel workers. None or 1 loads files sequentially (default is None).
+        executor (str): 'thread' or 'process' (default is 'thread').
+
+    Returns:
+        list of FileLoadResult: One result per file, in the order of ``file_paths``.
+    """
+    if max_workers is None or max_workers <= 1 or len(file_paths) <= 1:
+        return [_load_file(file_path, **options) for file_path in file_paths]
+
+    # Executor.map yields results in submission order, which keeps the output deterministic
+    chunksize = max(1, len(file_paths) // (max_workers * 4))
+    with EXECUTORS[executor](max_workers=max_workers) as pool:
+        return list(pool.map(partial(_load_file, **options), file_paths, chunksize=chunksize))
+
+def _folder_read_options(file_paths, encoding='utf-8', sep=',', header='infer', index_col=None, encodings=None, cache=None, schema=None, columns=None, where=None, sheet_name=0, sheet_column='sheet', engine='auto'):
+    """
+    Resolve the :func:`_load_file` options shared by every file of a folder load.
+
+    Infers the schema when ``schema='infer'`` and narrows it to the selected columns.
+
+    Returns:
+        dict: Keyword arguments for :func:`_load_file`.
+    """
+    if isinstance(schema, str) and schema != 'infer':
+        raise ValueError(f"schema must be a dict, 'infer' or None, got {schema!r}")
 
-def load_all_files_in_folder(folder_path, file_types=('csv', 'xlsx'), include_subfolders=False, encoding='utf-8', sep=',', header='infer', index_col=None):
+    if schema == 'infer':
+        schema = infer_schema(file_paths, encoding=encoding, sep=sep, header=header, encodings=encodings)
+    if schema is not None and columns is not None:
+        # Only parse the selected columns and the ones the filter needs
+        needed = _read_columns(columns, FilterSpec.from_dict(where) if where is not None else None, index_col, None)
+        schema = {column: schema[column] for column in needed if column in schema}
+    if not _is_multi_sheet(sheet_name):
+        sheet_column = None
+    elif schema is not None:
+        schema = {**schema, sheet_column: 'category'}
+    return dict(encoding=encoding, sep=sep, header=header, index_col=index_col, encodings=encodings, cache=cache, schema=schema, columns=columns, where=where, sheet_name=sheet_name, sheet_column=sheet_column, engine=engine)
+
+def _combine_results(results, folder_path, source_column=None, optimize=False):
+    """
+    Concatenate the successfully loaded files of a folder into one DataFrame.
+
+    Args:
+        results (list of FileLoadResult): The per-file results, in file order.
+        folder_path (str): The folder, used to make the source labels relative.
+        source_column (str, optional): Name of the categorical column recording each row's file (default is None).
+        optimize (bool): Whether to compact the dtypes of the result (default is False).
+
+    Returns:
+        pd.DataFrame: The combined DataFrame.
+    """
+    loaded = [result for result in results if result.ok]
+    if not loaded:
+        raise ValueError("No valid files found in the folder.")
+
+    sources = [os.path.relpath(result.file_path, folder_path) for result in loaded]
+    combined_dataframe = concat_frames([result.dataframe for result in loaded], sources=sources, source_column=source_column)
+    if optimize:
+        # Optimized after the concat, as categoricals with different categories would concat to object
+        combined_dataframe = _optimize(combined_dataframe)
+    return combined_dataframe
+
+@instrument
+def load_all_files_in_folder(folder_path, file_types=('csv', 'xlsx'), include_subfolders=False, encoding='utf-8', sep=',', header='infer', index_col=None, encodings=None, cache=None, max_workers=None, executor='thread', return_errors=False, optimize=False, schema=None, source_column=None, columns=None, where=None, sheet_name=0, sheet_column='sheet', engine='auto'):
     """
     Load all CSV and Excel files in a folder (and optionally its subfolders) and combine them into a single DataFrame.
 
+    Files are loaded in sorted path order. When ``max_workers`` is greater than 1 they are
+    parsed in parallel, but the combined DataFrame keeps the same order and is concatenated once.
+
+    Files whose columns or dtypes differ are concatenated as they are, which can upcast columns to
+    ``object``. Pass ``schema='infer'`` to infer one schema from the header and first rows of every
+    file up front; each file is then read with explicit ``dtype`` and ``usecols`` and the frames are
+    concatenated with the same compact dtypes.
+
     Args:
         folder_path (str): The path to the folder containing the files.
         file_types (tuple): Tuple of file extensions to include (default is ('csv', 'xlsx')).
@@ -69,54 +496,331 @@ def load_all_files_in_folder(folder_path, file_types=('csv', 'xlsx'), include_su
         sep (str): The delimiter to use for CSV files (default is ',').
         header (int, list of int, or 'infer'): Row number(s) to use as column names (default is 'infer').
         index_col (int, str, sequence of int/str, or False): Column(s) to set as index (default is None).
+        encodings (list of str, optional): Candidate encodings to try for CSV files instead of ``encoding`` (default is None).
+        cache (FileCache, optional): On-disk cache for the parsed files; unchanged files are read from it (default is None).
+        max_workers (int, optional): Number of parallel workers. None or 1 loads files sequentially (default is None).
+        executor (str): 'thread' or 'process'. Processes suit CPU-bound Excel parsing (default is 'thread').
+        return_errors (bool): If True, also return the FileLoadResult of every file that failed (default is False).
+        optimize (bool): Whether to compact the dtypes of the combined DataFrame with
+            :func:`~streamlit_data_viz_helper.dtypes.optimize_dtypes` (default is False).
+        schema (dict or 'infer', optional): Mapping of column name to dtype that every file is read with.
+            Only these columns are loaded. 'infer' infers it with :func:`~streamlit_data_viz_helper.schema.infer_schema`.
+            None concatenates the files as they are (default is None).
+        source_column (str, optional): Name of a categorical column recording the path of the file
+            each row came from, relative to ``folder_path`` (default is None).
+        columns (list of str, optional): The columns to load, in order. Other columns of CSV files are
+            never parsed, and files lacking some of them get missing values (default is None).
+        where (dict or FilterSpec, optional): Row filter applied to each file while it is read, see
+            :func:`load_csv_to_dataframe` (default is None).
+        sheet_name (str or int or list or None): The sheet(s) to load from each Excel file. None loads
+            every sheet (default is 0).
+        sheet_column (str): When several sheets are loaded, the categorical column holding the sheet
+            name of each row (default is 'sheet').
+        engine (str or None): The Excel engine, see :func:`load_excel_to_dataframe` (default is 'auto').
 
     Returns:
         pd.DataFrame: A single DataFrame containing data from all files.
+        If ``return_errors`` is True, a tuple ``(DataFrame, list of FileLoadResult)`` is returned instead.
     """
-    all_dataframes = []
+    if executor not in EXECUTORS:
+        raise ValueError(f"executor must be one of {list(EXECUTORS)}, got {executor!r}")
 
-    if include_subfolders:
-        # Walk through all subdirectories
-        for root, _, files in os.walk(folder_path):
-            for file_name in files:
-                file_path = os.path.join(root, file_name)
-                file_extension = file_name.split('.')[-1].lower()
-
-                if file_extension == 'csv' and 'csv' in file_types:
-                    try:
-                        df = load_csv_to_dataframe(file_path, encoding=encoding, sep=sep, header=header, index_col=index_col)
-                        all_dataframes.append(df)
-                    except Exception as e:
-                        print(f"Error loading CSV file {file_name}: {e}")
-
-                elif file_extension in ['xls', 'xlsx'] and 'xlsx' in file_types:
-                    try:
-                        df = load_excel_to_dataframe(file_path, header=header, index_col=index_col)
-                        all_dataframes.append(df)
-                    except Exception as e:
-                        print(f"Error loading Excel file {file_name}: {e}")
-    else:
-        # Only look in the specified folder
-        for file_name in os.listdir(folder_path):
-            file_path = os.path.join(folder_path, file_name)
-            file_extension = file_name.split('.')[-1].lower()
-
-            if file_extension == 'csv' and 'csv' in file_types:
-                try:
-                    df = load_csv_to_dataframe(file_path, encoding=encoding, sep=sep, header=header, index_col=index_col)
-                    all_dataframes.append(df)
-                except Exception as e:
-                    print(f"Error loading CSV file {file_name}: {e}")
-
-            elif file_extension in ['xls', 'xlsx'] and 'xlsx' in file_types:
-                try:
-                    df = load_excel_to_dataframe(file_path, header=header, index_col=index_col)
-                    all_dataframes.append(df)
-                except Exception as e:
-                    print(f"Error loading Excel file {file_name}: {e}")
-
-    if all_dataframes:
-        combined_dataframe = pd.concat(all_dataframes, ignore_index=True)
-        return combined_dataframe
-    else:
-        raise ValueError("No valid files found in the folder.")
+    file_paths = _find_files(folder_path, file_types=file_types, include_subfolders=include_subfolders)
+    options = _folder_read_options(file_paths, encoding=encoding, sep=sep, header=header, index_col=index_col, encodings=encodings, cache=cache, schema=schema, columns=columns, where=where, sheet_name=sheet_name, sheet_column=sheet_column, engine=engine)
+    results = _load_files(file_paths, options, max_workers=max_workers, executor=executor)
+
+    errors = [result for result in results if not result.ok]
+    if not return_errors:
+        for result in errors:
+            logger.warning(result.error)
+
+    combined_dataframe = _combine_results(results, folder_path, source_column=source_column, optimize=optimize)
+    if return_errors:
+        return combined_dataframe, errors
+    return combined_dataframe
+
+@dataclass
+class ManifestEntry:
+    """
+    What an :class:`IncrementalFolderLoader` remembers about an ingested file.
+
+    Attributes:
+        size (int): File size in bytes when it was loaded.
+        mtime_ns (int): Modification time in nanoseconds when it was loaded.
+        rows (int): Number of rows the file contributed to the combined DataFrame.
+    """
+    size: int
+    mtime_ns: int
+    rows: int
+
+class IncrementalFolderLoader:
+    """
+    Load a folder like :func:`load_all_files_in_folder`, re-parsing only new or changed files.
+
+    The loader keeps a manifest of the files it has ingested (size, modification time and row
+    count) together with the combined DataFrame. Each call to :meth:`load` parses only files that
+    were added or modified since the previous call, drops the rows of files that were deleted or
+    modified, and returns the updated combined DataFrame. Rows are kept in sorted file order, so
+    the result matches what :func:`load_all_files_in_folder` would return.
+
+    Files that fail to load are not added to the manifest and are retried on the next call.
+    With ``schema='infer'``, the schema is inferred from the files present at the first call and
+    kept until :meth:`reset`, so rows kept from earlier calls and newly parsed rows share dtypes.
+
+    Args:
+        folder_path (str): The path to the folder containing the files.
+        file_types (tuple): Tuple of file extensions to include (default is ('csv', 'xlsx')).
+        include_subfolders (bool): Whether to include files in subfolders (default is False).
+        max_workers (int, optional): Number of parallel workers for changed files (default is None).
+        executor (str): 'thread' or 'process' (default is 'thread').
+        source_column (str, optional): Name of a categorical column recording the path of the file
+            each row came from, relative to ``folder_path`` (default is None).
+        **read_options: encoding, sep, header, index_col, encodings, cache, schema, columns, where,
+            sheet_name, sheet_column and engine, as accepted by :func:`load_all_files_in_folder`.
+
+    Example:
+        >>> loader = IncrementalFolderLoader("drop_folder")
+        >>> df = loader.load()  # parses every file
+        >>> df = loader.load()  # parses only files changed since the first call
+    """
+
+    def __init__(self, folder_path, file_types=('csv', 'xlsx'), include_subfolders=False, max_workers=None, executor='thread', source_column=None, **read_options):
+        if executor not in EXECUTORS:
+            raise ValueError(f"executor must be one of {list(EXECUTORS)}, got {executor!r}")
+        self.folder_path = folder_path
+        self.file_types = file_types
+        self.include_subfolders = include_subfolders
+        self.max_workers = max_workers
+        self.executor = executor
+        self.source_column = source_column
+        self.read_options = read_options
+        self.manifest = {}
+        self.errors = []
+        self.combined = None
+        # The resolved _load_file options, including the inferred schema
+        self._options = None
+
+    @instrument
+    def load(self):
+        """
+        Bring the combined DataFrame up to date with the folder and return it.
+
+        Returns:
+            pd.DataFrame: The combined DataFrame of all successfully loaded files.
+        """
+        file_paths = _find_files(self.folder_path, file_types=self.file_types, include_subfolders=self.include_subfolders)
+        stats = {file_path: os.stat(file_path) for file_path in file_paths}
+
+        changed = [
+            file_path for file_path in file_paths
+            if file_path not in self.manifest
+            or self.manifest[file_path].size != stats[file_path].st_size
+            or self.manifest[file_path].mtime_ns != stats[file_path].st_mtime_ns
+        ]
+        removed = set(self.manifest) - set(file_paths)
+        if self.combined is not None and not changed and not removed:
+            return self.combined
+
+        if self._options is None:
+            self._options = _folder_read_options(file_paths, **self.read_options)
+        results = _load_files(changed, self._options, max_workers=self.max_workers, executor=self.executor)
+        self.errors = [result for result in results if not result.ok]
+        for result in self.errors:
+            logger.warning(result.error)
+        loaded = {result.file_path: result.dataframe for result in results if result.ok}
+
+        # Row ranges of the files in the previous combined DataFrame
+        offsets = {}
+        start = 0
+        for file_path, entry in self.manifest.items():
+            offsets[file_path] = start
+            start += entry.rows
+
+        manifest = {}
+        kept = []
+        for file_path in file_paths:
+            if file_path in loaded:
+                df = loaded[file_path]
+            elif file_path in self.manifest and file_path not in changed:
+                start = offsets[file_path]
+                df = self.combined.iloc[start:start + self.manifest[file_path].rows]
+                if self.source_column is not None:
+                    # Added again with the labels of the current files
+                    df = df.drop(columns=self.source_column)
+            else:
+                continue
+            stat = stats[file_path]
+            manifest[file_path] = ManifestEntry(size=stat.st_size, mtime_ns=stat.st_mtime_ns, rows=len(df))
+            kept.append(FileLoadResult(file_path, dataframe=df))
+
+        self.combined = _combine_results(kept, self.folder_path, source_column=self.source_column)
+        self.manifest = manifest
+        return self.combined
+
+    def reset(self):
+        """
+        Forget the manifest and the combined DataFrame so the next load parses every file again.
+        """
+        self.manifest = {}
+        self.errors = []
+        self.combined = None
+        self._options = None
+
+def iter_csv_chunks(file_path, chunksize=CHUNKSIZE, encoding='utf-8', sep=',', header='infer', index_col=None, encodings=None, sample_size=ENCODING_SAMPLE_SIZE):
+    """
+    Read a CSV file in chunks, yielding one DataFrame per chunk.
+
+    The encoding is resolved the same way as in :func:`load_csv_to_dataframe`. If the file still
+    fails to decode before the first chunk is produced, it is retried with the remaining candidate
+    encodings and the detected encoding.
+
+    Args:
+        file_path (str): The path to the CSV file.
+        chunksize (int): Number of rows per chunk (default is config.CHUNKSIZE).
+        encoding (str): The initial encoding to try (default is 'utf-8').
+        sep (str): The delimiter to use (default is ',').
+        header (int, list of int, or 'infer'): Row number(s) to use as column names (default is 'infer').
+        index_col (int, str, sequence of int/str, or False): Column(s) to set as index (default is None).
+        encodings (list of str, optional): Candidate encodings to try in order instead of ``encoding`` (default is None).
+        sample_size (int): Number of bytes sampled for encoding checks (default is config.ENCODING_SAMPLE_SIZE).
+
+    Yields:
+        pd.DataFrame: The next chunk of at most ``chunksize`` rows.
+    """
+    candidates = encodings or [encoding]
+    is_path = isinstance(file_path, (str, os.PathLike))
+    if is_path:
+        encoding = resolve_encoding(file_path, candidates, sample_size=sample_size)
+
+    def attempts():
+        yield encoding
+        if is_path:
+            # Only computed once the first encoding has failed
+            yield from fallback_encodings(file_path, candidates, encoding, sample_size=sample_size)
+
+    chunks_read = 0
+    error = None
+    for attempt in attempts():
+        if error is not None:
+            logger.info(f"Encoding error detected. Retrying with encoding: {attempt}")
+        try:
+            with pd.read_csv(file_path, encoding=attempt, sep=sep, header=header, index_col=index_col, chunksize=chunksize) as reader:
+                for chunk in reader:
+                    chunks_read += 1
+                    yield chunk
+            return
+        except UnicodeDecodeError as e:
+            if chunks_read:
+                # Earlier chunks were already handed out, so the file cannot be restarted
+                raise ValueError(f"Encoding error after {chunks_read} chunks of {file_path}: {e}")
+            error = e
+    raise error
+
+def iter_folder_chunks(folder_path, chunksize=CHUNKSIZE, file_types=('csv', 'xlsx'), include_subfolders=False, encoding='utf-8', sep=',', header='infer', index_col=None, encodings=None):
+    """
+    Stream the CSV and Excel files in a folder as DataFrame chunks, one file after another.
+
+    Only one chunk is held in memory at a time for CSV and .xlsx files, which are streamed with
+    :func:`iter_excel_chunks`. Other Excel files, or sheets read with ``index_col``, are loaded
+    and then split into chunks. Files that fail to load are logged and skipped, like in
+    :func:`load_all_files_in_folder`.
+
+    Args:
+        folder_path (str): The path to the folder containing the files.
+        chunksize (int): Number of rows per chunk (default is config.CHUNKSIZE).
+        file_types (tuple): Tuple of file extensions to include (default is ('csv', 'xlsx')).
+        include_subfolders (bool): Whether to include files in subfolders (default is False).
+        encoding (str): The encoding to use for CSV files (default is 'utf-8').
+        sep (str): The delimiter to use for CSV files (default is ',').
+        header (int, list of int, or 'infer'): Row number(s) to use as column names (default is 'infer').
+        index_col (int, str, sequence of int/str, or False): Column(s) to set as index (default is None).
+        encodings (list of str, optional): Candidate encodings to try for CSV files instead of ``encoding`` (default is None).
+
+    Yields:
+        pd.DataFrame: The next chunk of at most ``chunksize`` rows.
+    """
+    for file_path in _find_files(folder_path, file_types=file_types, include_subfolders=include_subfolders):
+        file_name = os.path.basename(file_path)
+        try:
+            if file_name.split('.')[-1].lower() == 'csv':
+                yield from iter_csv_chunks(file_path, chunksize=chunksize, encoding=encoding, sep=sep, header=header, index_col=index_col, encodings=encodings)
+            elif file_name.split('.')[-1].lower() == 'xlsx' and index_col is None:
+                yield from iter_excel_chunks(file_path, chunksize=chunksize, header=0 if header == 'infer' else header)
+            else:
+                df = load_excel_to_dataframe(file_path, header=header, index_col=index_col)
+                for start in range(0, len(df), chunksize):
+                    yield df.iloc[start:start + chunksize]
+        except Exception as e:
+            logger.warning(f"Error loading file {file_name}: {e}")
+
+# Partial aggregates computed per chunk, and how partials are combined across chunks
+_PARTIAL_AGGREGATES = {
+    'sum': ('sum',),
+    'count': ('count',),
+    'min': ('min',),
+    'max': ('max',),
+    'mean': ('sum', 'count'),
+}
+_COMBINE_AGGREGATES = {
+    'sum': 'sum',
+    'count': 'sum',
+    'min': 'min',
+    'max': 'max',
+}
+
+@instrument
+def aggregate_chunks(chunks, agg, by=None):
+    """
+    Aggregate a stream of DataFrame chunks without holding the full dataset in memory.
+
+    Each chunk is reduced to partial aggregates per group, which are merged into a running
+    result, so memory is bounded by the number of groups rather than the number of rows.
+
+    Args:
+        chunks (iterable of pd.DataFrame): The chunks, e.g. from :func:`iter_folder_chunks`.
+        agg (dict): Mapping of column name to an aggregate or list of aggregates.
+            Supported aggregates are 'sum', 'count', 'min', 'max' and 'mean'.
+        by (str or list of str, optional): Column(s) to group by. None aggregates over all rows (default is None).
+
+    Returns:
+        pd.DataFrame: The aggregated result, shaped like ``df.groupby(by).agg(agg)``.
+        When ``by`` is None, a single row is returned.
+    """
+    normalized = {column: [funcs] if isinstance(funcs, str) else list(funcs) for column, funcs in agg.items()}
+    for funcs in normalized.values():
+        for func in funcs:
+            if func not in _PARTIAL_AGGREGATES:
+                raise ValueError(f"Unsupported aggregate {func!r}. Use one of {list(_PARTIAL_AGGREGATES)}.")
+    partial_spec = {
+        column: sorted({partial for func in funcs for partial in _PARTIAL_AGGREGATES[func]})
+        for column, funcs in normalized.items()
+    }
+
+    running = None
+    for chunk in chunks:
+        keys = by if by is not None else np.zeros(len(chunk), dtype=np.int8)
+        partial = chunk.groupby(keys, observed=True).agg(partial_spec)
+        if running is None:
+            running = partial
+        else:
+            combined = pd.concat([running, partial])
+            levels = list(range(combined.index.nlevels))
+            running = combined.groupby(level=levels).agg({column: _COMBINE_AGGREGATES[column[1]] for column in combined.columns})
+
+    if running is None:
+        raise ValueError("No chunks to aggregate.")
+
+    result = {}
+    for column, funcs in normalized.items():
+        for func in funcs:
+            if func == 'mean':
+                result[(column, func)] = running[(column, 'sum')] / running[(column, 'count')]
+            else:
+                result[(column, func)] = running[(column, func)]
+    result = pd.DataFrame(result, index=running.index)
+
+    if all(isinstance(funcs, str) for funcs in agg.values()):
+        result.columns = [column for column, _ in result.columns]
+    if by is None:
+        result = result.reset_index(drop=True)
+    return result
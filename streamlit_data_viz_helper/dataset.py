@@ -0,0 +1,416 @@
+import os
+import logging
+import threading
+
+import numpy as np
+import pandas as pd
+
+from .config import CATEGORICAL_THRESHOLD
+from .data_processing import _find_files, load_excel_to_dataframe
+from .filtering import ColumnProfile, FilterSpec
+from .instrumentation import instrument
+
+logger = logging.getLogger(__name__)
+
+# Aggregates of FolderDataset.aggregate and their SQL functions
+SQL_AGGREGATES = {
+    'sum': 'sum',
+    'count': 'count',
+    'min': 'min',
+    'max': 'max',
+    'mean': 'avg',
+    'median': 'median',
+    'nunique': 'count(DISTINCT {})',
+}
+
+# Compressions supported by FolderDataset.to_csv
+CSV_COMPRESSIONS = (None, 'gzip', 'zstd')
+
+# DuckDB column types binned and filtered as numbers
+INTEGER_TYPES = ('TINYINT', 'SMALLINT', 'INTEGER', 'BIGINT', 'HUGEINT', 'UTINYINT', 'USMALLINT', 'UINTEGER', 'UBIGINT')
+NUMERIC_TYPES = INTEGER_TYPES + ('FLOAT', 'DOUBLE')
+
+def _quote(name):
+    """Quote an identifier for SQL."""
+    return '"' + str(name).replace('"', '""') + '"'
+
+def _literal(value):
+    """Quote a string literal for SQL, for the places where DuckDB does not accept parameters."""
+    return "'" + str(value).replace("'", "''") + "'"
+
+def _is_numeric_type(column_type):
+    return column_type in NUMERIC_TYPES or column_type.startswith('DECIMAL')
+
+def _is_datetime_type(column_type):
+    return column_type.startswith(('DATE', 'TIMESTAMP'))
+
+def _param(value):
+    """Convert NumPy scalars, which DuckDB does not accept as parameters, to Python values."""
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+def _filter_sql(spec):
+    """
+    Translate a filter spec into a SQL condition with ``?`` parameters.
+
+    'contains' matches the column as text with a regular expression, like ``str.contains``.
+
+    Returns:
+        tuple: ``(condition, params)``; the condition is 'TRUE' for an empty spec.
+    """
+    clauses = []
+    params = []
+    for condition in spec.conditions:
+        column = _quote(condition.column)
+        if condition.op == 'isin':
+            values = [value for value in condition.value if not pd.isna(value)]
+            parts = []
+            if values:
+                parts.append(f"{column} IN ({', '.join('?' * len(values))})")
+                params.extend(_param(value) for value in values)
+            if len(values) < len(condition.value):
+                parts.append(f"{column} IS NULL")
+            clauses.append(f"({' OR '.join(parts) or 'FALSE'})")
+        elif condition.op == 'between':
+            low, high = condition.value
+            if low is not None:
+                clauses.append(f"{column} >= ?")
+                params.append(_param(low))
+            if high is not None:
+                clauses.append(f"{column} <= ?")
+                params.append(_param(high))
+        else:
+            clauses.append(f"regexp_matches(CAST({column} AS VARCHAR), ?)")
+            params.append(condition.value)
+    return ' AND '.join(clauses) or 'TRUE', params
+
+class FolderDataset:
+    """
+    A folder of CSV and Excel files queried in place with DuckDB, for data too large for memory.
+
+    The files are found like in :func:`~streamlit_data_viz_helper.data_processing.load_all_files_in_folder`
+    and exposed as one lazy view: CSV files are scanned by DuckDB on every query and combined by
+    column name, so files with different columns are aligned as they are by ``pd.concat``. Filters,
+    aggregations and CSV export run inside DuckDB, and only their results become pandas DataFrames.
+    Excel files cannot be scanned lazily, so each one is loaded with pandas and registered with DuckDB.
+
+    DuckDB reads UTF-8, UTF-16 and Latin-1 CSV files by itself; other encodings such as cp932
+    need its ``encodings`` extension.
+
+    Example:
+        >>> dataset = FolderDataset("archive", include_subfolders=True)
+        >>> spec = FilterSpec().isin("City", ["Tokyo"])
+        >>> df = dataset.query(columns=["Date", "Sales"], where=spec)
+        >>> totals = dataset.aggregate({"Sales": "sum"}, by="City")
+
+    Args:
+        folder_path (str): The path to the folder containing the files.
+        file_types (tuple): Tuple of file extensions to include (default is ('csv', 'xlsx')).
+        include_subfolders (bool): Whether to include files in subfolders (default is False).
+        encoding (str): The encoding of the CSV files (default is 'utf-8').
+        sep (str): The delimiter of the CSV files (default is ',').
+        header (0, 'infer' or None): Whether the first row holds the column names (default is 'infer').
+        source_column (str, optional): Name of a column holding the path of the file each row came
+            from, relative to ``folder_path`` (default is None).
+        config (dict, optional): DuckDB settings such as ``{'memory_limit': '4GB', 'threads': 4}``
+            (default is None).
+    """
+
+    def __init__(self, folder_path, file_types=('csv', 'xlsx'), include_subfolders=False, encoding='utf-8', sep=',', header='infer', source_column=None, config=None):
+        try:
+            import duckdb
+        except ImportError:
+            raise ImportError("FolderDataset requires duckdb. Install it with `pip install duckdb`.")
+        if header not in ('infer', 0, None):
+            raise ValueError(f"header must be 'infer', 0 or None, got {header!r}")
+
+        self.folder_path = folder_path
+        self.file_paths = _find_files(folder_path, file_types=file_types, include_subfolders=include_subfolders)
+        if not self.file_paths:
+            raise ValueError("No valid files found in the folder.")
+        self.source_column = source_column
+        self._connection = duckdb.connect(config=config or {})
+        self._lock = threading.Lock()
+        self._profiles = None
+
+        csv_paths = [path for path in self.file_paths if path.lower().endswith('.csv')]
+        excel_paths = [path for path in self.file_paths if not path.lower().endswith('.csv')]
+        selects = []
+        if csv_paths:
+            paths = ', '.join(map(_literal, csv_paths))
+            options = f"union_by_name=true, header={'false' if header is None else 'true'}, delim={_literal(sep)}, encoding={_literal(encoding)}"
+            if source_column is None:
+                selects.append(f"SELECT * FROM read_csv([{paths}], {options})")
+            else:
+                selects.append(
+                    f"SELECT * EXCLUDE (__source_file), {self._relative_path_sql('__source_file')} AS {_quote(source_column)} "
+                    f"FROM read_csv([{paths}], {options}, filename='__source_file')"
+                )
+        for number, path in enumerate(excel_paths):
+            df = load_excel_to_dataframe(path, header=0 if header == 'infer' else header)
+            if source_column is not None:
+                df[source_column] = os.path.relpath(path, folder_path)
+            # Copied into a DuckDB table, as registered DataFrames are not visible to other cursors
+            self._connection.register('excel_frame', df)
+            self._connection.execute(f"CREATE TABLE excel_{number} AS SELECT * FROM excel_frame")
+            self._connection.unregister('excel_frame')
+            selects.append(f"SELECT * FROM excel_{number}")
+        self._connection.execute(f"CREATE VIEW dataset AS {' UNION ALL BY NAME '.join(selects)}")
+
+    def _relative_path_sql(self, column):
+        prefix = os.path.join(self.folder_path, '')
+        return f"substr({column}, {len(prefix) + 1})"
+
+    def _execute(self, sql, params=None):
+        # A cursor per query, as a DuckDB connection must not be used by several threads at once
+        with self._lock:
+            cursor = self._connection.cursor()
+        try:
+            return cursor.execute(sql, params or []).df()
+        finally:
+            cursor.close()
+
+    def sql(self, query, params=None):
+        """
+        Run a SQL query against the view ``dataset`` and return its result.
+
+        Args:
+            query (str): The query, e.g. ``"SELECT City, sum(Sales) FROM dataset GROUP BY City"``.
+            params (list, optional): Values for the ``?`` placeholders (default is None).
+
+        Returns:
+            pd.DataFrame: The result.
+        """
+        return self._execute(query, [_param(value) for value in params or []])
+
+    @property
+    def dtypes(self):
+        """pd.Series: The DuckDB type of every column, indexed by column name."""
+        described = self._execute("DESCRIBE SELECT * FROM dataset")
+        return pd.Series(described['column_type'].to_numpy(), index=described['column_name'].to_numpy())
+
+    @property
+    def columns(self):
+        """list: The column names."""
+        return list(self.dtypes.index)
+
+    def count(self, where=None):
+        """
+        Count the rows, optionally only those matching a filter.
+
+        Args:
+            where (dict or FilterSpec, optional): Row filter, see :meth:`FilterSpec.from_dict` (default is None).
+
+        Returns:
+            int: The number of rows.
+        """
+        condition, params = _filter_sql(FilterSpec.from_dict(where or {}))
+        return int(self._execute(f"SELECT count(*) AS n FROM dataset WHERE {condition}", params)['n'].iloc[0])
+
+    @instrument
+    def query(self, columns=None, where=None, order_by=None, ascending=True, limit=None, offset=0):
+        """
+        Materialize the rows matching a filter as a DataFrame.
+
+        Args:
+            columns (list of str, optional): The columns to return. None returns all (default is None).
+            where (dict or FilterSpec, optional): Row filter, see :meth:`FilterSpec.from_dict` (default is None).
+            order_by (str or list of str, optional): Column(s) to sort by (default is None).
+            ascending (bool): Sort order (default is True).
+            limit (int, optional): Maximum number of rows (default is None).
+            offset (int): Number of matching rows to skip (default is 0).
+
+        Returns:
+            pd.DataFrame: The matching rows.
+        """
+        select = ', '.join(_quote(column) for column in columns) if columns is not None else '*'
+        condition, params = _filter_sql(FilterSpec.from_dict(where or {}))
+        sql = f"SELECT {select} FROM dataset WHERE {condition}"
+        if order_by is not None:
+            keys = [order_by] if isinstance(order_by, str) else order_by
+            sql += " ORDER BY " + ', '.join(f"{_quote(key)} {'ASC' if ascending else 'DESC'}" for key in keys)
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        if offset:
+            sql += f" OFFSET {int(offset)}"
+        return self._execute(sql, params)
+
+    @instrument
+    def aggregate(self, agg, by=None, where=None):
+        """
+        Aggregate the rows matching a filter inside DuckDB.
+
+        Args:
+            agg (dict): Mapping of column name to an aggregate or list of aggregates, as for
+                :func:`~streamlit_data_viz_helper.data_processing.aggregate_chunks`. Supported
+                aggregates are 'sum', 'count', 'min', 'max', 'mean', 'median' and 'nunique'.
+            by (str or list of str, optional): Column(s) to group by. None aggregates over all rows (default is None).
+            where (dict or FilterSpec, optional): Row filter, see :meth:`FilterSpec.from_dict` (default is None).
+
+        Returns:
+            pd.DataFrame: The aggregated result, shaped like ``df.groupby(by).agg(agg)``.
+            When ``by`` is None, a single row is returned.
+        """
+        normalized = {column: [funcs] if isinstance(funcs, str) else list(funcs) for column, funcs in agg.items()}
+        dtypes = self.dtypes
+        expressions = []
+        for column, funcs in normalized.items():
+            for func in funcs:
+                if func not in SQL_AGGREGATES:
+                    raise ValueError(f"Unsupported aggregate {func!r}. Use one of {list(SQL_AGGREGATES)}.")
+                template = SQL_AGGREGATES[func]
+                call = template.format(_quote(column)) if '{}' in template else f"{template}({_quote(column)})"
+                if func == 'sum' and dtypes[column] in INTEGER_TYPES:
+                    # DuckDB sums integers as HUGEINT, which pandas would receive as floats
+                    call = f"CAST({call} AS BIGINT)"
+                expressions.append(f"{call} AS {_quote(f'{column}__{func}')}")
+
+        keys = [] if by is None else [by] if isinstance(by, str) else list(by)
+        select = ', '.join([*map(_quote, keys), *expressions])
+        condition, params = _filter_sql(FilterSpec.from_dict(where or {}))
+        sql = f"SELECT {select} FROM dataset WHERE {condition}"
+        if keys:
+            group = ', '.join(map(_quote, keys))
+            # Groups are sorted, like groupby, and missing keys dropped
+            sql += f" AND {' AND '.join(f'{key} IS NOT NULL' for key in map(_quote, keys))} GROUP BY {group} ORDER BY {group}"
+        df = self._execute(sql, params)
+
+        if keys:
+            df = df.set_index(keys)
+        result = pd.DataFrame(
+            {(column, func): df[f"{column}__{func}"] for column, funcs in normalized.items() for func in funcs},
+            index=df.index,
+        )
+        if all(isinstance(funcs, str) for funcs in agg.values()):
+            result.columns = [column for column, _ in result.columns]
+        return result
+
+    @instrument
+    def histogram(self, column, nbins=20, where=None):
+        """
+        Count the values of a column in bins inside DuckDB.
+
+        Numeric and date columns are split into ``nbins`` equal-width bins; other columns are
+        counted per value. The result can be plotted with
+        :func:`~streamlit_data_viz_helper.visualization.create_histogram_from_bins`.
+
+        Args:
+            column (str): The column.
+            nbins (int): Number of bins for numeric and date columns (default is 20).
+            where (dict or FilterSpec, optional): Row filter, see :meth:`FilterSpec.from_dict` (default is None).
+
+        Returns:
+            tuple: ``(bins, widths)``, a DataFrame with the bin center (or value) and ``count`` per
+            bin, and the bin widths in axis units, or None for values.
+        """
+        quoted = _quote(column)
+        condition, params = _filter_sql(FilterSpec.from_dict(where or {}))
+        condition = f"{condition} AND {quoted} IS NOT NULL"
+        column_type = self.dtypes[column]
+        is_datetime = _is_datetime_type(column_type)
+        if not (_is_numeric_type(column_type) or is_datetime):
+            counts = self._execute(f"SELECT {quoted}, count(*) AS count FROM dataset WHERE {condition} GROUP BY {quoted} ORDER BY {quoted}", params)
+            return counts, None
+
+        # Dates are binned on epoch microseconds
+        value = f"epoch_us(CAST({quoted} AS TIMESTAMP))" if is_datetime else f"CAST({quoted} AS DOUBLE)"
+        bounds = self._execute(f"SELECT min({value}) AS low, max({value}) AS high FROM dataset WHERE {condition}", params)
+        low, high = bounds['low'].iloc[0], bounds['high'].iloc[0]
+        if pd.isna(low):
+            return pd.DataFrame({column: [], 'count': []}), np.array([])
+        width = (high - low) / nbins or 1.0
+        counts = self._execute(
+            f"SELECT least(CAST(floor(({value} - ?) / ?) AS BIGINT), {nbins - 1}) AS bin, count(*) AS count "
+            f"FROM dataset WHERE {condition} GROUP BY bin",
+            [float(low), float(width), *params],
+        )
+        bins = np.zeros(nbins, dtype=np.int64)
+        bins[counts['bin'].to_numpy()] = counts['count'].to_numpy()
+        centers = low + width * (np.arange(nbins) + 0.5)
+        widths = np.full(nbins, width, dtype=float)
+        if is_datetime:
+            centers = pd.to_datetime(centers, unit='us')
+            # Plotly measures bar widths on date axes in milliseconds
+            widths = widths / 1e3
+        return pd.DataFrame({column: centers, 'count': bins}), widths
+
+    def profiles(self):
+        """
+        Profile every column for filtering, like :func:`~streamlit_data_viz_helper.filtering.profile_dataframe`.
+
+        Distinct counts are estimated with DuckDB's ``approx_count_distinct`` and quartiles with
+        ``approx_quantile``, in one scan over the files. The result is kept for the lifetime of the dataset.
+
+        Returns:
+            dict: Mapping of column name to :class:`~streamlit_data_viz_helper.filtering.ColumnProfile`.
+        """
+        if self._profiles is not None:
+            return self._profiles
+
+        dtypes = self.dtypes
+        expressions = []
+        for number, (column, column_type) in enumerate(dtypes.items()):
+            quoted = _quote(column)
+            expressions.append(f"approx_count_distinct({quoted}) AS n{number}")
+            if _is_numeric_type(column_type) or _is_datetime_type(column_type):
+                expressions.append(f"min({quoted}) AS min{number}, max({quoted}) AS max{number}")
+                expressions.append(f"approx_quantile({quoted}, [0.25, 0.5, 0.75]) AS q{number}")
+        stats = self._execute(f"SELECT {', '.join(expressions)} FROM dataset").iloc[0]
+
+        profiles = {}
+        for number, (column, column_type) in enumerate(dtypes.items()):
+            profile = ColumnProfile(kind='text', nunique=int(stats[f"n{number}"]))
+            if profile.nunique < CATEGORICAL_THRESHOLD:
+                profile.kind = 'categorical'
+                values = self._execute(f"SELECT DISTINCT {_quote(column)} AS value FROM dataset ORDER BY value")
+                profile.values = values['value'].tolist()
+                # The count was an estimate
+                profile.nunique = int(values['value'].notna().sum())
+            elif _is_numeric_type(column_type) or _is_datetime_type(column_type):
+                is_datetime = _is_datetime_type(column_type)
+                profile.kind = 'datetime' if is_datetime else 'numeric'
+                profile.min, profile.max = stats[f"min{number}"], stats[f"max{number}"]
+                if is_datetime:
+                    profile.min, profile.max = pd.Timestamp(profile.min), pd.Timestamp(profile.max)
+                profile.quantiles = dict(zip([0.25, 0.5, 0.75], list(stats[f"q{number}"])))
+            profiles[column] = profile
+        self._profiles = profiles
+        return profiles
+
+    @instrument
+    def to_csv(self, path, columns=None, where=None, compression=None):
+        """
+        Write the rows matching a filter to a CSV file with DuckDB's ``COPY``, without loading them into pandas.
+
+        Args:
+            path (str): The output file.
+            columns (list of str, optional): The columns to write. None writes all (default is None).
+            where (dict or FilterSpec, optional): Row filter, see :meth:`FilterSpec.from_dict` (default is None).
+            compression (str, optional): None, 'gzip' or 'zstd' (default is None).
+
+        Returns:
+            str: ``path``.
+        """
+        if compression not in CSV_COMPRESSIONS:
+            raise ValueError(f"compression must be one of {CSV_COMPRESSIONS}, got {compression!r}")
+        select = ', '.join(_quote(column) for column in columns) if columns is not None else '*'
+        condition, params = _filter_sql(FilterSpec.from_dict(where or {}))
+        self._execute(
+            f"COPY (SELECT {select} FROM dataset WHERE {condition}) TO {_literal(path)} "
+            f"(HEADER, DELIMITER ',', COMPRESSION {compression or 'none'})",
+            params,
+        )
+        return path
+
+    def close(self):
+        """
+        Close the DuckDB connection.
+        """
+        self._connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
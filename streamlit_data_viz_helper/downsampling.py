@@ -0,0 +1,195 @@
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_datetime64_any_dtype, is_numeric_dtype
+
+def _as_float(series):
+    """Return a column as float64 values: datetimes as nanoseconds, text as category codes."""
+    if is_datetime64_any_dtype(series):
+        if series.dt.tz is not None:
+            series = series.dt.tz_localize(None)
+        return series.to_numpy(dtype='datetime64[ns]').astype('int64').astype('float64')
+    if is_numeric_dtype(series):
+        return series.to_numpy(dtype='float64', na_value=np.nan)
+    codes, _ = pd.factorize(series)
+    return codes.astype('float64')
+
+def lttb(x, y, n_out):
+    """
+    Select points with the Largest-Triangle-Three-Buckets algorithm.
+
+    The points are split into ``n_out - 2`` buckets in their given order. From each bucket the
+    point forming the largest triangle with the previously selected point and the average of
+    the next bucket is kept, which preserves the visual shape of a line.
+
+    Args:
+        x (np.ndarray): The x values.
+        y (np.ndarray): The y values.
+        n_out (int): Number of points to keep.
+
+    Returns:
+        np.ndarray: Positions of the selected points, in order.
+    """
+    n = len(x)
+    if n_out >= n:
+        return np.arange(n)
+    if n_out < 3:
+        return np.array([0, n - 1][:max(n_out, 0)])
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, stop = edges[i], edges[i + 1]
+        next_start, next_stop = (edges[i + 1], edges[i + 2]) if i + 2 < len(edges) else (n - 1, n)
+        avg_x = x[next_start:next_stop].mean()
+        avg_y = y[next_start:next_stop].mean()
+        area = np.abs((x[a] - avg_x) * (y[start:stop] - y[a]) - (x[a] - x[start:stop]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+def minmax(x, y, n_out):
+    """
+    Keep the minimum and maximum y value of each bucket of consecutive points.
+
+    Spikes are never lost, which suits noisy signals. ``x`` is unused because the buckets
+    follow the given order.
+
+    Args:
+        x (np.ndarray): The x values.
+        y (np.ndarray): The y values.
+        n_out (int): Maximum number of points to keep.
+
+    Returns:
+        np.ndarray: Positions of the selected points, in order.
+    """
+    n = len(y)
+    n_buckets = max(n_out // 2, 1)
+    if n_out >= n:
+        return np.arange(n)
+
+    bucket_size = -(-n // n_buckets)
+    padded = np.full(n_buckets * bucket_size, np.nan)
+    padded[:n] = y
+    buckets = padded.reshape(n_buckets, bucket_size)
+    offsets = np.arange(n_buckets) * bucket_size
+    lows = offsets + np.argmin(np.where(np.isnan(buckets), np.inf, buckets), axis=1)
+    highs = offsets + np.argmax(np.where(np.isnan(buckets), -np.inf, buckets), axis=1)
+    selected = np.unique(np.concatenate([lows, highs]))
+    return selected[selected < n]
+
+def random_sample(x, y, n_out, seed=0):
+    """
+    Keep a uniform random sample of the points.
+
+    Args:
+        x (np.ndarray): The x values.
+        y (np.ndarray): The y values.
+        n_out (int): Number of points to keep.
+        seed (int): Seed of the random generator, so reruns pick the same points (default is 0).
+
+    Returns:
+        np.ndarray: Positions of the selected points, in order.
+    """
+    n = len(x)
+    if n_out >= n:
+        return np.arange(n)
+    return np.sort(np.random.default_rng(seed).choice(n, size=n_out, replace=False))
+
+def density_sample(x, y, n_out, bins=100, seed=0):
+    """
+    Sample points on a 2D grid, capping the number of points kept per cell.
+
+    Sparse cells keep all their points and dense cells are thinned to the same cap, so
+    outliers and the overall shape survive while dense clusters are reduced.
+
+    Args:
+        x (np.ndarray): The x values.
+        y (np.ndarray): The y values.
+        n_out (int): Maximum number of points to keep.
+        bins (int): Number of grid cells along each axis (default is 100).
+        seed (int): Seed of the random generator (default is 0).
+
+    Returns:
+        np.ndarray: Positions of the selected points, in order.
+    """
+    n = len(x)
+    if n_out >= n:
+        return np.arange(n)
+
+    def cell_of(values):
+        finite = np.isfinite(values)
+        low, high = (values[finite].min(), values[finite].max()) if finite.any() else (0.0, 0.0)
+        scaled = (values - low) / (high - low) * bins if high > low else np.zeros(n)
+        return np.clip(np.nan_to_num(scaled), 0, bins - 1).astype(np.int64)
+
+    cells = cell_of(x) * bins + cell_of(y)
+    counts = np.bincount(cells, minlength=bins * bins)
+
+    # Largest per-cell cap that keeps the total within n_out
+    sorted_counts = np.sort(counts[counts > 0])
+    low, high = 0, int(sorted_counts[-1])
+    while low < high:
+        cap = (low + high + 1) // 2
+        if np.minimum(sorted_counts, cap).sum() <= n_out:
+            low = cap
+        else:
+            high = cap - 1
+    cap = max(low, 1)
+
+    # Rank points within their cell in random order and keep the first `cap`
+    order = np.random.default_rng(seed).permutation(n)
+    order = order[np.argsort(cells[order], kind='stable')]
+    starts = np.concatenate([[0], np.cumsum(counts)])[cells[order]]
+    ranks = np.arange(n) - starts
+    return np.sort(order[ranks < cap])
+
+METHODS = {
+    'lttb': lttb,
+    'minmax': minmax,
+    'random': random_sample,
+    'density': density_sample,
+}
+
+def reduce_points(df, x, y, max_points, method='lttb', legend=None):
+    """
+    Reduce a DataFrame to at most roughly ``max_points`` rows for plotting.
+
+    The budget is split across legend groups in proportion to their size and each group is
+    reduced separately, so every group keeps its shape. Rows keep their original order.
+    Rows with a missing x or y value are dropped when a reduction is applied.
+
+    Args:
+        df (pd.DataFrame): The DataFrame to reduce.
+        x (str): The column name for the x-axis.
+        y (str): The column name for the y-axis.
+        max_points (int): The point budget.
+        method (str or callable): 'lttb' or 'minmax' for lines, 'random' or 'density' for scatter
+            plots, or a function ``method(x, y, n_out)`` returning the positions to keep (default is 'lttb').
+        legend (str, optional): The column name for the legend (color grouping). Default is None.
+
+    Returns:
+        pd.DataFrame: The reduced DataFrame, or ``df`` itself if it is already small enough.
+    """
+    if len(df) <= max_points:
+        return df
+    reducer = METHODS.get(method) if isinstance(method, str) else method
+    if reducer is None:
+        raise ValueError(f"Unknown reduction method {method!r}. Use one of {list(METHODS)} or a callable.")
+
+    df = df[df[x].notna().to_numpy() & df[y].notna().to_numpy()]
+    x_values = _as_float(df[x])
+    y_values = _as_float(df[y])
+
+    if legend is None:
+        groups = [np.arange(len(df))]
+    else:
+        groups = list(df.groupby(legend, sort=False, dropna=False, observed=True).indices.values())
+
+    selected = []
+    for positions in groups:
+        budget = max(int(max_points * len(positions) / len(df)), 2)
+        keep = reducer(x_values[positions], y_values[positions], budget)
+        selected.append(positions[keep])
+    return df.iloc[np.sort(np.concatenate(selected))]
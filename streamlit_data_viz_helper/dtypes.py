@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+from pandas.api.types import (
+    infer_dtype,
+    is_bool_dtype,
+    is_float_dtype,
+    is_integer_dtype,
+    is_object_dtype,
+    is_string_dtype,
+)
+
+from .config import CATEGORY_MAX_UNIQUE
+
+STRING_STORAGES = (None, 'python', 'pyarrow')
+
+def _optimize_text(series, category_threshold, max_categories, string_storage):
+    if len(series) and series.nunique(dropna=True) <= min(category_threshold * len(series), max_categories):
+        return series.astype('category')
+    if string_storage is not None and infer_dtype(series, skipna=True) == 'string':
+        return series.astype(pd.StringDtype(string_storage))
+    return series
+
+def _downcast_float(series):
+    # Only downcast when every value survives the round trip to float32
+    downcast = series.astype(np.float32)
+    values, restored = series.to_numpy(), downcast.to_numpy().astype(np.float64)
+    if np.array_equal(values, restored, equal_nan=True):
+        return downcast
+    return series
+
+def optimize_dtypes(df, category_threshold=0.05, downcast=True, string_storage=None, max_categories=CATEGORY_MAX_UNIQUE):
+    """
+    Reduce the memory used by a DataFrame by choosing more compact dtypes.
+
+    - Low-cardinality text columns, with at most ``max_categories`` distinct values and a share
+      of distinct values of at most ``category_threshold``, become ``category``. Other text
+      columns can be stored as ``pd.StringDtype(string_storage)``.
+    - Integer columns are downcast to the smallest integer type that holds their values.
+    - Float columns are downcast to ``float32`` only if no value changes.
+
+    Args:
+        df (pd.DataFrame): The DataFrame to optimize.
+        category_threshold (float): Maximum ratio of distinct values to rows for a text
+            column to become categorical (default is 0.05).
+        downcast (bool): Whether to downcast numeric columns (default is True).
+        string_storage (str, optional): 'pyarrow' or 'python' to store the remaining text
+            columns as a string dtype. None leaves them unchanged (default is None).
+        max_categories (int): Maximum number of distinct values for a text column to become
+            categorical (default is config.CATEGORY_MAX_UNIQUE).
+
+    Returns:
+        tuple: ``(optimized DataFrame, report)``, where the report is a DataFrame with one row per
+        column: ``dtype_before``, ``dtype_after``, ``bytes_before``, ``bytes_after`` and ``bytes_saved``.
+    """
+    if string_storage not in STRING_STORAGES:
+        raise ValueError(f"string_storage must be one of {STRING_STORAGES}, got {string_storage!r}")
+
+    optimized = []
+    for position in range(df.shape[1]):
+        series = df.iloc[:, position]
+        if is_bool_dtype(series.dtype) or isinstance(series.dtype, pd.CategoricalDtype):
+            pass
+        elif is_object_dtype(series.dtype) or is_string_dtype(series.dtype):
+            series = _optimize_text(series, category_threshold, max_categories, string_storage)
+        elif downcast and is_integer_dtype(series.dtype):
+            # min() is NA for an empty or all-NA nullable column
+            minimum = series.min()
+            series = pd.to_numeric(series, downcast='unsigned' if pd.notna(minimum) and minimum >= 0 else 'integer')
+        elif downcast and is_float_dtype(series.dtype) and isinstance(series.dtype, np.dtype):
+            series = _downcast_float(series)
+        optimized.append(series)
+    result = pd.concat(optimized, axis=1) if optimized else df.copy()
+    result.columns = df.columns
+
+    bytes_before = df.memory_usage(index=False, deep=True)
+    bytes_after = result.memory_usage(index=False, deep=True)
+    report = pd.DataFrame({
+        'dtype_before': df.dtypes.astype(str),
+        'dtype_after': result.dtypes.astype(str),
+        'bytes_before': bytes_before,
+        'bytes_after': bytes_after,
+        'bytes_saved': bytes_before - bytes_after,
+    })
+    return result, report
@@ -0,0 +1,189 @@
+import os
+import codecs
+import logging
+import threading
+
+from .config import ENCODING_SAMPLE_SIZE
+from .instrumentation import instrument
+from .utils import LazyModule
+
+chardet = LazyModule('chardet')
+
+logger = logging.getLogger(__name__)
+
+# Detected encodings keyed by (absolute path, size, mtime)
+_detected_encodings = {}
+_detected_encodings_lock = threading.Lock()
+
+def _file_key(file_path):
+    stat = os.stat(file_path)
+    return (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+
+@instrument
+def detect_encoding(file_path, sample_size=ENCODING_SAMPLE_SIZE, block_size=64 * 1024):
+    """
+    Detect the encoding of a file from a bounded prefix.
+
+    The file is fed to chardet's incremental detector block by block, stopping as soon as
+    the detector is confident or ``sample_size`` bytes have been read. Results are cached
+    per path, size and modification time, so unchanged files are only inspected once.
+
+    Args:
+        file_path (str): The path to the file.
+        sample_size (int): Maximum number of bytes to inspect (default is config.ENCODING_SAMPLE_SIZE).
+        block_size (int): Number of bytes fed to the detector at a time (default is 64 KiB).
+
+    Returns:
+        str or None: The detected encoding, or None if it could not be determined.
+    """
+    key = _file_key(file_path)
+    with _detected_encodings_lock:
+        if key in _detected_encodings:
+            return _detected_encodings[key]
+
+    detector = chardet.UniversalDetector()
+    bytes_read = 0
+    with open(file_path, 'rb') as f:
+        while bytes_read < sample_size and not detector.done:
+            block = f.read(min(block_size, sample_size - bytes_read))
+            if not block:
+                break
+            detector.feed(block)
+            bytes_read += len(block)
+    detector.close()
+    detected_encoding = detector.result['encoding']
+
+    with _detected_encodings_lock:
+        _detected_encodings[key] = detected_encoding
+    return detected_encoding
+
+def sample_decodes(file_path, encoding, sample_size=ENCODING_SAMPLE_SIZE):
+    """
+    Check whether the first ``sample_size`` bytes of a file decode with an encoding.
+
+    A multi-byte character cut off at the end of the sample is not treated as an error.
+
+    Args:
+        file_path (str): The path to the file.
+        encoding (str): The encoding to try.
+        sample_size (int): Number of bytes to decode (default is config.ENCODING_SAMPLE_SIZE).
+
+    Returns:
+        bool: True if the sample decodes without errors.
+    """
+    try:
+        decoder = codecs.getincrementaldecoder(encoding)()
+    except LookupError:
+        return False
+
+    with open(file_path, 'rb') as f:
+        sample = f.read(sample_size)
+    try:
+        decoder.decode(sample, final=len(sample) < sample_size)
+        return True
+    except UnicodeDecodeError:
+        return False
+
+@instrument
+def resolve_encoding(file_path, encodings, sample_size=ENCODING_SAMPLE_SIZE):
+    """
+    Pick the encoding to use for a file.
+
+    Each candidate is tried on a bounded sample in order; the first one that decodes it
+    is returned. If none does, the encoding is detected with :func:`detect_encoding`.
+
+    Args:
+        file_path (str): The path to the file.
+        encodings (str or list of str): Candidate encodings, e.g. ['utf-8', 'cp932', 'euc-jp'].
+        sample_size (int): Number of bytes to sample (default is config.ENCODING_SAMPLE_SIZE).
+
+    Returns:
+        str or None: The encoding to use.
+    """
+    if isinstance(encodings, str):
+        encodings = [encodings]
+    for encoding in encodings:
+        if sample_decodes(file_path, encoding, sample_size=sample_size):
+            return encoding
+    return detect_encoding(file_path, sample_size=sample_size)
+
+def _codec_name(encoding):
+    try:
+        return codecs.lookup(encoding).name
+    except LookupError:
+        return encoding
+
+def fallback_encodings(file_path, encodings, failed, sample_size=ENCODING_SAMPLE_SIZE):
+    """
+    List the encodings to retry when ``failed`` decoded the sample but not a later part of the file.
+
+    These are the candidates after ``failed`` that also decode the sample, in order, followed by
+    the encoding detected with :func:`detect_encoding`. Aliases of encodings already listed, or
+    of ``failed``, are left out.
+
+    Args:
+        file_path (str): The path to the file.
+        encodings (str or list of str): The candidate encodings given to :func:`resolve_encoding`.
+        failed (str): The encoding that failed.
+        sample_size (int): Number of bytes to sample (default is config.ENCODING_SAMPLE_SIZE).
+
+    Returns:
+        list of str: The encodings to retry, in order.
+    """
+    if isinstance(encodings, str):
+        encodings = [encodings]
+    names = [_codec_name(encoding) for encoding in encodings]
+    failed_name = _codec_name(failed)
+    remaining = encodings[names.index(failed_name) + 1:] if failed_name in names else []
+    retries = [encoding for encoding in remaining if sample_decodes(file_path, encoding, sample_size=sample_size)]
+    detected_encoding = detect_encoding(file_path, sample_size=sample_size)
+    if detected_encoding is not None:
+        retries.append(detected_encoding)
+
+    seen = {failed_name}
+    unique = []
+    for encoding in retries:
+        if _codec_name(encoding) not in seen:
+            seen.add(_codec_name(encoding))
+            unique.append(encoding)
+    return unique
+
+def read_with_fallback(read, file_path, encoding, encodings=None, sample_size=ENCODING_SAMPLE_SIZE):
+    """
+    Call ``read(encoding)``, retrying with :func:`fallback_encodings` if the file fails to decode.
+
+    Use it with the encoding picked by :func:`resolve_encoding`, which only checks a sample of the
+    file, so a part past the sample can still fail to decode.
+
+    Args:
+        read (callable): Reads the file with the encoding passed to it.
+        file_path (str): The path to the file.
+        encoding (str): The encoding to try first.
+        encodings (str or list of str, optional): The candidate encodings ``encoding`` was picked from.
+            None means ``[encoding]`` (default is None).
+        sample_size (int): Number of bytes to sample (default is config.ENCODING_SAMPLE_SIZE).
+
+    Returns:
+        object: The result of ``read``.
+
+    Raises:
+        UnicodeDecodeError: If no encoding decodes the file.
+    """
+    try:
+        return read(encoding)
+    except UnicodeDecodeError as e:
+        error = e
+    for retry in fallback_encodings(file_path, encodings or [encoding], encoding, sample_size=sample_size):
+        logger.info(f"Encoding error detected. Retrying with encoding: {retry}")
+        try:
+            return read(retry)
+        except UnicodeDecodeError as e:
+            error = e
+    raise error
+
+def clear_encoding_cache():
+    """
+    Clear the cache of detected encodings.
+    """
+    with _detected_encodings_lock:
+        _detected_encodings.clear()
@@ -0,0 +1,72 @@
+import io
+import gzip
+import zipfile
+
+from .config import CHUNKSIZE, EXPORT_CACHE_MAX_BYTES, EXPORT_CACHE_SIZE
+from .instrumentation import instrument
+from .utils import LRUCache, dataframe_content_hash
+
+COMPRESSIONS = (None, 'gzip', 'zip')
+
+_exports = LRUCache(maxsize=EXPORT_CACHE_SIZE, max_bytes=EXPORT_CACHE_MAX_BYTES, sizeof=len)
+
+def _write_csv(df, stream, encoding, index, chunksize):
+    text = io.TextIOWrapper(stream, encoding=encoding, newline='')
+    for start in range(0, max(len(df), 1), chunksize):
+        df.iloc[start:start + chunksize].to_csv(text, header=start == 0, index=index)
+    text.flush()
+    text.detach()
+
+@instrument
+def dataframe_to_csv_bytes(df, encoding='utf_8_sig', index=True, compression=None, file_name='data.csv', chunksize=CHUNKSIZE, use_cache=True):
+    """
+    Encode a DataFrame as CSV bytes, writing it in chunks straight into a byte buffer.
+
+    Only one chunk of text exists at a time, instead of the whole CSV as a string plus its
+    encoded copy. Results are cached per DataFrame content and options, so repeated downloads
+    of the same data are served without encoding it again. The cache holds at most
+    config.EXPORT_CACHE_MAX_BYTES, and larger exports are not cached.
+
+    Args:
+        df (pd.DataFrame): The DataFrame to export.
+        encoding (str): Text encoding. 'utf_8_sig' adds a BOM so Excel reads Japanese text correctly (default is 'utf_8_sig').
+        index (bool): Whether to write the index (default is True).
+        compression (str, optional): None, 'gzip' or 'zip' (default is None).
+        file_name (str): Name of the CSV file inside a zip archive (default is 'data.csv').
+        chunksize (int): Number of rows formatted at a time (default is config.CHUNKSIZE).
+        use_cache (bool): Whether to reuse previously encoded bytes (default is True).
+
+    Returns:
+        bytes: The encoded, optionally compressed, CSV.
+    """
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"compression must be one of {COMPRESSIONS}, got {compression!r}")
+
+    key = None
+    if use_cache:
+        key = (dataframe_content_hash(df), encoding, index, compression, file_name)
+        data = _exports.get(key)
+        if data is not None:
+            return data
+
+    buffer = io.BytesIO()
+    if compression == 'gzip':
+        with gzip.GzipFile(fileobj=buffer, mode='wb') as stream:
+            _write_csv(df, stream, encoding, index, chunksize)
+    elif compression == 'zip':
+        with zipfile.ZipFile(buffer, mode='w', compression=zipfile.ZIP_DEFLATED) as archive:
+            with archive.open(file_name, mode='w', force_zip64=True) as stream:
+                _write_csv(df, stream, encoding, index, chunksize)
+    else:
+        _write_csv(df, buffer, encoding, index, chunksize)
+
+    data = buffer.getvalue()
+    if key is not None:
+        _exports.put(key, data)
+    return data
+
+def clear_export_cache():
+    """
+    Clear the cache of encoded CSV exports.
+    """
+    _exports.clear()
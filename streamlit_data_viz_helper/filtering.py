@@ -0,0 +1,561 @@
+import datetime
+import warnings
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import (
+    is_datetime64_any_dtype,
+    is_numeric_dtype,
+    is_object_dtype,
+    is_string_dtype,
+)
+from pandas.tseries.api import guess_datetime_format
+
+from .config import CATEGORICAL_THRESHOLD, CATEGORY_MULTISELECT_MAX, INDEX_CACHE_SIZE, PROFILE_CACHE_SIZE
+from .instrumentation import instrument
+from .sketches import SubstringIndex, approx_nunique, sample_nunique, sample_quantiles, sample_values
+from .utils import LRUCache, dataframe_key
+
+# Number of values parsed before attempting a full datetime conversion of a text column
+DATETIME_PROBE_SIZE = 100
+
+# Categorical columns with more distinct values than this are indexed without bitmaps
+MAX_BITMAPS = 64
+
+_profiles = LRUCache(maxsize=PROFILE_CACHE_SIZE)
+_indexes = LRUCache(maxsize=INDEX_CACHE_SIZE)
+
+@dataclass
+class ColumnProfile:
+    """
+    Summary of a column used to build its filter widget.
+
+    Attributes:
+        kind (str): 'categorical', 'numeric', 'datetime' or 'text'. ``category`` columns are
+            'categorical' unless they have more than config.CATEGORY_MULTISELECT_MAX values.
+        nunique (int): Number of distinct non-null values. For columns that are not categorical,
+            estimated with a HyperLogLog sketch for numeric and datetime columns and from the
+            sampled rows for text.
+        min (object): Minimum value for numeric and datetime columns, otherwise None.
+        max (object): Maximum value for numeric and datetime columns, otherwise None.
+        quantiles (dict): The quartiles of numeric and datetime columns estimated from a sample,
+            otherwise empty.
+        values (list): Distinct values of categorical columns, otherwise empty.
+        parse_datetime (bool): True if the column holds text that converts to datetimes.
+        datetime_format (str or None): The inferred format of such text, if one was found.
+    """
+    kind: str
+    nunique: int
+    min: object = None
+    max: object = None
+    quantiles: dict = field(default_factory=dict)
+    values: list = field(default_factory=list)
+    parse_datetime: bool = False
+    datetime_format: str = None
+
+def _parse_datetimes(series, datetime_format=None):
+    """Convert text to timezone-naive datetimes, raising if any value does not parse."""
+    if datetime_format is not None:
+        try:
+            return pd.to_datetime(series, format=datetime_format)
+        except (ValueError, TypeError):
+            pass
+    return pd.to_datetime(series)
+
+def _detect_datetime_text(series):
+    """
+    Return ``(converted, format)`` if a text column holds datetimes, otherwise None.
+
+    A small probe is parsed first so that columns of ordinary text are rejected without
+    attempting to parse every row.
+    """
+    non_null = series.dropna()
+    if non_null.empty:
+        return None
+    first = non_null.iloc[0]
+    datetime_format = guess_datetime_format(first) if isinstance(first, str) else None
+
+    with warnings.catch_warnings():
+        # pandas warns when it has to fall back to parsing values one by one
+        warnings.simplefilter('ignore', UserWarning)
+        try:
+            _parse_datetimes(non_null.iloc[:DATETIME_PROBE_SIZE], datetime_format)
+            return _parse_datetimes(series, datetime_format), datetime_format
+        except Exception:
+            return None
+
+def _profile_column(series):
+    parse_datetime = False
+    datetime_format = None
+    if is_object_dtype(series) or is_string_dtype(series):
+        detected = _detect_datetime_text(series)
+        if detected is not None:
+            series, datetime_format = detected
+            parse_datetime = True
+    if is_datetime64_any_dtype(series):
+        series = series.dt.tz_localize(None)
+
+    is_category = isinstance(series.dtype, pd.CategoricalDtype)
+    sample = sample_values(series)
+    if is_category or sample.nunique() < CATEGORICAL_THRESHOLD:
+        nunique = series.nunique()
+    elif is_numeric_dtype(series) or is_datetime64_any_dtype(series):
+        # The sample already has too many distinct values for a multiselect, so an estimate will do
+        nunique = approx_nunique(series)
+    else:
+        # Hashing every string costs as much as counting them exactly, so text is estimated from the sample
+        nunique = sample_nunique(sample, len(series))
+
+    profile = ColumnProfile(kind='text', nunique=nunique, parse_datetime=parse_datetime, datetime_format=datetime_format)
+    # category columns get a multiselect of their values, unless there are too many to pick from
+    if nunique < CATEGORICAL_THRESHOLD or (is_category and nunique <= CATEGORY_MULTISELECT_MAX):
+        profile.kind = 'categorical'
+        profile.values = list(series.unique())
+        return profile
+    if is_category:
+        return profile
+    if is_numeric_dtype(series):
+        profile.kind = 'numeric'
+    elif is_datetime64_any_dtype(series):
+        profile.kind = 'datetime'
+    else:
+        return profile
+    # The bounds stay exact, as they are the default range of the filter widgets
+    profile.min, profile.max = series.min(), series.max()
+    profile.quantiles = sample_quantiles(sample)
+    return profile
+
+@instrument
+def profile_dataframe(df, key=None):
+    """
+    Profile every column of a DataFrame for filtering.
+
+    Detecting datetime text and computing distinct counts and bounds is expensive on large
+    frames, so profiles are memoized per process, keyed on
+    :func:`~streamlit_data_viz_helper.utils.dataframe_key`. Repeated calls for the same
+    DataFrame, such as on every Streamlit rerun, return the cached profile without reading its
+    rows, and a frame that differs in any row is profiled again.
+
+    Args:
+        df (pd.DataFrame): The DataFrame to profile.
+        key (str, optional): ``dataframe_key(df)``, if the caller already has it (default is None).
+
+    Returns:
+        dict: Mapping of column name to :class:`ColumnProfile`.
+    """
+    if key is None:
+        key = dataframe_key(df)
+    profiles = _profiles.get(key)
+    if profiles is None:
+        profiles = {column: _profile_column(df[column]) for column in df.columns}
+        _profiles.put(key, profiles)
+    return profiles
+
+@instrument
+def coerce_datetimes(df, profiles=None):
+    """
+    Convert datetime text columns to datetimes and drop timezones, as found by :func:`profile_dataframe`.
+
+    Only columns known to hold datetimes are converted, using their inferred format. The other
+    columns are shared with ``df`` rather than copied, and ``df`` itself is returned when nothing
+    needs converting.
+
+    Args:
+        df (pd.DataFrame): The DataFrame to convert.
+        profiles (dict, optional): The profiles of ``df``. Computed if omitted (default is None).
+
+    Returns:
+        pd.DataFrame: ``df`` with converted columns.
+    """
+    if profiles is None:
+        profiles = profile_dataframe(df)
+
+    converted = {}
+    for column, profile in profiles.items():
+        series = original = df[column]
+        if profile.parse_datetime:
+            series = _parse_datetimes(series, profile.datetime_format)
+        if is_datetime64_any_dtype(series) and series.dt.tz is not None:
+            series = series.dt.tz_localize(None)
+        if series is not original:
+            converted[column] = series
+    if not converted:
+        return df
+
+    # A shallow copy: only the replaced columns are new, the rest still share df's data
+    df = df.copy(deep=False)
+    for column, series in converted.items():
+        df[column] = series
+    return df
+
+@dataclass
+class FilterCondition:
+    """
+    A single column filter.
+
+    Attributes:
+        column (str): The column to filter on.
+        op (str): 'isin', 'between' or 'contains'.
+        value (object): The list of values for 'isin', a ``(low, high)`` tuple for 'between'
+            (inclusive) or a substring/regex for 'contains'.
+    """
+    column: str
+    op: str
+    value: object
+
+FILTER_OPS = ('isin', 'between', 'contains')
+
+@dataclass
+class FilterSpec:
+    """
+    A set of column filters that are combined with AND.
+
+    The spec is independent of Streamlit: it can be built by
+    :func:`~streamlit_data_viz_helper.streamlit_helpers.build_filter_spec` from widgets, or
+    programmatically, and applied to any DataFrame with :func:`apply_filter_spec`.
+
+    Example:
+        >>> spec = FilterSpec().isin("City", ["Tokyo"]).between("Age", 20, 40)
+        >>> filtered = apply_filter_spec(df, spec)
+    """
+    conditions: list = field(default_factory=list)
+
+    def add(self, column, op, value):
+        """
+        Add a condition and return the spec, so calls can be chained.
+
+        Args:
+            column (str): The column to filter on.
+            op (str): 'isin', 'between' or 'contains'.
+            value (object): The filter value, see :class:`FilterCondition`.
+
+        Returns:
+            FilterSpec: This spec.
+        """
+        if op not in FILTER_OPS:
+            raise ValueError(f"op must be one of {FILTER_OPS}, got {op!r}")
+        self.conditions.append(FilterCondition(column, op, value))
+        return self
+
+    def isin(self, column, values):
+        """Keep rows whose ``column`` value is one of ``values``."""
+        return self.add(column, 'isin', list(values))
+
+    def between(self, column, low, high):
+        """Keep rows whose ``column`` value lies between ``low`` and ``high`` (inclusive)."""
+        return self.add(column, 'between', (low, high))
+
+    def contains(self, column, pattern):
+        """Keep rows whose ``column`` value, as text, contains the substring or regex ``pattern``."""
+        return self.add(column, 'contains', pattern)
+
+    def __len__(self):
+        return len(self.conditions)
+
+    @classmethod
+    def from_dict(cls, where):
+        """
+        Build a spec from a mapping of column name to condition.
+
+        A ``(low, high)`` tuple keeps a range (inclusive), a list or set keeps those values and
+        any other value keeps rows equal to it.
+
+        Example:
+            >>> spec = FilterSpec.from_dict({"Date": ("2024-01-01", "2024-03-31"), "City": ["Tokyo", "Osaka"]})
+
+        Args:
+            where (dict or FilterSpec): The conditions. A FilterSpec is returned unchanged.
+
+        Returns:
+            FilterSpec: The spec.
+        """
+        if isinstance(where, cls):
+            return where
+        spec = cls()
+        for column, value in where.items():
+            if isinstance(value, tuple):
+                if len(value) != 2:
+                    raise ValueError(f"Range for {column!r} must be a (low, high) tuple, got {value!r}")
+                spec.between(column, *value)
+            elif isinstance(value, (list, set, frozenset)):
+                spec.isin(column, value)
+            else:
+                spec.isin(column, [value])
+        return spec
+
+    @property
+    def columns(self):
+        """list: The columns the conditions refer to, without duplicates."""
+        return list(dict.fromkeys(condition.column for condition in self.conditions))
+
+def _is_datetime_bound(value):
+    return isinstance(value, (pd.Timestamp, np.datetime64, datetime.date))
+
+def _condition_mask(series, condition):
+    if condition.op == 'isin':
+        mask = series.isin(condition.value)
+    elif condition.op == 'between':
+        if any(_is_datetime_bound(value) for value in condition.value) and not is_datetime64_any_dtype(series.dtype):
+            # Text read from a file without parsing its dates; values that do not parse never match
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', UserWarning)
+                series = pd.to_datetime(series, errors='coerce')
+        mask = series.between(*condition.value)
+    else:
+        mask = series.astype(str).str.contains(condition.value)
+    return mask.to_numpy(dtype=bool, na_value=False)
+
+def build_mask(df, spec):
+    """
+    Combine the conditions of a filter spec into one boolean mask.
+
+    Each condition is evaluated on the original column and AND-ed into a single NumPy array,
+    so no intermediate DataFrames are created.
+
+    Args:
+        df (pd.DataFrame): The DataFrame to evaluate the conditions on.
+        spec (FilterSpec): The filters.
+
+    Returns:
+        np.ndarray: A boolean array with one entry per row of ``df``.
+    """
+    mask = np.ones(len(df), dtype=bool)
+    for condition in spec.conditions:
+        mask &= _condition_mask(df[condition.column], condition)
+    return mask
+
+@instrument
+def apply_filter_spec(df, spec, index=None):
+    """
+    Filter a DataFrame with a filter spec, indexing it once at the end.
+
+    Datetime conditions compare against datetime values, so without an ``index``, text columns
+    holding datetimes should be converted first, e.g. with :func:`coerce_datetimes`.
+
+    Args:
+        df (pd.DataFrame): The DataFrame to filter.
+        spec (FilterSpec): The filters.
+        index (DataFrameIndex, optional): A prebuilt index of ``df`` used to evaluate the
+            conditions (default is None).
+
+    Returns:
+        pd.DataFrame: The rows of ``df`` matching every condition.
+    """
+    if not spec.conditions:
+        return df
+    mask = build_mask(df, spec) if index is None else index.mask(df, spec)
+    return df[mask]
+
+class CategoryIndex:
+    """
+    Index of a low-cardinality column: a code per row and a packed row bitmap per distinct value.
+
+    ``isin`` filters become a bitwise OR of the selected values' bitmaps. Columns with more than
+    ``MAX_BITMAPS`` distinct values (e.g. wide ``category`` columns) keep only the codes and
+    match them with ``np.isin``. The codes of ``category`` columns are used as they are.
+
+    Args:
+        series (pd.Series): The column to index.
+    """
+    ops = ('isin',)
+
+    def __init__(self, series):
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            codes = series.cat.codes.to_numpy()
+            values = list(series.cat.categories)
+            if (codes == -1).any():
+                codes = np.where(codes == -1, len(values), codes)
+                values.append(np.nan)
+        else:
+            codes, uniques = pd.factorize(series, use_na_sentinel=False)
+            values = list(uniques)
+        self.size = len(series)
+        self.values = values
+        self._lookup = pd.Index(values)
+        if len(values) <= MAX_BITMAPS:
+            self.codes = None
+            self.bitmaps = [np.packbits(codes == code) for code in range(len(values))]
+        else:
+            self.codes = codes
+            self.bitmaps = None
+
+    def mask(self, condition):
+        """
+        Evaluate an 'isin' condition.
+
+        Args:
+            condition (FilterCondition): The condition.
+
+        Returns:
+            np.ndarray: A boolean array with one entry per row.
+        """
+        codes = self._lookup.get_indexer(list(condition.value))
+        if self.bitmaps is None:
+            return np.isin(self.codes, codes[codes >= 0])
+        bitmaps = [self.bitmaps[code] for code in set(codes) if code >= 0]
+        if not bitmaps:
+            return np.zeros(self.size, dtype=bool)
+        return np.unpackbits(np.bitwise_or.reduce(bitmaps), count=self.size).astype(bool)
+
+class SortedIndex:
+    """
+    Index of a numeric or datetime column: its non-null values in sorted order with their row positions.
+
+    Range filters become two binary searches, and the bounds are the first and last sorted values.
+
+    Args:
+        series (pd.Series): The column to index.
+    """
+    ops = ('between',)
+
+    def __init__(self, series):
+        if isinstance(series.dtype, np.dtype):
+            values = series.to_numpy()
+        else:
+            # Nullable extension dtypes
+            values = series.to_numpy(dtype='float64', na_value=np.nan)
+
+        valid = np.flatnonzero(~pd.isna(values))
+        order = np.argsort(values[valid], kind='stable')
+        self.size = len(series)
+        self.positions = valid[order]
+        self.sorted_values = values[self.positions]
+
+    @property
+    def min(self):
+        """The smallest non-null value, or None if the column is empty."""
+        return self.sorted_values[0] if len(self.sorted_values) else None
+
+    @property
+    def max(self):
+        """The largest non-null value, or None if the column is empty."""
+        return self.sorted_values[-1] if len(self.sorted_values) else None
+
+    def _convert(self, value):
+        if self.sorted_values.dtype.kind == 'M':
+            return np.datetime64(pd.Timestamp(value)).astype(self.sorted_values.dtype)
+        return value
+
+    def mask(self, condition):
+        """
+        Evaluate a 'between' condition (inclusive on both ends).
+
+        Args:
+            condition (FilterCondition): The condition.
+
+        Returns:
+            np.ndarray: A boolean array with one entry per row.
+        """
+        low, high = condition.value
+        start = np.searchsorted(self.sorted_values, self._convert(low), side='left')
+        stop = np.searchsorted(self.sorted_values, self._convert(high), side='right')
+        mask = np.zeros(self.size, dtype=bool)
+        mask[self.positions[start:stop]] = True
+        return mask
+
+class DataFrameIndex:
+    """
+    Per-column indexes of a DataFrame, built lazily the first time a column is filtered.
+
+    Categorical columns get a :class:`CategoryIndex`, numeric and datetime columns a
+    :class:`SortedIndex` and text columns a :class:`~streamlit_data_viz_helper.sketches.SubstringIndex`.
+    Text columns holding datetimes are indexed on their converted values,
+    so the index can be used directly with the original DataFrame. The index holds no
+    reference to the DataFrame itself.
+
+    Args:
+        df (pd.DataFrame): The DataFrame to index.
+        profiles (dict, optional): The profiles of ``df``. Computed if omitted (default is None).
+    """
+
+    def __init__(self, df, profiles=None):
+        self.size = len(df)
+        self.profiles = profiles if profiles is not None else profile_dataframe(df)
+        self._columns = {}
+
+    def _series(self, df, column):
+        """Return a column as filtered: datetime text converted and timezones dropped."""
+        profile = self.profiles[column]
+        series = df[column]
+        if profile.parse_datetime:
+            series = _parse_datetimes(series, profile.datetime_format)
+        if is_datetime64_any_dtype(series):
+            series = series.dt.tz_localize(None)
+        return series
+
+    def column(self, df, column):
+        """
+        Return the index of a column, building it on first use.
+
+        Args:
+            df (pd.DataFrame): The indexed DataFrame.
+            column (str): The column name.
+
+        Returns:
+            CategoryIndex, SortedIndex or SubstringIndex: The column index.
+        """
+        if column not in self._columns:
+            profile = self.profiles[column]
+            series = self._series(df, column)
+            if profile.kind == 'categorical':
+                self._columns[column] = CategoryIndex(series)
+            elif profile.kind in ('numeric', 'datetime'):
+                self._columns[column] = SortedIndex(series)
+            else:
+                self._columns[column] = SubstringIndex(series)
+        return self._columns[column]
+
+    def mask(self, df, spec):
+        """
+        Combine the conditions of a filter spec into one boolean mask using the column indexes.
+
+        Conditions that no index supports are evaluated on the column, as in :func:`build_mask`.
+
+        Args:
+            df (pd.DataFrame): The indexed DataFrame.
+            spec (FilterSpec): The filters.
+
+        Returns:
+            np.ndarray: A boolean array with one entry per row of ``df``.
+        """
+        mask = np.ones(self.size, dtype=bool)
+        for condition in spec.conditions:
+            index = self.column(df, condition.column)
+            if index is not None and condition.op in index.ops:
+                mask &= index.mask(condition)
+            else:
+                mask &= _condition_mask(self._series(df, condition.column), condition)
+        return mask
+
+@instrument
+def index_dataframe(df, profiles=None, key=None):
+    """
+    Return the :class:`DataFrameIndex` of a DataFrame, reusing it across calls for the same data.
+
+    Indexes are memoized per process, keyed on
+    :func:`~streamlit_data_viz_helper.utils.dataframe_key` like the profiles, as their row
+    masks are only valid for frames with exactly the same values.
+
+    Args:
+        df (pd.DataFrame): The DataFrame to index.
+        profiles (dict, optional): The profiles of ``df``. Computed if omitted (default is None).
+        key (str, optional): ``dataframe_key(df)``, if the caller already has it (default is None).
+
+    Returns:
+        DataFrameIndex: The index.
+    """
+    if key is None:
+        key = dataframe_key(df)
+    index = _indexes.get(key)
+    if index is None:
+        index = DataFrameIndex(df, profiles)
+        _indexes.put(key, index)
+    return index
+
+def clear_profile_cache():
+    """
+    Clear the memoized DataFrame profiles and indexes.
+    """
+    _profiles.clear()
+    _indexes.clear()
@@ -0,0 +1,236 @@
+import time
+import logging
+import tracemalloc
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass
+from functools import wraps
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# The recorder of the current context; None means instrumentation is off
+_current = ContextVar('streamlit_data_viz_helper_recorder', default=None)
+
+@dataclass
+class CallRecord:
+    """
+    The measurements of one instrumented call.
+
+    Attributes:
+        name (str): The instrumented function or block, e.g. 'data_processing.load_csv_to_dataframe'.
+        seconds (float): Wall time, including nested instrumented calls.
+        rows_in (int or None): Rows of the first DataFrame argument, if any.
+        rows_out (int or None): Rows of the returned DataFrame, if any.
+        bytes_allocated (int or None): Peak memory allocated during the call, above what was in use
+            when it started. Only measured when the recorder traces memory.
+        depth (int): Nesting level; 0 for calls made directly by the app.
+    """
+    name: str
+    seconds: float = 0.0
+    rows_in: int = None
+    rows_out: int = None
+    bytes_allocated: int = None
+    depth: int = 0
+
+class Recorder:
+    """
+    Collects a :class:`CallRecord` for each instrumented call made while it is active.
+
+    Use :func:`record` to activate a recorder rather than creating one directly.
+
+    Args:
+        trace_memory (bool): Whether to measure allocations with tracemalloc. This slows the
+            instrumented code down noticeably (default is False).
+    """
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.records = []
+        # One [bytes in use at entry, peak seen by finished children] pair per open call
+        self._stack = []
+
+    @contextmanager
+    def measure(self, name, rows_in=None):
+        """
+        Record a block of code under ``name``.
+
+        Args:
+            name (str): The name of the block.
+            rows_in (int, optional): The number of input rows (default is None).
+
+        Yields:
+            CallRecord: The record, so the block can set ``rows_out``.
+        """
+        entry = CallRecord(name, rows_in=rows_in, depth=len(self._stack))
+        self.records.append(entry)
+        frame = [0, 0]
+        if self.trace_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            if self._stack:
+                # reset_peak() forgets the enclosing call's peak, so hand it up first
+                self._stack[-1][1] = max(self._stack[-1][1], peak)
+            tracemalloc.reset_peak()
+            frame = [current, current]
+        self._stack.append(frame)
+
+        start = time.perf_counter()
+        try:
+            yield entry
+        finally:
+            entry.seconds = time.perf_counter() - start
+            self._stack.pop()
+            if self.trace_memory:
+                peak = max(tracemalloc.get_traced_memory()[1], frame[1])
+                entry.bytes_allocated = peak - frame[0]
+                if self._stack:
+                    self._stack[-1][1] = max(self._stack[-1][1], peak)
+
+    def to_dicts(self):
+        """
+        Return the records as plain dictionaries, in call order.
+
+        Returns:
+            list of dict: One dictionary per call.
+        """
+        return [asdict(entry) for entry in self.records]
+
+    def summary(self):
+        """
+        Aggregate the records per name.
+
+        Returns:
+            pd.DataFrame: One row per name with ``calls``, total ``seconds``, total ``rows_in`` and
+            ``rows_out`` and the largest ``bytes_allocated``, slowest first.
+        """
+        columns = ['name', 'calls', 'seconds', 'rows_in', 'rows_out', 'bytes_allocated']
+        if not self.records:
+            return pd.DataFrame(columns=columns)
+        grouped = pd.DataFrame(self.to_dicts()).groupby('name', sort=False)
+        summary = pd.DataFrame({
+            'calls': grouped.size(),
+            'seconds': grouped['seconds'].sum(),
+            # min_count keeps "not measured" apart from zero rows
+            'rows_in': grouped['rows_in'].sum(min_count=1),
+            'rows_out': grouped['rows_out'].sum(min_count=1),
+            'bytes_allocated': grouped['bytes_allocated'].max(),
+        })
+        return summary.reset_index().sort_values('seconds', ascending=False, ignore_index=True)[columns]
+
+    def log(self, log=None, level=logging.INFO):
+        """
+        Emit one log record per call, with the measurements in ``extra['instrumentation']``.
+
+        Args:
+            log (logging.Logger, optional): The logger to use (default is this module's logger).
+            level (int): The log level (default is logging.INFO).
+        """
+        log = log or logger
+        for entry in self.records:
+            log.log(
+                level,
+                f"{'  ' * entry.depth}{entry.name}: {entry.seconds * 1000:.1f} ms",
+                extra={'instrumentation': asdict(entry)},
+            )
+
+    def clear(self):
+        """Forget all records."""
+        self.records = []
+
+@contextmanager
+def record(trace_memory=False):
+    """
+    Record every instrumented call made in the block.
+
+    Example:
+        >>> with record() as recorder:
+        ...     df = load_all_files_in_folder("data")
+        ...     fig = create_histogram(df, x="Age")
+        >>> recorder.summary()
+
+    Args:
+        trace_memory (bool): Whether to measure allocations with tracemalloc, which is started
+            for the block if it is not already running (default is False).
+
+    Yields:
+        Recorder: The active recorder.
+    """
+    recorder = Recorder(trace_memory=trace_memory)
+    started = trace_memory and not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    token = _current.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _current.reset(token)
+        if started:
+            tracemalloc.stop()
+
+def current_recorder():
+    """
+    Return the active recorder.
+
+    Returns:
+        Recorder or None: The recorder of the current :func:`record` block, if any.
+    """
+    return _current.get()
+
+@contextmanager
+def measure(name, rows_in=None):
+    """
+    Record a block of app code alongside the instrumented library calls.
+
+    Does nothing outside a :func:`record` block.
+
+    Args:
+        name (str): The name of the block.
+        rows_in (int, optional): The number of input rows (default is None).
+
+    Yields:
+        CallRecord or None: The record, or None when nothing is being recorded.
+    """
+    recorder = _current.get()
+    if recorder is None:
+        yield None
+        return
+    with recorder.measure(name, rows_in=rows_in) as entry:
+        yield entry
+
+def _count_rows(value):
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return len(value)
+    if isinstance(value, tuple) and value and isinstance(value[0], pd.DataFrame):
+        return len(value[0])
+    return None
+
+def instrument(func=None, *, name=None):
+    """
+    Decorator recording the calls of a function while a :func:`record` block is active.
+
+    Outside a block the overhead is a single context variable lookup.
+
+    Args:
+        func (callable): The function to instrument.
+        name (str, optional): The record name (default is ``module.qualname`` without the package).
+
+    Returns:
+        callable: The instrumented function.
+    """
+    if func is None:
+        return lambda func: instrument(func, name=name)
+
+    label = name or f"{func.__module__.rsplit('.', 1)[-1]}.{func.__qualname__}"
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        recorder = _current.get()
+        if recorder is None:
+            return func(*args, **kwargs)
+        rows_in = next((_count_rows(value) for value in (*args, *kwargs.values()) if isinstance(value, pd.DataFrame)), None)
+        with recorder.measure(label, rows_in=rows_in) as entry:
+            result = func(*args, **kwargs)
+            entry.rows_out = _count_rows(result)
+            return result
+    return wrapper
@@ -0,0 +1,207 @@
+import os
+import json
+import logging
+import threading
+import weakref
+from collections import OrderedDict
+
+from .config import REGISTRY_MAX_BYTES
+
+logger = logging.getLogger(__name__)
+
+def _path_signature(value):
+    """Size and mtime of the file, or of every file in the folder, that a loader argument names."""
+    if not isinstance(value, (str, os.PathLike)) or not os.path.exists(value):
+        return None
+    if os.path.isfile(value):
+        stat = os.stat(value)
+        return [stat.st_size, stat.st_mtime_ns]
+    signature = []
+    for root, _, files in os.walk(value):
+        for file_name in sorted(files):
+            stat = os.stat(os.path.join(root, file_name))
+            signature.append([os.path.relpath(os.path.join(root, file_name), value), stat.st_size, stat.st_mtime_ns])
+    return sorted(signature)
+
+class _Dataset:
+    """One loaded DataFrame and the number of leases holding it."""
+
+    def __init__(self, key):
+        self.key = key
+        self.df = None
+        self.nbytes = 0
+        self.refs = 0
+        self.lock = threading.Lock()
+
+class DatasetLease:
+    """
+    A reference to a dataset of a :class:`DatasetRegistry`.
+
+    Created by :meth:`DatasetRegistry.acquire`. The dataset cannot be evicted until the lease is
+    released, either explicitly, at the end of a ``with`` block, or when the lease is garbage
+    collected, e.g. with the Streamlit session that stored it.
+
+    Attributes:
+        key (tuple): The registry key of the dataset.
+        df (pd.DataFrame): A shallow copy of the shared DataFrame. With copy-on-write, which pandas
+            3.0 (required by this package) always uses, writes to it copy the modified columns
+            instead of changing the shared data.
+    """
+
+    def __init__(self, registry, dataset):
+        self.key = dataset.key
+        self.df = dataset.df.copy(deep=False)
+        self._finalizer = weakref.finalize(self, registry._release, dataset)
+
+    @property
+    def released(self):
+        """bool: True once the lease has been released."""
+        return not self._finalizer.alive
+
+    def release(self):
+        """
+        Release the dataset. Calling this more than once has no effect.
+        """
+        self._finalizer()
+
+    def __enter__(self):
+        return self.df
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+class DatasetRegistry:
+    """
+    A process-wide, reference-counted store of loaded DataFrames shared between sessions.
+
+    Each dataset is loaded once by calling a loader, such as
+    :func:`~streamlit_data_viz_helper.data_processing.load_all_files_in_folder`, and every
+    session requesting the same call gets a lease on the same data instead of its own copy.
+    Concurrent requests wait for the first load. Paths passed to the loader are part of the key
+    through the size and mtime of their files, so edited files are loaded again.
+
+    Datasets nobody holds a lease on stay loaded for reuse until the idle ones, least recently
+    used first, have to be evicted to bring the total under ``max_bytes``. Datasets in use are
+    never evicted, so the total can exceed the budget while they are held.
+
+    Args:
+        max_bytes (int): Memory budget in bytes (default is config.REGISTRY_MAX_BYTES).
+    """
+
+    def __init__(self, max_bytes=REGISTRY_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.total_bytes = 0
+        self._datasets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def key(self, loader, *args, **kwargs):
+        """
+        Return the key a loader call is shared under.
+
+        Args:
+            loader (callable): The loader.
+            *args: Positional arguments for the loader.
+            **kwargs: Keyword arguments for the loader.
+
+        Returns:
+            tuple: ``(call, files)``, the JSON encoded call and the signature of the files it reads.
+        """
+        call = json.dumps([loader.__module__, loader.__qualname__, args, kwargs], sort_keys=True, default=repr)
+        files = json.dumps([_path_signature(value) for value in (*args, *kwargs.values())])
+        return call, files
+
+    def acquire(self, loader, *args, **kwargs):
+        """
+        Load a dataset, or share the one already loaded by the same call, and lease it.
+
+        Example:
+            >>> with dataset_registry.acquire(load_all_files_in_folder, "data", schema="infer") as df:
+            ...     st.dataframe(filter_dataframe(df))
+
+        Args:
+            loader (callable): A function returning a DataFrame.
+            *args: Positional arguments for the loader.
+            **kwargs: Keyword arguments for the loader.
+
+        Returns:
+            DatasetLease: The lease, whose ``df`` is a view of the shared DataFrame.
+        """
+        key = self.key(loader, *args, **kwargs)
+        with self._lock:
+            dataset = self._datasets.get(key)
+            if dataset is None:
+                dataset = self._datasets[key] = _Dataset(key)
+            self._datasets.move_to_end(key)
+            dataset.refs += 1
+
+        try:
+            # Sessions asking for a dataset being loaded wait here instead of loading it again
+            with dataset.lock:
+                if dataset.df is None:
+                    df = loader(*args, **kwargs)
+                    dataset.nbytes = int(df.memory_usage(deep=True).sum())
+                    dataset.df = df
+                    with self._lock:
+                        self.misses += 1
+                        self.total_bytes += dataset.nbytes
+                else:
+                    with self._lock:
+                        self.hits += 1
+            lease = DatasetLease(self, dataset)
+        except BaseException:
+            self._release(dataset)
+            raise
+        self._evict()
+        return lease
+
+    def _release(self, dataset):
+        with self._lock:
+            dataset.refs -= 1
+            if dataset.df is None and dataset.refs == 0 and self._datasets.get(dataset.key) is dataset:
+                # The load failed
+                del self._datasets[dataset.key]
+        self._evict()
+
+    def _evict(self):
+        with self._lock:
+            for key in list(self._datasets):
+                if self.total_bytes <= self.max_bytes:
+                    break
+                dataset = self._datasets[key]
+                if dataset.refs == 0 and dataset.df is not None:
+                    del self._datasets[key]
+                    self.total_bytes -= dataset.nbytes
+                    logger.info(f"Evicted a dataset of {dataset.nbytes:,} bytes from the registry")
+
+    def clear(self):
+        """
+        Forget the idle datasets and reset the counters. Datasets in use are kept.
+        """
+        with self._lock:
+            for key, dataset in list(self._datasets.items()):
+                if dataset.refs == 0:
+                    del self._datasets[key]
+                    self.total_bytes -= dataset.nbytes
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """
+        Return the registry statistics.
+
+        Returns:
+            dict: ``hits``, ``misses``, ``datasets``, ``in_use`` (datasets with a lease) and ``total_bytes``.
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'datasets': len(self._datasets),
+                'in_use': sum(dataset.refs > 0 for dataset in self._datasets.values()),
+                'total_bytes': self.total_bytes,
+            }
+
+# Shared by every session of the process
+dataset_registry = DatasetRegistry()
@@ -0,0 +1,196 @@
+import os
+import logging
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import (
+    is_bool_dtype,
+    is_datetime64_any_dtype,
+    is_integer_dtype,
+    is_numeric_dtype,
+)
+
+from .config import ENCODING_SAMPLE_SIZE, SCHEMA_SAMPLE_ROWS
+from .encoding import read_with_fallback, resolve_encoding
+
+logger = logging.getLogger(__name__)
+
+def read_sample(file_path, nrows=SCHEMA_SAMPLE_ROWS, encoding='utf-8', sep=',', header='infer', encodings=None, sample_size=ENCODING_SAMPLE_SIZE):
+    """
+    Read the header and the first rows of a CSV or Excel file.
+
+    Args:
+        file_path (str): The path to the file.
+        nrows (int): Number of data rows to read. 0 reads only the header (default is config.SCHEMA_SAMPLE_ROWS).
+        encoding (str): The initial encoding to try for CSV files (default is 'utf-8').
+        sep (str): The delimiter to use for CSV files (default is ',').
+        header (int, list of int, or 'infer'): Row number(s) to use as column names (default is 'infer').
+        encodings (list of str, optional): Candidate encodings to try for CSV files instead of ``encoding`` (default is None).
+        sample_size (int): Number of bytes sampled for encoding checks (default is config.ENCODING_SAMPLE_SIZE).
+
+    Returns:
+        pd.DataFrame: The sampled rows.
+    """
+    if os.path.basename(file_path).split('.')[-1].lower() != 'csv':
+        return pd.read_excel(file_path, header=0 if header == 'infer' else header, nrows=nrows)
+
+    candidates = encodings or [encoding]
+    encoding = resolve_encoding(file_path, candidates, sample_size=sample_size)
+
+    def read(encoding):
+        return pd.read_csv(file_path, encoding=encoding, sep=sep, header=header, nrows=nrows)
+
+    return read_with_fallback(read, file_path, encoding, candidates, sample_size=sample_size)
+
+def unify_dtypes(dtypes, missing=False):
+    """
+    Choose one dtype that can hold the values of a column seen with several dtypes.
+
+    - Only booleans stay ``bool``, only integers become ``int64`` and any other mix of
+      numbers becomes ``float64``. When the column may have missing values the dtypes do not
+      show, the nullable ``boolean`` and ``Int64`` dtypes are used instead so the gaps do not
+      force a float or object column, or fail the read.
+    - Only datetimes become ``datetime64[ns]``.
+    - Anything else, such as a column that is numeric in one file and text in another, becomes ``str``.
+
+    Args:
+        dtypes (list of dtype): The dtypes the column was seen with.
+        missing (bool): Whether the column may have missing values, e.g. because it is absent from
+            some files or the dtypes come from a sample of the rows (default is False).
+
+    Returns:
+        dtype or str: The unified dtype.
+    """
+    if all(is_bool_dtype(dtype) for dtype in dtypes):
+        return 'boolean' if missing else np.dtype(bool)
+    if all(is_integer_dtype(dtype) for dtype in dtypes):
+        return 'Int64' if missing else np.dtype(np.int64)
+    if all(is_numeric_dtype(dtype) and not is_bool_dtype(dtype) for dtype in dtypes):
+        return np.dtype(np.float64)
+    if all(is_datetime64_any_dtype(dtype) for dtype in dtypes):
+        return np.dtype('datetime64[ns]')
+    return 'str'
+
+def infer_schema(file_paths, nrows=SCHEMA_SAMPLE_ROWS, encoding='utf-8', sep=',', header='infer', encodings=None):
+    """
+    Infer one schema for a set of files from their headers and first rows.
+
+    Files that cannot be sampled are skipped here; they fail again, and are reported,
+    when the folder is loaded. Integer and boolean columns get the nullable ``Int64`` and
+    ``boolean`` dtypes, as a blank cell after the sampled rows would not fit ``int64`` or ``bool``.
+
+    Args:
+        file_paths (list of str): The paths of the CSV and Excel files.
+        nrows (int): Number of rows sampled from each file (default is config.SCHEMA_SAMPLE_ROWS).
+        encoding (str): The encoding to use for CSV files (default is 'utf-8').
+        sep (str): The delimiter to use for CSV files (default is ',').
+        header (int, list of int, or 'infer'): Row number(s) to use as column names (default is 'infer').
+        encodings (list of str, optional): Candidate encodings to try for CSV files instead of ``encoding`` (default is None).
+
+    Returns:
+        dict: Mapping of column name to dtype, in the order the columns were first seen.
+    """
+    seen = {}
+    sampled = 0
+    for file_path in file_paths:
+        try:
+            sample = read_sample(file_path, nrows=nrows, encoding=encoding, sep=sep, header=header, encodings=encodings)
+        except Exception as e:
+            logger.info(f"Skipping {os.path.basename(file_path)} while inferring the schema: {e}")
+            continue
+        sampled += 1
+        for column, dtype in sample.dtypes.items():
+            seen.setdefault(column, []).append(dtype)
+
+    # Only the first rows were sampled, so any column may have missing values further down
+    return {column: unify_dtypes(dtypes, missing=True) for column, dtypes in seen.items()}
+
+def read_dtypes(schema):
+    """
+    Return the part of a schema that can be passed as ``dtype`` to the pandas readers.
+
+    Datetime columns are left out, as the readers do not parse them from a ``dtype`` argument.
+    They are converted by :func:`conform_to_schema` instead.
+
+    Args:
+        schema (dict): Mapping of column name to dtype.
+
+    Returns:
+        dict: Mapping of column name to dtype.
+    """
+    return {column: dtype for column, dtype in schema.items() if not is_datetime64_any_dtype(dtype)}
+
+def conform_to_schema(df, schema):
+    """
+    Give a DataFrame exactly the columns, column order and dtypes of a schema.
+
+    Columns that are not in the schema are dropped and missing ones are added as missing values.
+    Columns already used as the index are left out.
+
+    Args:
+        df (pd.DataFrame): The DataFrame to conform.
+        schema (dict): Mapping of column name to dtype.
+
+    Returns:
+        pd.DataFrame: The conformed DataFrame.
+    """
+    columns = [column for column in schema if column not in df.index.names]
+    if list(df.columns) != columns:
+        df = df.reindex(columns=columns)
+    dtypes = {column: schema[column] for column in columns if df[column].dtype != schema[column]}
+    if dtypes:
+        df = df.astype(dtypes)
+    return df
+
+def _unify_categories(frames):
+    # Categoricals with different categories, or missing from some frames, concatenate to object,
+    # so every frame gets the column with the union of the categories
+    columns = dict.fromkeys(
+        column for df in frames for column in df.columns if isinstance(df[column].dtype, pd.CategoricalDtype)
+    )
+    for column in columns:
+        dtypes = [df[column].dtype for df in frames if column in df.columns]
+        if not all(isinstance(dtype, pd.CategoricalDtype) for dtype in dtypes):
+            continue
+        if len(dtypes) == len(frames) and all(dtype == dtypes[0] for dtype in dtypes):
+            continue
+        dtype = pd.CategoricalDtype(pd.Index(np.concatenate([dtype.categories.to_numpy(dtype=object) for dtype in dtypes])).unique())
+        frames = [
+            df.astype({column: dtype}) if column in df.columns
+            else df.assign(**{column: pd.Categorical.from_codes(np.full(len(df), -1), dtype=dtype)})
+            for df in frames
+        ]
+    return frames
+
+def concat_frames(frames, schema=None, sources=None, source_column=None, ignore_index=True):
+    """
+    Concatenate DataFrames in a single allocation, with consistent dtypes.
+
+    Each frame is first conformed to ``schema`` and categorical columns are given the union of
+    their categories, so the concatenation does not fall back to ``object`` columns.
+
+    Args:
+        frames (list of pd.DataFrame): The DataFrames to concatenate.
+        schema (dict, optional): Mapping of column name to dtype. None keeps the columns as they are (default is None).
+        sources (list of str, optional): One label per frame, e.g. its file name (default is None).
+        source_column (str, optional): Name of a categorical column recording the label of the frame
+            each row came from. Requires ``sources`` (default is None).
+        ignore_index (bool): Whether to number the rows from 0 instead of keeping the frame indexes
+            (default is True).
+
+    Returns:
+        pd.DataFrame: The combined DataFrame.
+    """
+    if schema is not None:
+        frames = [conform_to_schema(df, schema) for df in frames]
+    frames = _unify_categories(frames)
+
+    if source_column is not None:
+        if sources is None or len(sources) != len(frames):
+            raise ValueError("source_column requires one source label per frame.")
+        dtype = pd.CategoricalDtype(pd.Index(sources).unique())
+        frames = [
+            df.assign(**{source_column: pd.Categorical.from_codes(np.full(len(df), dtype.categories.get_loc(source)), dtype=dtype)})
+            for df, source in zip(frames, sources)
+        ]
+    return pd.concat(frames, ignore_index=ignore_index)
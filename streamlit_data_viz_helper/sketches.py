@@ -0,0 +1,261 @@
+import numpy as np
+import pandas as pd
+
+from .config import SKETCH_SAMPLE_ROWS
+
+# Characters that make a 'contains' pattern a regular expression rather than a plain substring
+REGEX_CHARS = frozenset('.^$*+?{}[]\\|()')
+
+# Length of the substrings indexed by SubstringIndex
+NGRAM_SIZE = 3
+
+# Bits of each 64-bit hash used for the HyperLogLog rank; below 2**53 they convert to float64 exactly
+_RANK_BITS = 52
+
+class HyperLogLog:
+    """
+    A HyperLogLog sketch estimating the number of distinct values in constant memory.
+
+    The relative error is about ``1.04 / sqrt(2 ** precision)``, 1.6% for the default precision,
+    using ``2 ** precision`` bytes. Sketches with the same precision can be merged, e.g. to count
+    the distinct values of several files or chunks.
+
+    Example:
+        >>> sketch = HyperLogLog()
+        >>> sketch.update(df["Customer"])
+        >>> sketch.count()
+
+    Args:
+        precision (int): Number of hash bits selecting a register, between 4 and 18 (default is 12).
+    """
+
+    def __init__(self, precision=12):
+        if not 4 <= precision <= 18:
+            raise ValueError(f"precision must be between 4 and 18, got {precision}")
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def update(self, values):
+        """
+        Add values to the sketch. Missing values are ignored.
+
+        Args:
+            values (pd.Series or array-like): The values.
+
+        Returns:
+            HyperLogLog: This sketch, so calls can be chained.
+        """
+        values = pd.Series(values) if not isinstance(values, pd.Series) else values
+        values = values.dropna().to_numpy()
+        if not len(values):
+            return self
+        # categorize=False hashes every value directly instead of factorizing them first
+        hashes = pd.util.hash_array(values, categorize=False)
+        registers = (hashes >> np.uint64(64 - self.precision)).astype(np.intp)
+        # The rank is the position of the first set bit, counted from the top of the rank bits
+        _, exponents = np.frexp((hashes & np.uint64((1 << _RANK_BITS) - 1)).astype(np.float64))
+        np.maximum.at(self.registers, registers, (_RANK_BITS + 1 - exponents).astype(np.uint8))
+        return self
+
+    def merge(self, other):
+        """
+        Add the values seen by another sketch.
+
+        Args:
+            other (HyperLogLog): A sketch with the same precision.
+
+        Returns:
+            HyperLogLog: This sketch.
+        """
+        if other.precision != self.precision:
+            raise ValueError(f"Cannot merge sketches with precision {self.precision} and {other.precision}")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self):
+        """
+        Estimate the number of distinct values added.
+
+        Returns:
+            int: The estimate.
+        """
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            # Linear counting is more accurate for small cardinalities
+            estimate = m * np.log(m / zeros)
+        return int(round(estimate))
+
+def approx_nunique(values, precision=12):
+    """
+    Estimate the number of distinct non-null values with a :class:`HyperLogLog` sketch.
+
+    Args:
+        values (pd.Series or array-like): The values.
+        precision (int): The sketch precision (default is 12).
+
+    Returns:
+        int: The estimate.
+    """
+    return HyperLogLog(precision).update(values).count()
+
+def sample_values(series, size=SKETCH_SAMPLE_ROWS):
+    """
+    Return a uniform random sample of the rows of a Series, in their original order.
+
+    The sample is drawn with a fixed seed, so the same data always gives the same sample.
+
+    Args:
+        series (pd.Series): The values.
+        size (int): Maximum number of rows sampled (default is config.SKETCH_SAMPLE_ROWS).
+
+    Returns:
+        pd.Series: The sample, or ``series`` itself when it has at most ``size`` rows.
+    """
+    if len(series) <= size:
+        return series
+    positions = np.unique(np.random.default_rng(0).integers(0, len(series), size))
+    return series.iloc[positions]
+
+def sample_nunique(sample, size):
+    """
+    Estimate the number of distinct non-null values of a column from a uniform sample of its rows.
+
+    Uses the Duj1 estimator of Haas et al., ``n * d / (n - f1 + f1 * n / N)``, for a sample of ``n``
+    of ``N`` values with ``d`` distinct values, ``f1`` of them seen once. It is exact when the sample
+    holds every row, close to ``N`` when every sampled value is unique and close to ``d`` when every
+    value was seen several times. No value outside the sample is read.
+
+    Args:
+        sample (pd.Series): The sampled rows, e.g. from :func:`sample_values`.
+        size (int): Number of rows of the whole column.
+
+    Returns:
+        int: The estimate.
+    """
+    counts = sample.value_counts()
+    distinct = len(counts)
+    if len(sample) >= size or not distinct:
+        return distinct
+    n = int(counts.sum())
+    # Missing values are left out of both the sample and the column size
+    population = size * n / len(sample)
+    singletons = int((counts == 1).sum())
+    estimate = n * distinct / (n - singletons + singletons * n / population)
+    return int(round(min(max(estimate, distinct), population)))
+
+def sample_quantiles(series, q=(0.25, 0.5, 0.75), size=SKETCH_SAMPLE_ROWS):
+    """
+    Estimate quantiles of a numeric or datetime Series from a sample of its rows.
+
+    Args:
+        series (pd.Series): The values.
+        q (sequence of float): The quantiles to estimate (default is the quartiles).
+        size (int): Maximum number of rows sampled (default is config.SKETCH_SAMPLE_ROWS).
+
+    Returns:
+        dict: Mapping of quantile to estimated value.
+    """
+    quantiles = sample_values(series, size).quantile(list(q))
+    return dict(zip(q, quantiles.tolist()))
+
+def _ngrams(codepoints, starts, lengths):
+    """Encode every n-gram lying inside one value as an integer, with the position of its value."""
+    owners = np.repeat(np.arange(len(lengths)), lengths)
+    last = len(codepoints) - NGRAM_SIZE + 1
+    if last <= 0:
+        return np.empty(0, dtype=np.uint64), np.empty(0, dtype=np.intp)
+    positions = np.arange(last)
+    valid = positions + NGRAM_SIZE <= (starts + lengths)[owners[:last]]
+    # Code points are below 2**21, so an n-gram of three fits in 63 bits
+    grams = np.zeros(last, dtype=np.uint64)
+    for offset in range(NGRAM_SIZE):
+        grams = (grams << np.uint64(21)) | codepoints[offset:offset + last].astype(np.uint64)
+    return grams[valid], owners[:last][valid]
+
+def _encode(values):
+    """The code points of the concatenated values with the start and length of each value."""
+    lengths = np.fromiter(map(len, values), dtype=np.intp, count=len(values))
+    starts = np.cumsum(lengths) - lengths
+    codepoints = np.frombuffer(''.join(values).encode('utf-32-le', errors='surrogatepass'), dtype=np.uint32)
+    return codepoints, starts, lengths
+
+class SubstringIndex:
+    """
+    Index of a high-cardinality text column for 'contains' filters.
+
+    The column is factorized into a code per row and its distinct values, and every
+    ``NGRAM_SIZE``-character substring of the distinct values is mapped to the values containing it.
+    A plain substring is looked up by intersecting the postings of its n-grams and checking only
+    those candidates; a regex is matched against the distinct values once. Either way the cost
+    depends on the number of distinct values, and the row mask is a single array lookup.
+
+    Values are matched as text, case-sensitively, and missing values never match.
+
+    Args:
+        series (pd.Series): The column to index.
+    """
+    ops = ('contains',)
+
+    def __init__(self, series):
+        codes, uniques = pd.factorize(series)
+        self.size = len(series)
+        self.codes = codes
+        self.values = pd.Series(pd.Index(uniques).astype(str))
+
+        grams, owners = _ngrams(*_encode(self.values.tolist()))
+        order = np.lexsort((owners, grams))
+        grams, owners = grams[order], owners[order]
+        keep = np.ones(len(grams), dtype=bool)
+        keep[1:] = (grams[1:] != grams[:-1]) | (owners[1:] != owners[:-1])
+        grams, self.postings = grams[keep], owners[keep]
+        self.grams, starts = np.unique(grams, return_index=True)
+        self.offsets = np.append(starts, len(grams))
+
+    def candidates(self, pattern):
+        """
+        Return the positions of the distinct values that contain every n-gram of ``pattern``.
+
+        Args:
+            pattern (str): A plain substring.
+
+        Returns:
+            np.ndarray: Positions in ``values``; a superset of the values containing ``pattern``.
+        """
+        if len(pattern) < NGRAM_SIZE:
+            return np.arange(len(self.values))
+        grams = np.unique(_ngrams(*_encode([pattern]))[0])
+        if not len(self.grams):
+            return np.empty(0, dtype=np.intp)
+        found = np.minimum(np.searchsorted(self.grams, grams), len(self.grams) - 1)
+        if (self.grams[found] != grams).any():
+            # An n-gram of the pattern appears in no value
+            return np.empty(0, dtype=np.intp)
+        postings = sorted((self.postings[self.offsets[i]:self.offsets[i + 1]] for i in found), key=len)
+        result = postings[0]
+        for posting in postings[1:]:
+            result = np.intersect1d(result, posting, assume_unique=True)
+        return result
+
+    def mask(self, condition):
+        """
+        Evaluate a 'contains' condition.
+
+        Args:
+            condition (FilterCondition): The condition.
+
+        Returns:
+            np.ndarray: A boolean array with one entry per row.
+        """
+        pattern = condition.value
+        if REGEX_CHARS.isdisjoint(pattern):
+            positions = self.candidates(pattern)
+            matched = positions[self.values.iloc[positions].str.contains(pattern, regex=False).to_numpy(dtype=bool)]
+        else:
+            matched = np.flatnonzero(self.values.str.contains(pattern).to_numpy(dtype=bool))
+        # The extra entry is looked up by the -1 code of missing values
+        hits = np.zeros(len(self.values) + 1, dtype=bool)
+        hits[matched] = True
+        return hits[self.codes]
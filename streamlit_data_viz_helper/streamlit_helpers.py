@@ -1,15 +1,20 @@
 import io
-import base64
+import hashlib
 
-import streamlit as st
 import pandas as pd
-from pandas.api.types import (
-    is_categorical_dtype,
-    is_datetime64_any_dtype,
-    is_numeric_dtype,
-    is_object_dtype,
-)
 
+from .config import SORT_CACHE_SIZE
+from .export import dataframe_to_csv_bytes
+from .filtering import FilterSpec, apply_filter_spec, coerce_datetimes, index_dataframe, profile_dataframe
+from .instrumentation import instrument
+from .registry import dataset_registry
+from .utils import LazyModule, LRUCache, dataframe_key
+
+st = LazyModule('streamlit')
+
+_sort_orders = LRUCache(maxsize=SORT_CACHE_SIZE)
+
+@instrument
 def download_chart_html(fig, title):
     """
     Add a download button in a Streamlit app to save a Plotly chart as an HTML file.
@@ -31,63 +36,75 @@ def download_chart_html(fig, title):
     except Exception as e:
         st.error(f"An error occurred while creating the download button: {e}")
 
-def download_csv_jis(df,title):
+CSV_DOWNLOADS = {
+    None: ('.csv', 'text/csv'),
+    'gzip': ('.csv.gz', 'application/gzip'),
+    'zip': ('.zip', 'application/zip'),
+}
+
+@instrument
+def download_csv_jis(df,title, compression=None, key=None):
     '''
     Download data frames containing Japanese as CSV files.
+
+    The CSV is only encoded when the download button is clicked, in chunks
+    and cached per data frame content, so rendering the button is cheap.
     
     Args:
         df : pandas dataframe
         title : file name str
+        compression : None, 'gzip' or 'zip'
+        key : optional widget key, needed when several buttons share a title
      
     '''
-    csv = df.to_csv(encoding='utf_8_sig')
-    b64 = base64.b64encode(csv.encode('utf-8-sig')).decode()
-    href = f'<a href="data:application/octet-stream;base64,{b64}" download= "{title}.csv">Download Link</a>'
-    st.markdown(f"Download data as CSV:  {href}", unsafe_allow_html=True)
+    extension, mime = CSV_DOWNLOADS[compression]
+    st.download_button(
+        label='Download CSV',
+        data=lambda: dataframe_to_csv_bytes(df, encoding='utf_8_sig', compression=compression, file_name=f"{title}.csv"),
+        file_name=f"{title}{extension}",
+        mime=mime,
+        key=key,
+        on_click='ignore',
+    )
 
-def filter_dataframe(df: pd.DataFrame) -> pd.DataFrame:
+def _quartiles_help(profile):
+    """Describe the approximate quartiles of a numeric column for a widget tooltip."""
+    if not profile.quantiles:
+        return None
+    return "Approximate quartiles: " + ", ".join(f"{value:,.4g}" for value in profile.quantiles.values())
+
+@instrument
+def build_filter_spec(df: pd.DataFrame, profiles=None) -> FilterSpec:
     """
-    Adds a UI on top of a dataframe to let viewers filter columns
+    Adds filter widgets for the columns of a dataframe and returns the selected filters
 
     Args:
-        df (pd.DataFrame): Original dataframe
+        df (pd.DataFrame): Dataframe to build the filters for
+        profiles (dict, optional): Column profiles of ``df``. Computed if omitted
 
     Returns:
-        pd.DataFrame: Filtered dataframe
+        FilterSpec: The selected filters, to be applied with ``apply_filter_spec``
     """
-    modify = st.checkbox("Add filters")
-
-    if not modify:
-        return df
-
-    df = df.copy()
-
-    # Try to convert datetimes into a standard format (datetime, no timezone)
-    for col in df.columns:
-        if is_object_dtype(df[col]):
-            try:
-                df[col] = pd.to_datetime(df[col])
-            except Exception:
-                pass
-
-        if is_datetime64_any_dtype(df[col]):
-            df[col] = df[col].dt.tz_localize(None)
+    if profiles is None:
+        profiles = profile_dataframe(df)
 
+    spec = FilterSpec()
     modification_container = st.container()
 
     with modification_container:
         to_filter_columns = st.multiselect("Filter dataframe on", df.columns)
         for column in to_filter_columns:
+            profile = profiles[column]
             left, right = st.columns((1, 20))
             # Treat columns with < 10 unique values as categorical
-            if is_categorical_dtype(df[column]) or df[column].nunique() < 10:
+            if profile.kind == 'categorical':
                 user_cat_input = right.multiselect(
                     f"Values for {column}",
-                    df[column].unique(),
-                    default=list(df[column].unique()),
+                    profile.values,
+                    default=profile.values,
                 )
-                df = df[df[column].isin(user_cat_input)]
-            elif is_numeric_dtype(df[column]):
+                spec.isin(column, user_cat_input)
+            elif profile.kind == 'numeric':
                 filter_mode = right.radio(
                     f"Filter mode for {column}",
                     ("Slider", "Numeric Input"), 
@@ -95,8 +112,8 @@ def filter_dataframe(df: pd.DataFrame) -> pd.DataFrame:
                     key=f"filter_mode_{column}"
                 )
                 if filter_mode == "Slider":
-                    _min = float(df[column].min())
-                    _max = float(df[column].max())
+                    _min = float(profile.min)
+                    _max = float(profile.max)
                     step = (_max - _min) / 100
                     user_num_input = right.slider(
                         f"Values for {column}",
@@ -104,47 +121,168 @@ def filter_dataframe(df: pd.DataFrame) -> pd.DataFrame:
                         max_value=_max,
                         value=(_min, _max),
                         step=step,
-                        key=f"slider_{column}"
+                        key=f"slider_{column}",
+                        help=_quartiles_help(profile),
                     )
                 else:
                     left, middle, right = st.columns([10, 1, 10], vertical_alignment="bottom")
-                    _min = float(df[column].min())
-                    _max = float(df[column].max())
+                    _min = float(profile.min)
+                    _max = float(profile.max)
                     min_val = left.number_input(f"Min value for {column}", value=_min, key=f"min_input_{column}")
                     middle.write('～')
                     max_val = right.number_input(f"Max value for {column}", value=_max, key=f"max_input_{column}")
                     user_num_input = (min_val, max_val)
                 
-                df = df[df[column].between(*user_num_input)]
-            elif is_datetime64_any_dtype(df[column]):
+                spec.between(column, *user_num_input)
+            elif profile.kind == 'datetime':
                 user_date_input = right.date_input(
                     f"Values for {column}",
                     value=(
-                        df[column].min(),
-                        df[column].max(),
+                        profile.min,
+                        profile.max,
                     ),
                     key=f"date_input_{column}"
                 )
                 if len(user_date_input) == 2:
                     user_date_input = tuple(map(pd.to_datetime, user_date_input))
                     start_date, end_date = user_date_input
-                    df = df.loc[df[column].between(start_date, end_date)]
+                    spec.between(column, start_date, end_date)
             else:
                 user_text_input = right.text_input(
                     f"Substring or regex in {column}",
                     key=f"text_input_{column}"
                 )
                 if user_text_input:
-                    df = df[df[column].astype(str).str.contains(user_text_input)]
-    
+                    spec.contains(column, user_text_input)
+
+    return spec
+
+@instrument
+def filter_dataframe(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Adds a UI on top of a dataframe to let viewers filter columns
+
+    The dataframe is not copied: without filters it is returned as it is, so a dataset from
+    ``load_shared_dataframe`` stays shared, and with filters only the matching rows are new
+
+    Args:
+        df (pd.DataFrame): Original dataframe
+
+    Returns:
+        pd.DataFrame: Filtered dataframe
+    """
+    modify = st.checkbox("Add filters")
+
+    if not modify:
+        return df
+
+    # Column profiles and indexes are memoized per dataset, so datetime detection,
+    # distinct counts, bounds and sort orders are not recomputed on every rerun
+    key = dataframe_key(df)
+    profiles = profile_dataframe(df, key)
+    index = index_dataframe(df, profiles, key)
+
+    # All filters are combined into one mask and the dataframe is indexed once
+    spec = build_filter_spec(df, profiles)
+    df = apply_filter_spec(df, spec, index=index)
+
+    # Convert datetimes into a standard format (datetime, no timezone)
+    return coerce_datetimes(df, profiles)
+
+@instrument
+def filter_dataset(dataset, columns=None, limit=None, return_spec=False):
+    """
+    Adds the filter UI of ``filter_dataframe`` on top of a folder queried with DuckDB
+
+    The widgets are built from profiles computed in one scan by DuckDB, and the filters run as a
+    query, so only the matching rows are loaded into pandas
+
+    Args:
+        dataset (FolderDataset): The dataset, see :class:`~streamlit_data_viz_helper.dataset.FolderDataset`
+        columns (list of str, optional): The columns to return. None returns all
+        limit (int, optional): Maximum number of rows to return. None returns every matching row
+        return_spec (bool, optional): If True, also return the FilterSpec, to reuse it with
+            ``dataset.aggregate`` or ``dataset.to_csv``
+
+    Returns:
+        pd.DataFrame: The matching rows. If ``return_spec`` is True, a tuple ``(DataFrame, FilterSpec)``
+    """
+    spec = FilterSpec()
+    if st.checkbox("Add filters"):
+        profiles = dataset.profiles()
+        spec = build_filter_spec(pd.DataFrame(columns=list(profiles)), profiles)
+
+    df = dataset.query(columns=columns, where=spec, limit=limit)
+    if return_spec:
+        return df, spec
     return df
 
-def show_df_with_expander(df, title='dataframe', label='See data!', expanded=False, icon=None):
+def _sort_order(df, column, ascending):
+    """Return the row positions of ``df`` sorted by ``column``, cached per content of the frame."""
+    key = (dataframe_key(df), column, ascending)
+    order = _sort_orders.get(key)
+    if order is None:
+        order = (
+            df[column]
+            .reset_index(drop=True)
+            .sort_values(ascending=ascending, kind='stable', na_position='last')
+            .index.to_numpy()
+        )
+        _sort_orders.put(key, order)
+    return order
+
+@instrument
+def paginate_dataframe(df, page, page_size, sort_by=None, ascending=True):
+    """
+    Return one page of a DataFrame, optionally sorted.
+
+    The sort order is computed once per dataset and column, and only the rows of the
+    requested page are taken from the DataFrame.
+
+    Args:
+        df (pd.DataFrame): The DataFrame to page through.
+        page (int): The page number, starting at 1.
+        page_size (int): Number of rows per page.
+        sort_by (str, optional): Column to sort by. Default is None (original order).
+        ascending (bool, optional): Sort direction. Default is True.
+
+    Returns:
+        pd.DataFrame: The rows of the page.
+    """
+    start = (page - 1) * page_size
+    if sort_by is None:
+        return df.iloc[start:start + page_size]
+    return df.iloc[_sort_order(df, sort_by, ascending)[start:start + page_size]]
+
+def _show_paged_dataframe(df, page_size, key):
+    """Show page navigation, sort controls and statistics, and only the rows of the current page."""
+    n_pages = max(-(-len(df) // page_size), 1)
+    memory = df.memory_usage(index=True, deep=False).sum()
+    st.caption(f"{len(df):,} rows × {df.shape[1]:,} columns, about {memory / 1024 ** 2:,.1f} MB in memory")
+
+    left, middle, right = st.columns([3, 2, 2], vertical_alignment="bottom")
+    sort_by = left.selectbox(
+        "Sort by",
+        [None, *df.columns],
+        format_func=lambda column: "(original order)" if column is None else str(column),
+        key=f"sort_by_{key}",
+    )
+    ascending = middle.toggle("Ascending", value=True, key=f"ascending_{key}", disabled=sort_by is None)
+    page = right.number_input(f"Page (of {n_pages:,})", min_value=1, max_value=n_pages, value=1, step=1, key=f"page_{key}")
+
+    st.dataframe(paginate_dataframe(df, page, page_size, sort_by=sort_by, ascending=ascending))
+
+@instrument
+def show_df_with_expander(df, title='dataframe', label='See data!', expanded=False, icon=None, compression=None, page_size=None):
     """
     Displays a DataFrame in a Streamlit expander and provides a CSV download option.
 
     This function shows a Streamlit expander widget containing the given DataFrame.
     It also includes a button to download the DataFrame as a CSV file with JIS encoding.
+    The CSV is only generated when the button is clicked.
+
+    With ``page_size``, only one page of rows is sent to the browser, with page navigation,
+    optional server-side sorting and row/memory statistics. The download still covers every row.
 
     Args:
         df (pd.DataFrame): The DataFrame to display.
@@ -153,12 +291,122 @@ def show_df_with_expander(df, title='dataframe', label='See data!', expanded=Fal
         label (str, optional): The label for the Streamlit expander. Default is 'See data!'.
         expanded (bool, optional): Whether the expander is expanded by default. Default is False.
         icon (str, optional): Icon for the expander widget (currently unused). Default is None.
+        compression (str, optional): None, 'gzip' or 'zip' for the downloaded file. Default is None.
+        page_size (int, optional): Number of rows per page. Default is None (show all rows).
 
     Returns:
         None: Displays the DataFrame and a download button in the Streamlit app.
     """
     with st.expander(label, expanded=expanded):
         # Show the DataFrame
-        st.dataframe(df)
+        if page_size is None:
+            st.dataframe(df)
+        else:
+            _show_paged_dataframe(df, page_size, key=title)
         # Provide a download button for CSV
-        download_csv_jis(df, title=title)
\ No newline at end of file
+        download_csv_jis(df, title=title, compression=compression)
+
+def show_instrumentation_panel(recorder, label='Performance', expanded=False):
+    """
+    Shows the instrumented calls of the current rerun in a sidebar expander.
+
+    Wrap the app in :func:`~streamlit_data_viz_helper.instrumentation.record` and pass the
+    recorder at the end of the script, so the panel covers every call made in the rerun.
+
+    Example:
+        >>> with record() as recorder:
+        ...     df = filter_dataframe(load_all_files_in_folder("data"))
+        ...     st.plotly_chart(create_histogram(df, x="Age"))
+        >>> show_instrumentation_panel(recorder)
+
+    Args:
+        recorder (Recorder): The recorder of the rerun.
+        label (str, optional): The label for the expander. Default is 'Performance'.
+        expanded (bool, optional): Whether the expander is expanded by default. Default is False.
+
+    Returns:
+        None: Displays the breakdown in the sidebar.
+    """
+    total = sum(entry.seconds for entry in recorder.records if entry.depth == 0)
+    with st.sidebar.expander(label, expanded=expanded):
+        st.metric("Instrumented time", f"{total * 1000:.0f} ms")
+        st.dataframe(recorder.summary(), hide_index=True)
+
+def show_load_progress(job, render=None, poll_interval=0.5, key=None):
+    """
+    Shows the progress of a background load and returns what has been loaded so far.
+
+    While the job runs, a fragment polls it every ``poll_interval`` seconds and redraws only the
+    progress bar and ``render``, so the rest of the script is not rerun. When the job finishes the
+    whole app is rerun once and the full DataFrame is returned.
+
+    Example:
+        >>> job = start_folder_load("data")
+        >>> df = show_load_progress(job, render=lambda df: st.dataframe(df.tail()))
+        >>> if job.done:
+        ...     st.plotly_chart(create_histogram(df, x="Age"))
+
+    Args:
+        job (LoadJob): The job returned by :func:`~streamlit_data_viz_helper.background.start_folder_load`
+            or :func:`~streamlit_data_viz_helper.background.start_csv_load`.
+        render (callable, optional): Called with the partial DataFrame on every poll while the job
+            runs (default is None).
+        poll_interval (float, optional): Seconds between polls. Default is 0.5.
+        key (str, optional): A unique key when several loads are shown on one page. Default is None.
+
+    Returns:
+        pd.DataFrame or None: The loaded DataFrame once the job is done, otherwise the rows loaded so
+        far, or None if there are none yet or the job failed.
+    """
+    if job.done:
+        if job.status != 'done':
+            st.error(f"Loading {job.path} {job.status}: {job.error or ''}".rstrip(': '))
+            return None
+        for result in job.errors:
+            st.warning(result.error)
+        return job.partial()
+
+    @st.fragment(run_every=poll_interval)
+    def _poll():
+        st.progress(job.progress, text=job.describe())
+        df = job.partial()
+        if render is not None and df is not None:
+            render(df)
+        if job.done:
+            # Rerun the whole script so it sees the finished job
+            st.rerun()
+
+    with st.container(key=key):
+        _poll()
+    return job.partial()
+
+@instrument
+def load_shared_dataframe(loader, *args, **kwargs):
+    """
+    Loads a dataset once for every session of the app and returns this session's view of it.
+
+    The dataset is leased from :data:`~streamlit_data_viz_helper.registry.dataset_registry` and the
+    lease is kept in the session state, so reruns reuse it and the dataset becomes evictable when
+    no session holds it any more. When the files change, the session moves to the new dataset.
+
+    Example:
+        >>> df = load_shared_dataframe(load_all_files_in_folder, "data", schema="infer")
+        >>> df = filter_dataframe(df)
+
+    Args:
+        loader (callable): A loader such as ``load_all_files_in_folder`` or ``load_csv_to_dataframe``.
+        *args: Positional arguments for the loader.
+        **kwargs: Keyword arguments for the loader.
+
+    Returns:
+        pd.DataFrame: A copy-on-write view of the shared DataFrame.
+    """
+    key = dataset_registry.key(loader, *args, **kwargs)
+    slot = f"_shared_dataframe_{hashlib.sha1(key[0].encode()).hexdigest()}"
+    lease = st.session_state.get(slot)
+    if lease is None or lease.released or lease.key != key:
+        if lease is not None:
+            lease.release()
+        lease = dataset_registry.acquire(loader, *args, **kwargs)
+        st.session_state[slot] = lease
+    return lease.df
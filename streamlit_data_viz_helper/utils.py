@@ -0,0 +1,188 @@
+import hashlib
+import importlib
+import threading
+import weakref
+from collections import OrderedDict
+
+import pandas as pd
+
+class LazyModule:
+    """
+    A stand-in for a module that is imported on first attribute access.
+
+    Heavy dependencies such as streamlit, plotly.express and chardet are bound with this at
+    module level, so importing a submodule of this package does not import them.
+
+    Args:
+        name (str): The dotted module name, e.g. 'plotly.express'.
+
+    Example:
+        >>> st = LazyModule("streamlit")
+        >>> st.write("imported here")
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        if attr in ('_name', '_module'):
+            raise AttributeError(attr)
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = 'loaded' if self._module is not None else 'not loaded'
+        return f"<lazy module {self._name!r} ({state})>"
+
+class LRUCache:
+    """
+    A small thread-safe least-recently-used cache.
+
+    With ``max_bytes``, the entries are also bounded by their total size as measured by
+    ``sizeof``, and values larger than the whole budget are not stored.
+
+    Args:
+        maxsize (int): Maximum number of entries kept (default is 32).
+        max_bytes (int, optional): Memory budget in bytes. None bounds only the number of entries (default is None).
+        sizeof (callable, optional): Returns the size of a value in bytes, required with ``max_bytes`` (default is None).
+    """
+
+    def __init__(self, maxsize=32, max_bytes=None, sizeof=None):
+        if max_bytes is not None and sizeof is None:
+            raise ValueError("sizeof is required with max_bytes")
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._sizes = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        """
+        Return the value stored for ``key`` and mark it as recently used.
+
+        Args:
+            key (hashable): The cache key.
+            default: The value returned on a miss (default is None).
+
+        Returns:
+            The cached value, or ``default``.
+        """
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        """
+        Store ``value`` for ``key``, evicting the least recently used entries if needed.
+
+        Args:
+            key (hashable): The cache key.
+            value: The value to store.
+        """
+        nbytes = self.sizeof(value) if self.sizeof is not None else 0
+        with self._lock:
+            if key in self._data:
+                del self._data[key]
+                self.total_bytes -= self._sizes.pop(key)
+            if self.max_bytes is not None and nbytes > self.max_bytes:
+                return
+            self._data[key] = value
+            self._sizes[key] = nbytes
+            self.total_bytes += nbytes
+            while len(self._data) > self.maxsize or (self.max_bytes is not None and self.total_bytes > self.max_bytes):
+                evicted, _ = self._data.popitem(last=False)
+                self.total_bytes -= self._sizes.pop(evicted)
+
+    def clear(self):
+        """
+        Remove every entry and reset the hit/miss counters.
+        """
+        with self._lock:
+            self._data.clear()
+            self._sizes.clear()
+            self.total_bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+def dataframe_content_hash(df):
+    """
+    Hash the full content of a DataFrame, including its index, column names and dtypes.
+
+    Every row is hashed, so frames that differ anywhere get different hashes. The cost grows
+    with the number of rows; :func:`dataframe_key` computes it once per DataFrame object.
+
+    Args:
+        df (pd.DataFrame): The DataFrame.
+
+    Returns:
+        str: A hex digest identifying the content of the DataFrame.
+    """
+    digest = hashlib.sha1()
+    digest.update(repr((list(df.columns), [str(dtype) for dtype in df.dtypes])).encode())
+    try:
+        digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    except TypeError:
+        # Unhashable cell values such as lists
+        digest.update(df.to_csv().encode())
+    return digest.hexdigest()
+
+# Content hashes of the DataFrame objects seen by dataframe_key, keyed by id() until the object is collected
+_frame_keys = {}
+_frame_keys_lock = threading.Lock()
+
+def _forget_frame(frame_id):
+    with _frame_keys_lock:
+        _frame_keys.pop(frame_id, None)
+
+def dataframe_key(df):
+    """
+    Return a cache key for the content of a DataFrame, computed once per DataFrame object.
+
+    The first call for an object hashes its full content with :func:`dataframe_content_hash`.
+    Later calls for the same object, such as on every Streamlit rerun, reuse that hash as long
+    as its shape, column names and dtypes are unchanged, so they cost the same for any number
+    of rows. Equal frames held in different objects get the same key.
+
+    Values edited in place, e.g. with ``df.loc[...] = value``, after the first call are not
+    detected; derive a new DataFrame instead, as copy-on-write pandas encourages.
+
+    Args:
+        df (pd.DataFrame): The DataFrame.
+
+    Returns:
+        str: A hex digest identifying the content of the DataFrame.
+    """
+    signature = (df.shape, tuple(df.columns), tuple(str(dtype) for dtype in df.dtypes))
+    frame_id = id(df)
+    with _frame_keys_lock:
+        entry = _frame_keys.get(frame_id)
+    if entry is not None and entry[0] == signature:
+        return entry[1]
+
+    key = dataframe_content_hash(df)
+    with _frame_keys_lock:
+        seen = frame_id in _frame_keys
+        _frame_keys[frame_id] = (signature, key)
+    if not seen:
+        # Forget the hash when the object is collected, before its id can be reused
+        weakref.finalize(df, _forget_frame, frame_id)
+    return key
@@ -1,81 +1,345 @@
-import plotly.express as px
+import hashlib
+import inspect
+from functools import wraps
 
-colors = px.colors.qualitative.Light24
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_datetime64_any_dtype, is_integer_dtype, is_numeric_dtype
+from plotly.colors import qualitative
 
-def create_scatter_plot(df, x, y, legend=None, title=None):
+from .config import FIGURE_CACHE_MAX_BYTES, FIGURE_CACHE_SIZE, WEBGL_THRESHOLD
+from .downsampling import reduce_points
+from .instrumentation import instrument
+from .utils import LazyModule, LRUCache
+
+# plotly.express pulls in the whole graph objects tree, so it is imported on first use
+px = LazyModule('plotly.express')
+go = LazyModule('plotly.graph_objects')
+
+colors = qualitative.Light24
+
+RENDER_MODES = ('auto', 'svg', 'webgl')
+
+BAR_AGGREGATES = ('sum', 'mean', 'median', 'min', 'max', 'count')
+
+# Upper bound on the number of bins chosen automatically for aggregated histograms
+MAX_AUTO_BINS = 200
+
+def _figure_nbytes(fig):
+    """Estimate the memory held by a figure from the arrays in its traces."""
+    return sum(
+        value.nbytes
+        for trace in fig.data
+        for value in trace.to_plotly_json().values()
+        if isinstance(value, np.ndarray)
+    )
+
+class FigureCache(LRUCache):
+    """
+    A memory-bounded LRU cache of Plotly figures with hit and miss counters.
+
+    The chart builders use the module-level ``figure_cache`` when called with ``use_cache=True``.
+    Entries are keyed on a content hash of the plotted columns and the call arguments, and
+    their size is estimated from the arrays in the figure's traces. Figures are copied on the
+    way in and out, so callers can update them freely.
+
+    Args:
+        max_bytes (int): Memory budget in bytes (default is config.FIGURE_CACHE_MAX_BYTES).
+        maxsize (int): Maximum number of figures kept (default is config.FIGURE_CACHE_SIZE).
+    """
+
+    def __init__(self, max_bytes=FIGURE_CACHE_MAX_BYTES, maxsize=FIGURE_CACHE_SIZE):
+        super().__init__(maxsize=maxsize, max_bytes=max_bytes, sizeof=_figure_nbytes)
+
+    def get(self, key):
+        """
+        Return a copy of the cached figure for ``key``, or None on a miss.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            plotly.graph_objs._figure.Figure or None: The cached figure.
+        """
+        fig = super().get(key)
+        return None if fig is None else go.Figure(fig)
+
+    def put(self, key, fig):
+        """
+        Store a copy of a figure, evicting the least recently used figures to stay within the budget.
+
+        Args:
+            key (str): The cache key.
+            fig (plotly.graph_objs._figure.Figure): The figure.
+        """
+        super().put(key, go.Figure(fig))
+
+    def stats(self):
+        """
+        Return the cache statistics.
+
+        Returns:
+            dict: ``hits``, ``misses``, ``entries`` and ``total_bytes``.
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': len(self._data),
+                'total_bytes': self.total_bytes,
+            }
+
+figure_cache = FigureCache()
+
+def _figure_key(name, df, columns, arguments):
+    """Hash the content and dtypes of the plotted columns together with the call arguments."""
+    columns = list(dict.fromkeys(column for column in columns if column is not None))
+    digest = hashlib.sha1()
+    digest.update(repr((name, columns, [str(df[column].dtype) for column in columns], sorted(arguments.items()))).encode())
+    digest.update(pd.util.hash_pandas_object(df[columns], index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+def _memoize_figure(*column_arguments):
+    """
+    Serve a chart builder's figures from ``figure_cache`` when it is called with ``use_cache=True``.
+
+    Args:
+        *column_arguments (str): Names of the builder arguments holding column names.
+    """
+    def decorator(builder):
+        signature = inspect.signature(builder)
+
+        @wraps(builder)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = dict(bound.arguments)
+            if not arguments.pop('use_cache'):
+                return builder(*args, **kwargs)
+
+            df = arguments.pop('df')
+            try:
+                key = _figure_key(builder.__name__, df, [arguments[name] for name in column_arguments], arguments)
+            except Exception:
+                # Unhashable content or invalid columns: let the builder handle it
+                return builder(*args, **kwargs)
+
+            fig = figure_cache.get(key)
+            if fig is None:
+                fig = builder(*args, **kwargs)
+                figure_cache.put(key, fig)
+            return fig
+        return wrapper
+    return decorator
+
+def _resolve_render_mode(df, render_mode, webgl_threshold):
+    """Return 'svg' or 'webgl', choosing by row count when ``render_mode`` is 'auto'."""
+    if render_mode not in RENDER_MODES:
+        raise ValueError(f"render_mode must be one of {RENDER_MODES}, got {render_mode!r}")
+    if render_mode == 'auto':
+        return 'webgl' if len(df) > webgl_threshold else 'svg'
+    return render_mode
+
+@instrument
+@_memoize_figure('x', 'y', 'legend')
+def create_scatter_plot(df, x, y, legend=None, title=None, max_points=None, reduction='random', render_mode='auto', webgl_threshold=WEBGL_THRESHOLD, use_cache=False):
     """
     Create a scatter plot using Plotly Express.
 
+    If ``max_points`` is set and the DataFrame is larger, the points are reduced per legend
+    group before plotting, which keeps the browser payload bounded.
+
     Args:
         df (pd.DataFrame): The DataFrame containing the data to plot.
         x (str): The column name for the x-axis.
         y (str): The column name for the y-axis.
         legend (str, optional): The column name for the legend (color grouping). Default is None.
         title (str, optional): The title of the scatter plot. Default is None.
+        max_points (int, optional): Maximum number of points to plot. Default is None (no limit).
+        reduction (str or callable, optional): 'random' or 'density' (grid-capped sampling that keeps
+            outliers), or a custom function, see ``downsampling.reduce_points``. Default is 'random'.
+        render_mode (str, optional): 'svg', 'webgl', or 'auto' to use WebGL when more than
+            ``webgl_threshold`` points are plotted. Default is 'auto'.
+        webgl_threshold (int, optional): Point count above which 'auto' switches to WebGL.
+            Default is config.WEBGL_THRESHOLD.
+        use_cache (bool, optional): Whether to return the figure from ``figure_cache`` when the
+            plotted columns and arguments are unchanged. Default is False.
 
     Returns:
         plotly.graph_objs._figure.Figure: The created scatter plot figure.
     """
     try:
-        fig = px.scatter(df, x=x, y=y, color=legend, title=title, color_discrete_sequence=colors)
+        if max_points is not None:
+            df = reduce_points(df, x, y, max_points, method=reduction, legend=legend)
+        render_mode = _resolve_render_mode(df, render_mode, webgl_threshold)
+        fig = px.scatter(df, x=x, y=y, color=legend, title=title, color_discrete_sequence=colors, render_mode=render_mode)
         return fig
     except Exception as e:
         raise ValueError(f"An error occurred while creating the scatter plot: {e}")
 
-def create_bar_chart(df, x, y, legend=None, title=None):
+@instrument
+@_memoize_figure('x', 'y', 'legend')
+def create_bar_chart(df, x, y, legend=None, title=None, aggregate=None, use_cache=False):
     """
     Create a bar chart using Plotly Express.
 
+    With ``aggregate``, rows sharing the same x (and legend) value are combined in pandas
+    first, so one bar per group is sent to the browser instead of one segment per row.
+
     Args:
         df (pd.DataFrame): The DataFrame containing the data to plot.
         x (str): The column name for the x-axis.
         y (str): The column name for the y-axis.
         legend (str, optional): The column name for the legend (color grouping). Default is None.
         title (str, optional): The title of the bar chart. Default is None.
+        aggregate (str, optional): 'sum', 'mean', 'median', 'min', 'max' or 'count' to aggregate
+            ``y`` per group before plotting. Default is None (plot every row).
+        use_cache (bool, optional): Whether to return the figure from ``figure_cache`` when the
+            plotted columns and arguments are unchanged. Default is False.
 
     Returns:
         plotly.graph_objs._figure.Figure: The created bar chart figure.
     """
     try:
+        if aggregate is not None:
+            if aggregate not in BAR_AGGREGATES:
+                raise ValueError(f"aggregate must be one of {BAR_AGGREGATES}, got {aggregate!r}")
+            keys = [x] if legend is None or legend == x else [x, legend]
+            df = df.groupby(keys, sort=False, observed=True)[y].agg(aggregate).reset_index()
         fig = px.bar(df, x=x, y=y, color=legend, title=title, color_discrete_sequence=colors)
         return fig
     except Exception as e:
         raise ValueError(f"An error occurred while creating the bar chart: {e}")
 
-def create_line_chart(df, x, y, legend=None, title=None):
+@instrument
+@_memoize_figure('x', 'y', 'legend')
+def create_line_chart(df, x, y, legend=None, title=None, max_points=None, reduction='lttb', render_mode='auto', webgl_threshold=WEBGL_THRESHOLD, use_cache=False):
     """
     Create a line chart using Plotly Express.
 
+    If ``max_points`` is set and the DataFrame is larger, each line is reduced before plotting
+    while keeping its visual shape, which keeps the browser payload bounded.
+
     Args:
         df (pd.DataFrame): The DataFrame containing the data to plot.
         x (str): The column name for the x-axis.
         y (str): The column name for the y-axis.
         legend (str, optional): The column name for the legend (color grouping). Default is None.
         title (str, optional): The title of the line chart. Default is None.
+        max_points (int, optional): Maximum number of points to plot. Default is None (no limit).
+        reduction (str or callable, optional): 'lttb' (Largest-Triangle-Three-Buckets) or 'minmax'
+            (min and max per bucket), or a custom function, see ``downsampling.reduce_points``. Default is 'lttb'.
+        render_mode (str, optional): 'svg', 'webgl', or 'auto' to use WebGL when more than
+            ``webgl_threshold`` points are plotted. Default is 'auto'.
+        webgl_threshold (int, optional): Point count above which 'auto' switches to WebGL.
+            Default is config.WEBGL_THRESHOLD.
+        use_cache (bool, optional): Whether to return the figure from ``figure_cache`` when the
+            plotted columns and arguments are unchanged. Default is False.
 
     Returns:
         plotly.graph_objs._figure.Figure: The created line chart figure.
     """
     try:
-        fig = px.line(df, x=x, y=y, color=legend, title=title, color_discrete_sequence=colors)
+        if max_points is not None:
+            df = reduce_points(df, x, y, max_points, method=reduction, legend=legend)
+        render_mode = _resolve_render_mode(df, render_mode, webgl_threshold)
+        fig = px.line(df, x=x, y=y, color=legend, title=title, color_discrete_sequence=colors, render_mode=render_mode)
         return fig
     except Exception as e:
         raise ValueError(f"An error occurred while creating the line chart: {e}")
 
-def create_histogram(df, x, title=None):
+def _histogram_frame(series, nbins=None):
+    """
+    Bin a column with NumPy and return ``(bins, widths)``.
+
+    ``bins`` has one row per bin with its center (or category) and count. ``widths`` holds the
+    bar widths in axis units, or None for categories.
+    """
+    series = series.dropna()
+    if not (is_numeric_dtype(series) or is_datetime64_any_dtype(series)) or series.dtype == bool:
+        counts = series.value_counts(sort=False)
+        return pd.DataFrame({series.name: counts.index, 'count': counts.to_numpy()}), None
+
+    is_datetime = is_datetime64_any_dtype(series)
+    if is_datetime:
+        if series.dt.tz is not None:
+            series = series.dt.tz_localize(None)
+        values = series.to_numpy(dtype='datetime64[ns]').astype(np.int64)
+    elif is_integer_dtype(series):
+        # Ranges and offsets of small integer dtypes such as int8 would overflow in their own dtype
+        values = series.to_numpy(dtype=np.int64)
+    else:
+        values = series.to_numpy()
+
+    if len(values) and is_integer_dtype(series) and nbins is None and values.max() - values.min() < MAX_AUTO_BINS:
+        # Small integer ranges get one bar per value
+        low = values.min()
+        counts = np.bincount(values - low)
+        centers = np.arange(low, low + len(counts))
+        widths = np.ones(len(counts))
+    else:
+        edges = np.histogram_bin_edges(values, bins=nbins or 'auto')
+        if nbins is None and len(edges) - 1 > MAX_AUTO_BINS:
+            edges = np.histogram_bin_edges(values, bins=MAX_AUTO_BINS)
+        counts, edges = np.histogram(values, bins=edges)
+        centers = (edges[:-1] + edges[1:]) / 2
+        widths = np.diff(edges)
+
+    if is_datetime:
+        centers = pd.to_datetime(centers.astype(np.int64))
+        # Plotly measures bar widths on date axes in milliseconds
+        widths = widths / 1e6
+    return pd.DataFrame({series.name: centers, 'count': counts}), widths
+
+@instrument
+@_memoize_figure('x')
+def create_histogram(df, x, title=None, nbins=None, aggregate=False, use_cache=False):
     """
     Create a histogram using Plotly Express.
 
+    With ``aggregate=True`` the bins are computed in NumPy (``np.histogram``, or ``np.bincount``
+    for small integer ranges; category counts for text) and only the bars are sent to the
+    browser, so the figure size does not depend on the number of rows.
+
     Args:
         df (pd.DataFrame): The DataFrame containing the data to plot.
         x (str): The column name for the x-axis.
         title (str, optional): The title of the histogram. Default is None.
+        nbins (int, optional): Number of bins. Default is None (chosen automatically).
+        aggregate (bool, optional): Whether to bin the data in NumPy before plotting. Default is False.
+        use_cache (bool, optional): Whether to return the figure from ``figure_cache`` when the
+            plotted columns and arguments are unchanged. Default is False.
 
     Returns:
         plotly.graph_objs._figure.Figure: The created histogram figure.
     """
     try:
-        fig = px.histogram(df, x=x, title=title, color_discrete_sequence=colors)
+        if aggregate:
+            bins, widths = _histogram_frame(df[x], nbins=nbins)
+            fig = create_histogram_from_bins(bins, x, widths=widths, title=title)
+        else:
+            fig = px.histogram(df, x=x, title=title, nbins=nbins, color_discrete_sequence=colors)
         return fig
     except Exception as e:
         raise ValueError(f"An error occurred while creating the histogram: {e}")
+
+def create_histogram_from_bins(bins, x, widths=None, title=None):
+    """
+    Create a histogram from precomputed bins, such as those of
+    :meth:`~streamlit_data_viz_helper.dataset.FolderDataset.histogram`.
+
+    Args:
+        bins (pd.DataFrame): One row per bin with its center (or category) in ``x`` and its ``count``.
+        x (str): The column name for the x-axis.
+        widths (array-like, optional): The bar widths in axis units, in milliseconds on date axes.
+            None draws categories with the default width. Default is None.
+        title (str, optional): The title of the histogram. Default is None.
+
+    Returns:
+        plotly.graph_objs._figure.Figure: The created histogram figure.
+    """
+    fig = px.bar(bins, x=x, y='count', title=title, color_discrete_sequence=colors)
+    if widths is not None:
+        fig.update_traces(width=widths)
+    fig.update_layout(bargap=0)
+    return fig
@@ -0,0 +1,128 @@
+import sys
+import os
+import asyncio
+import threading
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from streamlit_data_viz_helper import background
+from streamlit_data_viz_helper.background import clear_jobs, start_csv_load, start_folder_load
+from streamlit_data_viz_helper.data_processing import load_all_files_in_folder, load_csv_to_dataframe
+
+@pytest.fixture(autouse=True)
+def _clear_jobs():
+    yield
+    clear_jobs()
+
+@pytest.fixture
+def sales_folder(tmp_path):
+    (tmp_path / "a.csv").write_text("City,Sales\nTokyo,1\nOsaka,2\n", encoding="utf-8")
+    (tmp_path / "b.csv").write_text("City,Sales\nNagoya,3\n", encoding="utf-8")
+    return tmp_path
+
+def test_start_folder_load(sales_folder):
+    (sales_folder / "broken.xlsx").write_bytes(b"not an excel file")
+
+    job = start_folder_load(str(sales_folder), source_column="source")
+    df = job.result(timeout=10)
+    expected = load_all_files_in_folder(str(sales_folder), source_column="source")
+    pd.testing.assert_frame_equal(df, expected)
+
+    assert job.status == "done"
+    assert job.progress == 1.0
+    assert (job.files_done, job.files_total) == (3, 3)
+    assert job.bytes_done == job.bytes_total
+    assert [os.path.basename(result.file_path) for result in job.errors] == ["broken.xlsx"]
+    assert "3/3 files" in job.describe()
+
+def test_identical_requests_share_a_job(sales_folder):
+    job = start_folder_load(str(sales_folder), columns=["Sales"])
+    assert start_folder_load(str(sales_folder), columns=["Sales"]) is job
+    assert start_folder_load(str(sales_folder), columns=["City"]) is not job
+    job.result(timeout=10)
+
+    # A finished job is reused until the files change
+    assert start_folder_load(str(sales_folder), columns=["Sales"]) is job
+    (sales_folder / "c.csv").write_text("City,Sales\nSapporo,4\n", encoding="utf-8")
+    changed = start_folder_load(str(sales_folder), columns=["Sales"])
+    assert changed is not job
+    assert changed.result(timeout=10)["Sales"].tolist() == [1, 2, 3, 4]
+
+def test_partial_results(sales_folder, monkeypatch):
+    # 2つ目のファイルの読み込みを止めて、途中経過を確認する
+    release = threading.Event()
+    load_file = background._load_file
+
+    def slow_load_file(file_path, **options):
+        if file_path.endswith("b.csv"):
+            release.wait(10)
+        return load_file(file_path, **options)
+
+    monkeypatch.setattr(background, "_load_file", slow_load_file)
+    job = start_folder_load(str(sales_folder))
+    for _ in range(100):
+        if job.files_done:
+            break
+        threading.Event().wait(0.05)
+
+    assert not job.done
+    assert job.partial()["City"].tolist() == ["Tokyo", "Osaka"]
+    assert 0 < job.progress < 1
+    release.set()
+    assert job.result(timeout=10)["City"].tolist() == ["Tokyo", "Osaka", "Nagoya"]
+    assert job.partial() is job.result()
+
+def test_failed_job_is_restarted(tmp_path):
+    (tmp_path / "broken.xlsx").write_bytes(b"not an excel file")
+
+    job = start_folder_load(str(tmp_path))
+    with pytest.raises(ValueError, match="No valid files"):
+        job.result(timeout=10)
+    assert job.status == "failed"
+    assert job.partial() is None
+    assert start_folder_load(str(tmp_path)) is not job
+
+def test_cancel(sales_folder, monkeypatch):
+    release = threading.Event()
+    load_file = background._load_file
+
+    def slow_load_file(file_path, **options):
+        release.wait(10)
+        return load_file(file_path, **options)
+
+    monkeypatch.setattr(background, "_load_file", slow_load_file)
+    job = start_folder_load(str(sales_folder))
+    job.cancel()
+    release.set()
+    with pytest.raises(background.CancelledError):
+        job.result(timeout=10)
+    assert job.status == "cancelled"
+    assert start_folder_load(str(sales_folder)) is not job
+
+def test_start_csv_load(tmp_path):
+    file_path = tmp_path / "sales.csv"
+    pd.DataFrame({"City": ["Tokyo", "Osaka", "Nagoya"] * 100, "Sales": range(300)}).to_csv(file_path, index=False, encoding="cp932")
+
+    job = start_csv_load(str(file_path), encodings=["utf-8", "cp932"], chunksize=50, columns=["Sales"], where={"City": ["Tokyo"]})
+    df = job.result(timeout=10)
+    expected = load_csv_to_dataframe(str(file_path), encodings=["utf-8", "cp932"], columns=["Sales"], where={"City": ["Tokyo"]})
+    pd.testing.assert_frame_equal(df, expected)
+    assert job.bytes_done == job.bytes_total == os.path.getsize(file_path)
+
+def test_await_job(sales_folder):
+    async def load():
+        return await start_folder_load(str(sales_folder))
+
+    assert len(asyncio.run(load())) == 3
+
+def test_start_csv_load_with_late_encoding_error(tmp_path):
+    file_path = tmp_path / "late_cp932.csv"
+    file_path.write_bytes(("Name,Age\n" + "User,1\n" * 100 + "花子,29\n").encode("cp932"))
+
+    job = start_csv_load(str(file_path), encodings=["utf-8", "cp932"], sample_size=100, chunksize=10)
+    df = job.result(timeout=10)
+    assert len(df) == 101
+    assert df["Name"].iloc[-1] == "花子"
@@ -0,0 +1,100 @@
+import sys
+import os
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from streamlit_data_viz_helper.cache import FileCache
+from streamlit_data_viz_helper.data_processing import load_csv_to_dataframe, load_all_files_in_folder
+
+@pytest.fixture
+def sample_csv(tmp_path):
+    file_path = tmp_path / "sample.csv"
+    file_path.write_text("Name,Age,Gender\nAlice,30,Female\nBob,25,Male", encoding="utf-8")
+    return file_path
+
+@pytest.fixture(params=["parquet", "feather"])
+def cache(tmp_path, request):
+    return FileCache(cache_dir=tmp_path / "cache", format=request.param)
+
+def test_cache_roundtrip(sample_csv, cache, mocker):
+    df = load_csv_to_dataframe(sample_csv, cache=cache)
+    assert cache.size() > 0
+
+    spy = mocker.spy(pd, "read_csv")
+    cached = load_csv_to_dataframe(sample_csv, cache=cache)
+    spy.assert_not_called()
+    pd.testing.assert_frame_equal(cached, df)
+
+def test_cache_key_includes_options_and_mtime(sample_csv, cache):
+    load_csv_to_dataframe(sample_csv, cache=cache)
+    assert cache.get(sample_csv, dict(reader='csv', encoding='utf-8', sep=';', header='infer', index_col=None, encodings=None)) is None
+
+    stat = os.stat(sample_csv)
+    sample_csv.write_text("Name,Age,Gender\nCarol,41,Female", encoding="utf-8")
+    os.utime(sample_csv, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    df = load_csv_to_dataframe(sample_csv, cache=cache)
+    assert list(df["Name"]) == ["Carol"]
+
+def test_cache_invalidate(tmp_path, sample_csv, cache):
+    other_csv = tmp_path / "other.csv"
+    other_csv.write_text("Name\nDave", encoding="utf-8")
+    load_csv_to_dataframe(sample_csv, cache=cache)
+    load_csv_to_dataframe(other_csv, cache=cache)
+
+    assert cache.invalidate(sample_csv) == 1
+    assert cache.invalidate() == 1
+    assert cache.size() == 0
+
+def test_cache_lru_eviction(tmp_path, cache):
+    paths = []
+    for i in range(3):
+        file_path = tmp_path / f"data{i}.csv"
+        file_path.write_text("Value\n" + "\n".join(str(v) for v in range(100)), encoding="utf-8")
+        paths.append(file_path)
+        load_csv_to_dataframe(file_path, cache=cache)
+    entry_size = cache.size() // 3
+
+    # Reading the first file makes the second one the least recently used
+    for i, file_path in enumerate(paths):
+        entry = cache._entry_path(file_path, dict(reader='csv', encoding='utf-8', sep=',', header='infer', index_col=None, encodings=None))
+        os.utime(entry, ns=(i * 10**9, i * 10**9))
+    load_csv_to_dataframe(paths[0], cache=cache)
+
+    cache.max_bytes = entry_size * 2
+    cache.evict()
+    assert cache.invalidate(paths[1]) == 0
+    assert cache.invalidate(paths[0]) == 1
+
+def test_load_all_files_in_folder_with_cache(tmp_path, cache):
+    folder = tmp_path / "data"
+    folder.mkdir()
+    (folder / "a.csv").write_text("Name,Age\nAlice,30", encoding="utf-8")
+    (folder / "b.csv").write_text("Name,Age\nBob,25", encoding="utf-8")
+
+    first = load_all_files_in_folder(folder, cache=cache, max_workers=2, executor="process")
+    second = load_all_files_in_folder(folder, cache=cache)
+    pd.testing.assert_frame_equal(first, second)
+    assert cache.size() > 0
+
+def test_cache_skips_unconvertible_frames(sample_csv, cache):
+    df = pd.DataFrame({"Mixed": [1, "x"]}, dtype=object)
+    assert not cache.put(sample_csv, {}, df)
+
+def test_cache_pushes_down_columns_and_filters(tmp_path, cache):
+    file_path = tmp_path / "wide.csv"
+    file_path.write_text("Id,City,Score\n" + "".join(f"{i},{'Tokyo' if i % 2 else 'Osaka'},{i * 10}\n" for i in range(100)), encoding="utf-8")
+    where = {"Id": (10, 19), "City": ["Tokyo"]}
+    expected = load_csv_to_dataframe(file_path, columns=["Score"], where=where)
+
+    pd.testing.assert_frame_equal(load_csv_to_dataframe(file_path, columns=["Score"], where=where, cache=cache), expected)
+    # The whole file is cached once, so other selections are served from the same entry
+    assert len(list(cache._entries())) == 1
+    options = dict(reader='csv', encoding='utf-8', sep=',', header='infer', index_col=None, encodings=None)
+    partial = cache.get(file_path, options, columns=["Id", "Score"], filters=[("Id", "<", 5)])
+    assert list(partial.columns) == ["Id", "Score"]
+    if cache.format == "parquet":
+        assert partial["Id"].tolist() == [0, 1, 2, 3, 4]
+    pd.testing.assert_frame_equal(load_csv_to_dataframe(file_path, columns=["Score"], where=where, cache=cache), expected)
@@ -6,7 +6,16 @@ import pytest
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from streamlit_data_viz_helper.data_processing import load_csv_to_dataframe, load_excel_to_dataframe, load_all_files_in_folder
+from streamlit_data_viz_helper.data_processing import (
+    load_csv_to_dataframe,
+    load_excel_to_dataframe,
+    load_all_files_in_folder,
+    iter_csv_chunks,
+    iter_folder_chunks,
+    iter_excel_chunks,
+    aggregate_chunks,
+    IncrementalFolderLoader,
+)
 
 # テスト用のサンプルデータ作成
 @pytest.fixture
@@ -73,3 +82,265 @@ def test_load_csv_with_encoding_error(tmp_path):
     assert not df.empty
     assert list(df.columns) == ["名前", "年齢", "性別"]
     assert len(df) == 2
+
+# 並列読み込みのテスト
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_load_all_files_in_folder_parallel(tmp_path, executor):
+    for i in range(6):
+        (tmp_path / f"data{i}.csv").write_text(f"Name,Age\nUser{i},{20 + i}", encoding="utf-8")
+
+    df = load_all_files_in_folder(tmp_path, max_workers=3, executor=executor)
+    assert list(df["Name"]) == [f"User{i}" for i in range(6)]  # ファイル名順を維持
+
+def test_load_all_files_in_folder_return_errors(tmp_path):
+    (tmp_path / "good.csv").write_text("Name,Age\nAlice,30", encoding="utf-8")
+    (tmp_path / "broken.xlsx").write_bytes(b"not an excel file")
+
+    df, errors = load_all_files_in_folder(tmp_path, return_errors=True)
+    assert len(df) == 1
+    assert len(errors) == 1
+    assert errors[0].file_path.endswith("broken.xlsx")
+    assert errors[0].dataframe is None
+    assert "broken.xlsx" in errors[0].error
+
+def test_load_all_files_in_folder_invalid_executor(sample_folder):
+    with pytest.raises(ValueError):
+        load_all_files_in_folder(sample_folder, max_workers=2, executor="gpu")
+
+# 候補エンコーディング指定のテスト
+def test_load_csv_with_candidate_encodings(tmp_path):
+    file_path = tmp_path / "sample_eucjp.csv"
+    file_path.write_bytes("名前,年齢\n花子,29".encode("euc-jp"))
+
+    df = load_csv_to_dataframe(file_path, encodings=["utf-8", "euc-jp"])
+    assert list(df.columns) == ["名前", "年齢"]
+
+# チャンク読み込みのテスト
+def test_iter_csv_chunks(tmp_path):
+    file_path = tmp_path / "long.csv"
+    file_path.write_text("Name,Age\n" + "".join(f"User{i},{i}\n" for i in range(25)), encoding="utf-8")
+
+    chunks = list(iter_csv_chunks(file_path, chunksize=10))
+    assert [len(chunk) for chunk in chunks] == [10, 10, 5]
+    assert list(pd.concat(chunks)["Age"]) == list(range(25))
+
+def test_iter_csv_chunks_with_encoding_error(tmp_path):
+    file_path = tmp_path / "sample_shiftjis.csv"
+    file_path.write_bytes("名前,年齢\n花子,29\n太郎,35".encode("shift_jis"))
+
+    chunks = list(iter_csv_chunks(file_path, chunksize=1))
+    assert len(chunks) == 2
+    assert list(chunks[0].columns) == ["名前", "年齢"]
+
+def test_late_encoding_error_tries_remaining_candidates(tmp_path):
+    # サンプル部分はASCIIのみなので、検出結果(ascii)ではなく残りの候補cp932で読み直す
+    file_path = tmp_path / "late_cp932.csv"
+    file_path.write_bytes(("Name,Age\n" + "User,1\n" * 100 + "花子,29\n").encode("cp932"))
+
+    df = load_csv_to_dataframe(file_path, encodings=["utf-8", "cp932"], sample_size=100)
+    assert df["Name"].iloc[-1] == "花子"
+    chunks = list(iter_csv_chunks(file_path, chunksize=1000, encodings=["utf-8", "cp932"], sample_size=100))
+    assert chunks[0]["Name"].iloc[-1] == "花子"
+
+def test_iter_folder_chunks(tmp_path):
+    (tmp_path / "a.csv").write_text("Name,Age\nAlice,30\nBob,25\nCarol,41", encoding="utf-8")
+    (tmp_path / "b.csv").write_text("Name,Age\nDave,52", encoding="utf-8")
+
+    chunks = list(iter_folder_chunks(tmp_path, chunksize=2))
+    assert [len(chunk) for chunk in chunks] == [2, 1, 1]
+
+def test_aggregate_chunks_matches_groupby():
+    df = pd.DataFrame({"Gender": ["F", "M", "F", "M", "F"], "Age": [30, 25, 41, 52, 28]})
+    chunks = [df.iloc[:2], df.iloc[2:4], df.iloc[4:]]
+
+    result = aggregate_chunks(chunks, {"Age": ["sum", "mean", "min", "max", "count"]}, by="Gender")
+    expected = df.groupby("Gender").agg({"Age": ["sum", "mean", "min", "max", "count"]})
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+
+    total = aggregate_chunks(iter(chunks), {"Age": "sum"})
+    assert total["Age"].iloc[0] == df["Age"].sum()
+
+def test_aggregate_chunks_invalid_aggregate():
+    with pytest.raises(ValueError):
+        aggregate_chunks([pd.DataFrame({"Age": [1]})], {"Age": "median"})
+
+# 差分読み込みのテスト
+def test_incremental_folder_loader(tmp_path, mocker):
+    (tmp_path / "a.csv").write_text("Name,Age\nAlice,30", encoding="utf-8")
+    (tmp_path / "b.csv").write_text("Name,Age\nBob,25\nCarol,41", encoding="utf-8")
+
+    loader = IncrementalFolderLoader(tmp_path)
+    df = loader.load()
+    assert list(df["Name"]) == ["Alice", "Bob", "Carol"]
+    assert loader.manifest[os.path.join(tmp_path, "b.csv")].rows == 2
+
+    # 変更がなければ再読み込みしない
+    spy = mocker.spy(pd, "read_csv")
+    assert loader.load() is df
+    spy.assert_not_called()
+
+    # 追加・変更・削除
+    (tmp_path / "c.csv").write_text("Name,Age\nDave,52", encoding="utf-8")
+    stat = os.stat(tmp_path / "a.csv")
+    (tmp_path / "a.csv").write_text("Name,Age\nAlicia,31", encoding="utf-8")
+    os.utime(tmp_path / "a.csv", ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    (tmp_path / "b.csv").unlink()
+
+    df = loader.load()
+    assert spy.call_count == 2  # a.csv と c.csv のみ
+    assert list(df["Name"]) == ["Alicia", "Dave"]
+    pd.testing.assert_frame_equal(df, load_all_files_in_folder(tmp_path))
+    assert set(loader.manifest) == {os.path.join(tmp_path, "a.csv"), os.path.join(tmp_path, "c.csv")}
+
+def test_incremental_folder_loader_with_schema(tmp_path):
+    (tmp_path / "a.csv").write_text("Id,Code,Score\n1,10,2.5\n2,11,3.5\n", encoding="utf-8")
+    (tmp_path / "b.csv").write_text("Id,Code,Score,Extra\n3,X7,4.5,1\n", encoding="utf-8")
+
+    loader = IncrementalFolderLoader(tmp_path, schema='infer')
+    df = loader.load()
+    assert loader.errors == []
+    pd.testing.assert_frame_equal(df, load_all_files_in_folder(tmp_path, schema='infer'))
+
+    # 後から追加したファイルも最初に推論したスキーマで読む
+    (tmp_path / "c.csv").write_text("Id,Code,Score\n5,12,\n", encoding="utf-8")
+    df = loader.load()
+    assert df["Id"].tolist() == [1, 2, 3, 5]
+    assert df["Id"].dtype == "Int64"
+    assert df["Code"].dtype == "str"
+    assert "Extra" in df.columns
+
+    with pytest.raises(ValueError, match="schema"):
+        IncrementalFolderLoader(tmp_path, schema='auto').load()
+
+def test_incremental_folder_loader_with_source_column(tmp_path):
+    (tmp_path / "a.csv").write_text("Name,Age\nAlice,30", encoding="utf-8")
+    (tmp_path / "b.csv").write_text("Name,Age\nBob,25\nCarol,41", encoding="utf-8")
+
+    loader = IncrementalFolderLoader(tmp_path, source_column="Source")
+    df = loader.load()
+    assert loader.errors == []
+    assert df["Source"].tolist() == ["a.csv", "b.csv", "b.csv"]
+
+    (tmp_path / "c.csv").write_text("Name,Age\nDave,52", encoding="utf-8")
+    (tmp_path / "a.csv").unlink()
+    df = loader.load()
+    assert df["Source"].tolist() == ["b.csv", "b.csv", "c.csv"]
+    assert isinstance(df["Source"].dtype, pd.CategoricalDtype)
+    pd.testing.assert_frame_equal(df, load_all_files_in_folder(tmp_path, source_column="Source"))
+
+# 型最適化のテスト
+def test_load_with_optimize(tmp_path):
+    for i in range(2):
+        (tmp_path / f"data{i}.csv").write_text("Name,Gender,Age\n" + "".join(f"User{j},{'FM'[j % 2]},{j}\n" for j in range(100)), encoding="utf-8")
+
+    df = load_csv_to_dataframe(tmp_path / "data0.csv", optimize=True)
+    assert isinstance(df["Gender"].dtype, pd.CategoricalDtype)
+    assert df["Age"].dtype == "uint8"
+
+    combined = load_all_files_in_folder(tmp_path, optimize=True)
+    assert isinstance(combined["Gender"].dtype, pd.CategoricalDtype)
+    assert len(combined) == 200
+
+# スキーマ統一のテスト
+def test_load_all_files_in_folder_with_schema(tmp_path):
+    (tmp_path / "a.csv").write_text("Id,Code,Score\n1,10,2.5\n2,11,3.5\n", encoding="utf-8")
+    (tmp_path / "b.csv").write_text("Id,Code,Score,Extra\n3,X7,4.5,1\n4,12,,2\n", encoding="utf-8")
+
+    df = load_all_files_in_folder(tmp_path, schema='infer', source_column="Source")
+    assert df["Id"].dtype == "Int64"
+    assert df["Code"].dtype == "str"
+    assert df["Extra"].dtype == "Int64"
+    assert list(df["Code"]) == ["10", "11", "X7", "12"]
+    assert isinstance(df["Source"].dtype, pd.CategoricalDtype)
+    assert list(df["Source"]) == ["a.csv", "a.csv", "b.csv", "b.csv"]
+
+    df = load_all_files_in_folder(tmp_path, schema={"Id": "int32", "Score": "float32"})
+    assert list(df.columns) == ["Id", "Score"]
+    assert df["Id"].dtype == "int32"
+
+def test_infer_schema_with_blanks_after_the_sample(tmp_path):
+    # サンプル行より後の空欄でファイル全体が落ちないこと
+    rows = "".join(f"{i},{i % 2 == 0}\n" for i in range(1500))
+    (tmp_path / "data.csv").write_text("Id,Flag\n" + rows + ",\n", encoding="utf-8")
+
+    df = load_all_files_in_folder(tmp_path, schema='infer')
+    assert len(df) == len(load_all_files_in_folder(tmp_path)) == 1501
+    assert df["Id"].dtype == "Int64"
+    assert df["Flag"].dtype == "boolean"
+    assert df["Id"].isna().sum() == 1
+
+def test_load_all_files_in_folder_invalid_schema(sample_folder):
+    with pytest.raises(ValueError):
+        load_all_files_in_folder(sample_folder, schema='auto')
+
+# 列の選択と行フィルタのテスト
+def test_load_csv_with_columns_and_where(tmp_path, mocker):
+    mocker.patch("streamlit_data_viz_helper.data_processing.CHUNKSIZE", 10)
+    file_path = tmp_path / "data.csv"
+    file_path.write_text("Date,City,Score,Note\n" + "".join(f"2024-01-{i + 1:02d},{'Tokyo' if i % 2 else 'Osaka'},{i},x\n" for i in range(31)), encoding="utf-8")
+
+    df = load_csv_to_dataframe(file_path, columns=["Score"], where={"Date": (pd.Timestamp("2024-01-10"), pd.Timestamp("2024-01-20")), "City": ["Tokyo"]})
+    assert list(df.columns) == ["Score"]
+    assert df["Score"].tolist() == [9, 11, 13, 15, 17, 19]
+    assert df.index.tolist() == list(range(6))
+
+    with pytest.raises(ValueError):
+        load_csv_to_dataframe(file_path, columns=["Score"], usecols=["Score"])
+
+def test_load_all_files_in_folder_with_columns_and_where(sample_folder):
+    df = load_all_files_in_folder(sample_folder, columns=["Name"], where={"Gender": "Female"})
+    assert list(df.columns) == ["Name"]
+    assert set(df["Name"]) == {"Alice"}
+
+def test_load_all_files_in_folder_with_columns_missing_from_some_files(tmp_path):
+    # ヘッダーが違うファイルも読み込み、足りない列は欠損値にする
+    (tmp_path / "a.csv").write_text("A,B,C\n1,2,3\n", encoding="utf-8")
+    (tmp_path / "b.csv").write_text("A,C\n4,6\n", encoding="utf-8")
+
+    df, errors = load_all_files_in_folder(str(tmp_path), columns=["A", "B"], return_errors=True)
+    assert errors == []
+    expected = load_all_files_in_folder(str(tmp_path))[["A", "B"]]
+    pd.testing.assert_frame_equal(df, expected)
+    assert df["B"].isna().tolist() == [False, True]
+
+# 複数シートのExcelテスト
+@pytest.fixture
+def sample_workbook(tmp_path):
+    file_path = tmp_path / "book.xlsx"
+    with pd.ExcelWriter(file_path) as writer:
+        for i, name in enumerate(["東京", "大阪", "名古屋"]):
+            pd.DataFrame({"Id": [i * 10 + j for j in range(5)], "Value": [float(j) for j in range(5)]}).to_excel(writer, sheet_name=name, index=False)
+    return file_path
+
+@pytest.mark.parametrize("max_workers", [None, 2])
+def test_load_excel_all_sheets(sample_workbook, max_workers):
+    df = load_excel_to_dataframe(sample_workbook, sheet_name=None, sheet_column="Sheet", max_workers=max_workers)
+    assert len(df) == 15
+    assert isinstance(df["Sheet"].dtype, pd.CategoricalDtype)
+    assert list(df["Sheet"].cat.categories) == ["東京", "大阪", "名古屋"]
+    assert list(df.loc[df["Sheet"] == "大阪", "Id"]) == [10, 11, 12, 13, 14]
+
+    sheets = load_excel_to_dataframe(sample_workbook, sheet_name=["大阪", "名古屋"], max_workers=max_workers)
+    assert list(sheets) == ["大阪", "名古屋"]
+
+def test_load_excel_engine_selection(sample_excel, mocker):
+    spy = mocker.spy(pd, "read_excel")
+    mocker.patch("importlib.util.find_spec", return_value=None)
+    load_excel_to_dataframe(sample_excel)
+    assert spy.call_args.kwargs["engine"] is None
+
+    load_excel_to_dataframe(sample_excel, engine="openpyxl")
+    assert spy.call_args.kwargs["engine"] == "openpyxl"
+
+def test_load_all_files_in_folder_with_sheets(tmp_path, sample_workbook):
+    (tmp_path / "extra.csv").write_text("Id,Value\n99,1.5\n", encoding="utf-8")
+    df = load_all_files_in_folder(tmp_path, header=0, sheet_name=None)
+    assert len(df) == 16
+    assert df["sheet"].value_counts().to_dict() == {"東京": 5, "大阪": 5, "名古屋": 5}
+    assert df["sheet"].isna().sum() == 1
+
+def test_iter_excel_chunks(sample_workbook):
+    chunks = list(iter_excel_chunks(sample_workbook, sheet_name="大阪", chunksize=2))
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    combined = pd.concat(chunks)
+    pd.testing.assert_frame_equal(combined, pd.read_excel(sample_workbook, sheet_name="大阪"))
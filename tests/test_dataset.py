@@ -0,0 +1,129 @@
+import sys
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+pytest.importorskip("duckdb")
+
+from streamlit_data_viz_helper.data_processing import load_all_files_in_folder
+from streamlit_data_viz_helper.dataset import FolderDataset
+from streamlit_data_viz_helper.filtering import FilterSpec, apply_filter_spec
+
+@pytest.fixture
+def sales_folder(tmp_path):
+    (tmp_path / "2023").mkdir()
+    pd.DataFrame({
+        "City": ["Tokyo", "Osaka", "Nagoya", "Tokyo"],
+        "Sales": [10, 20, 30, 40],
+        "Note": ["first order", "repeat", "first visit", "bulk"],
+    }).to_csv(tmp_path / "a.csv", index=False)
+    # 列の順番と構成が違うファイルも列名で揃える
+    pd.DataFrame({"Sales": [50, 60], "City": ["Osaka", "Sapporo"]}).to_csv(tmp_path / "2023" / "b.csv", index=False)
+    pd.DataFrame({"City": ["Fukuoka"], "Sales": [70]}).to_excel(tmp_path / "c.xlsx", index=False)
+    return tmp_path
+
+@pytest.fixture
+def dataset(sales_folder):
+    with FolderDataset(str(sales_folder), include_subfolders=True) as dataset:
+        yield dataset
+
+def test_query_matches_pandas(sales_folder, dataset):
+    expected = load_all_files_in_folder(str(sales_folder), include_subfolders=True, header=0)
+    assert dataset.count() == len(expected)
+    assert set(dataset.columns) == set(expected.columns)
+
+    df = dataset.query(columns=["City", "Sales"], order_by="Sales")
+    assert df["Sales"].tolist() == sorted(expected["Sales"].tolist())
+
+    spec = FilterSpec().isin("City", ["Tokyo", "Osaka"]).between("Sales", 15, 45)
+    df = dataset.query(columns=["City", "Sales"], where=spec, order_by="Sales")
+    filtered = apply_filter_spec(expected, spec).sort_values("Sales")
+    assert df["City"].tolist() == filtered["City"].tolist()
+    assert df["Sales"].tolist() == filtered["Sales"].tolist()
+    assert dataset.count(spec) == len(filtered)
+
+    df = dataset.query(columns=["Note"], where=FilterSpec().contains("Note", "first"), order_by="Note")
+    assert df["Note"].tolist() == ["first order", "first visit"]
+
+    df = dataset.query(columns=["Sales"], order_by="Sales", ascending=False, limit=2, offset=1)
+    assert df["Sales"].tolist() == [60, 50]
+
+def test_aggregate_matches_groupby(sales_folder, dataset):
+    expected = load_all_files_in_folder(str(sales_folder), include_subfolders=True, header=0)
+
+    result = dataset.aggregate({"Sales": "sum"}, by="City")
+    pd.testing.assert_series_equal(
+        result["Sales"], expected.groupby("City")["Sales"].sum(), check_dtype=False, check_index_type=False
+    )
+
+    result = dataset.aggregate({"Sales": ["mean", "max", "count"]}, where={"City": ["Tokyo"]})
+    assert result[("Sales", "mean")].iloc[0] == 25
+    assert result[("Sales", "max")].iloc[0] == 40
+    assert result[("Sales", "count")].iloc[0] == 2
+
+    with pytest.raises(ValueError, match="Unsupported aggregate"):
+        dataset.aggregate({"Sales": "std"})
+
+def test_histogram(dataset):
+    bins, widths = dataset.histogram("Sales", nbins=3)
+    assert bins["count"].tolist() == [2, 2, 3]
+    assert np.allclose(widths, 20)
+    assert np.allclose(bins["Sales"], [20, 40, 60])
+
+    counts, widths = dataset.histogram("City")
+    assert widths is None
+    assert dict(zip(counts["City"], counts["count"])) == {"Fukuoka": 1, "Nagoya": 1, "Osaka": 2, "Sapporo": 1, "Tokyo": 2}
+
+def test_datetime_histogram(tmp_path):
+    dates = pd.date_range("2024-01-01", periods=10, freq="D")
+    pd.DataFrame({"Date": dates, "Sales": range(10)}).to_csv(tmp_path / "sales.csv", index=False)
+
+    with FolderDataset(str(tmp_path)) as dataset:
+        bins, widths = dataset.histogram("Date", nbins=3)
+        assert bins["count"].sum() == 10
+        assert pd.api.types.is_datetime64_any_dtype(bins["Date"])
+        # 日付軸の幅はミリ秒
+        assert np.allclose(widths, 3 * 24 * 3600 * 1000)
+
+        profile = dataset.profiles()["Date"]
+        assert profile.kind == "datetime"
+        assert (profile.min, profile.max) == (dates[0], dates[-1])
+
+def test_profiles(dataset):
+    profiles = dataset.profiles()
+    assert profiles["City"].kind == "categorical"
+    assert profiles["City"].values == ["Fukuoka", "Nagoya", "Osaka", "Sapporo", "Tokyo"]
+    assert profiles["City"].nunique == 5
+    assert profiles["Sales"].kind == "categorical"
+    assert dataset.profiles() is profiles
+
+def test_numeric_profile(tmp_path):
+    pd.DataFrame({"Sales": np.arange(1000) * 1.5}).to_csv(tmp_path / "sales.csv", index=False)
+
+    with FolderDataset(str(tmp_path)) as dataset:
+        profile = dataset.profiles()["Sales"]
+        assert profile.kind == "numeric"
+        assert (profile.min, profile.max) == (0, 1498.5)
+        assert abs(profile.quantiles[0.5] - 750) < 30
+
+def test_to_csv(tmp_path, dataset):
+    path = dataset.to_csv(str(tmp_path / "export.csv.gz"), columns=["City", "Sales"], where={"City": ["Osaka"]}, compression="gzip")
+    df = pd.read_csv(path)
+    assert sorted(df["Sales"].tolist()) == [20, 50]
+    assert list(df.columns) == ["City", "Sales"]
+
+    with pytest.raises(ValueError, match="compression"):
+        dataset.to_csv(str(tmp_path / "export.csv.bz2"), compression="bz2")
+
+def test_source_column(sales_folder):
+    with FolderDataset(str(sales_folder), include_subfolders=True, source_column="source") as dataset:
+        counts = dataset.aggregate({"Sales": "count"}, by="source")
+    assert counts["Sales"].to_dict() == {"2023/b.csv": 2, "a.csv": 4, "c.xlsx": 1}
+
+def test_empty_folder(tmp_path):
+    with pytest.raises(ValueError, match="No valid files"):
+        FolderDataset(str(tmp_path))
@@ -0,0 +1,68 @@
+import sys
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from streamlit_data_viz_helper.downsampling import lttb, minmax, random_sample, density_sample, reduce_points
+
+@pytest.fixture
+def signal():
+    x = np.arange(10_000, dtype=float)
+    y = np.sin(x / 500)
+    y[4321] = 10  # spike
+    return x, y
+
+def test_lttb(signal):
+    x, y = signal
+    selected = lttb(x, y, 200)
+    assert len(selected) == 200
+    assert selected[0] == 0 and selected[-1] == len(x) - 1
+    assert np.all(np.diff(selected) > 0)
+    assert 4321 in selected
+
+def test_minmax(signal):
+    x, y = signal
+    selected = minmax(x, y, 200)
+    assert len(selected) <= 200
+    assert np.all(np.diff(selected) > 0)
+    assert 4321 in selected
+    assert y[selected].min() == y.min()
+
+def test_random_sample_is_reproducible(signal):
+    x, y = signal
+    selected = random_sample(x, y, 500)
+    assert len(selected) == 500
+    assert np.array_equal(selected, random_sample(x, y, 500))
+
+def test_density_sample_keeps_outliers():
+    rng = np.random.default_rng(1)
+    x = np.concatenate([rng.normal(0, 1, 50_000), [100.0]])
+    y = np.concatenate([rng.normal(0, 1, 50_000), [100.0]])
+    selected = density_sample(x, y, 1000)
+    assert len(selected) <= 1000
+    assert len(x) - 1 in selected
+
+def test_reduce_points_per_legend_group():
+    df = pd.DataFrame({
+        "x": np.tile(np.arange(5000), 2),
+        "y": np.random.default_rng(0).random(10_000),
+        "group": ["A"] * 5000 + ["B"] * 5000,
+    })
+    reduced = reduce_points(df, "x", "y", 1000, method="lttb", legend="group")
+    assert len(reduced) <= 1000
+    assert reduced["group"].value_counts().to_dict() == {"A": 500, "B": 500}
+    assert reduced.index.is_monotonic_increasing
+
+def test_reduce_points_small_frame_and_custom_method():
+    df = pd.DataFrame({"x": range(10), "y": range(10)})
+    assert reduce_points(df, "x", "y", 100) is df
+
+    reduced = reduce_points(df, "x", "y", 5, method=lambda x, y, n: np.arange(0, len(x), 2))
+    assert list(reduced["x"]) == [0, 2, 4, 6, 8]
+
+    with pytest.raises(ValueError):
+        reduce_points(df, "x", "y", 5, method="nearest")
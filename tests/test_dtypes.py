@@ -0,0 +1,76 @@
+import sys
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from streamlit_data_viz_helper.dtypes import optimize_dtypes
+
+@pytest.fixture
+def sample_dataframe():
+    n = 1000
+    return pd.DataFrame({
+        "Prefecture": np.random.default_rng(0).choice(["東京都", "大阪府", "愛知県"], n),
+        "Id": [f"ID{i:05d}" for i in range(n)],
+        "Count": np.arange(n) % 200,
+        "Delta": np.arange(n) % 7 - 3,
+        "Half": np.arange(n) / 2,
+        "Ratio": np.random.default_rng(0).random(n),
+    })
+
+def test_optimize_dtypes(sample_dataframe):
+    optimized, report = optimize_dtypes(sample_dataframe)
+
+    assert isinstance(optimized["Prefecture"].dtype, pd.CategoricalDtype)
+    assert not isinstance(optimized["Id"].dtype, pd.CategoricalDtype)
+    assert optimized["Count"].dtype == np.uint8
+    assert optimized["Delta"].dtype == np.int8
+    assert optimized["Half"].dtype == np.float32  # exact in float32
+    assert optimized["Ratio"].dtype == np.float64  # would lose precision
+
+    pd.testing.assert_frame_equal(optimized, sample_dataframe, check_dtype=False, check_categorical=False)
+    assert report.loc["Prefecture", "bytes_saved"] > 0
+    assert report.loc["Ratio", "bytes_saved"] == 0
+    assert report["bytes_saved"].sum() == report["bytes_before"].sum() - report["bytes_after"].sum()
+
+def test_optimize_dtypes_string_storage(sample_dataframe):
+    optimized, report = optimize_dtypes(sample_dataframe, downcast=False, string_storage="pyarrow")
+    assert optimized["Id"].dtype == pd.StringDtype("pyarrow")
+    assert optimized["Count"].dtype == sample_dataframe["Count"].dtype
+    assert report.loc["Id", "dtype_after"] == "string"
+
+    with pytest.raises(ValueError):
+        optimize_dtypes(sample_dataframe, string_storage="arrow")
+
+def test_optimize_dtypes_keeps_high_cardinality_text():
+    # 10万行で4万種類の列は低カーディナリティではない
+    n = 100_000
+    df = pd.DataFrame({
+        "Code": [f"C{i % 40_000}" for i in range(n)],
+        "Shop": [f"S{i % 2_000}" for i in range(n)],
+        "City": [f"City{i % 50}" for i in range(n)],
+    })
+    optimized, _ = optimize_dtypes(df)
+    assert not isinstance(optimized["Code"].dtype, pd.CategoricalDtype)
+    assert not isinstance(optimized["Shop"].dtype, pd.CategoricalDtype)  # above max_categories
+    assert isinstance(optimized["City"].dtype, pd.CategoricalDtype)
+
+    optimized, _ = optimize_dtypes(df, max_categories=5_000)
+    assert isinstance(optimized["Shop"].dtype, pd.CategoricalDtype)
+
+def test_optimize_dtypes_all_na_integers():
+    # 推論したスキーマや where の結果で、全て欠損の Int64 列ができることがある
+    df = pd.DataFrame({
+        "Empty": pd.Series([pd.NA] * 3, dtype="Int64"),
+        "Partial": pd.Series([1, pd.NA, 3], dtype="Int64"),
+    })
+    optimized, _ = optimize_dtypes(df)
+    assert optimized["Empty"].isna().all()
+    assert optimized["Partial"].dtype == "UInt8"
+    assert optimized["Partial"].tolist() == [1, pd.NA, 3]
+
+    optimized, _ = optimize_dtypes(df.iloc[:0])
+    assert len(optimized) == 0
@@ -0,0 +1,64 @@
+import sys
+import os
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from streamlit_data_viz_helper import encoding
+from streamlit_data_viz_helper.encoding import detect_encoding, sample_decodes, resolve_encoding, clear_encoding_cache, fallback_encodings, read_with_fallback
+
+@pytest.fixture
+def shiftjis_file(tmp_path):
+    file_path = tmp_path / "sample_shiftjis.csv"
+    data = ("名前,年齢,性別\n" + "花子,29,女性\n太郎,35,男性\n" * 200).encode("shift_jis")
+    file_path.write_bytes(data)
+    return file_path
+
+def test_sample_decodes(shiftjis_file):
+    assert sample_decodes(shiftjis_file, "cp932")
+    assert not sample_decodes(shiftjis_file, "utf-8")
+    assert not sample_decodes(shiftjis_file, "no-such-encoding")
+
+def test_sample_decodes_ignores_truncated_character(tmp_path):
+    file_path = tmp_path / "utf8.csv"
+    file_path.write_bytes("あいう".encode("utf-8"))
+    # 4 bytes cut the second character in half
+    assert sample_decodes(file_path, "utf-8", sample_size=4)
+
+def test_resolve_encoding_uses_candidates(shiftjis_file):
+    assert resolve_encoding(shiftjis_file, ["utf-8", "cp932", "euc-jp"]) == "cp932"
+
+def test_detect_encoding_is_cached(shiftjis_file, mocker):
+    clear_encoding_cache()
+    detected = detect_encoding(shiftjis_file, sample_size=1024)
+    assert detected is not None
+    assert "データ".encode("shift_jis").decode(detected) == "データ"
+
+    spy = mocker.spy(encoding.chardet, "UniversalDetector")
+    assert detect_encoding(shiftjis_file, sample_size=1024) == detected
+    spy.assert_not_called()
+
+@pytest.fixture
+def late_cp932_file(tmp_path):
+    # 先頭はASCIIのみで、サンプルの後にcp932の文字が出てくるファイル
+    file_path = tmp_path / "late_cp932.csv"
+    file_path.write_bytes(("Name,Age\n" + "User,1\n" * 100 + "花子,29\n").encode("cp932"))
+    return file_path
+
+def test_fallback_encodings(late_cp932_file):
+    clear_encoding_cache()
+    retries = fallback_encodings(late_cp932_file, ["utf-8", "cp932", "UTF8"], "utf-8", sample_size=100)
+    assert retries[0] == "cp932"
+    assert "UTF8" not in retries
+
+def test_read_with_fallback(late_cp932_file):
+    clear_encoding_cache()
+    encodings = ["utf-8", "cp932"]
+    first = resolve_encoding(late_cp932_file, encodings, sample_size=100)
+    assert first == "utf-8"
+    text = read_with_fallback(lambda enc: late_cp932_file.read_bytes().decode(enc), late_cp932_file, first, encodings, sample_size=100)
+    assert text.endswith("花子,29\n")
+
+    with pytest.raises(UnicodeDecodeError):
+        read_with_fallback(lambda enc: late_cp932_file.read_bytes().decode("utf-8"), late_cp932_file, first, encodings, sample_size=100)
@@ -0,0 +1,66 @@
+import sys
+import os
+import io
+import gzip
+import zipfile
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from streamlit_data_viz_helper import export
+from streamlit_data_viz_helper.export import dataframe_to_csv_bytes, clear_export_cache
+
+@pytest.fixture
+def japanese_dataframe():
+    return pd.DataFrame({"名前": ["花子", "太郎", "次郎"] * 5, "年齢": range(15)})
+
+def test_dataframe_to_csv_bytes_matches_to_csv(japanese_dataframe):
+    expected = japanese_dataframe.to_csv().encode("utf-8-sig")
+    assert dataframe_to_csv_bytes(japanese_dataframe, chunksize=4, use_cache=False) == expected
+    assert dataframe_to_csv_bytes(japanese_dataframe.iloc[:0], use_cache=False) == japanese_dataframe.iloc[:0].to_csv().encode("utf-8-sig")
+
+def test_dataframe_to_csv_bytes_compression(japanese_dataframe):
+    expected = dataframe_to_csv_bytes(japanese_dataframe, use_cache=False)
+    assert gzip.decompress(dataframe_to_csv_bytes(japanese_dataframe, compression="gzip", use_cache=False)) == expected
+
+    archive = zipfile.ZipFile(io.BytesIO(dataframe_to_csv_bytes(japanese_dataframe, compression="zip", file_name="people.csv", use_cache=False)))
+    assert archive.read("people.csv") == expected
+
+    with pytest.raises(ValueError):
+        dataframe_to_csv_bytes(japanese_dataframe, compression="bz2")
+
+def test_dataframe_to_csv_bytes_cache(japanese_dataframe, mocker):
+    clear_export_cache()
+    data = dataframe_to_csv_bytes(japanese_dataframe)
+
+    spy = mocker.spy(export, "_write_csv")
+    assert dataframe_to_csv_bytes(japanese_dataframe.copy()) is data
+    spy.assert_not_called()
+
+    changed = japanese_dataframe.copy()
+    changed.loc[7, "年齢"] = 100
+    assert dataframe_to_csv_bytes(changed) != data
+
+def test_dataframe_to_csv_bytes_cache_is_bounded_by_size(japanese_dataframe, mocker):
+    size = len(dataframe_to_csv_bytes(japanese_dataframe, use_cache=False))
+    mocker.patch.object(export._exports, "max_bytes", size * 2)
+    clear_export_cache()
+
+    # 予算を超えるエクスポートはキャッシュしない
+    dataframe_to_csv_bytes(pd.concat([japanese_dataframe] * 3))
+    assert len(export._exports) == 0
+
+    # 同じサイズのエクスポートを3つ作ると、最も古いものが追い出される
+    frames = [japanese_dataframe, japanese_dataframe.iloc[::-1], japanese_dataframe.sample(frac=1, random_state=0)]
+    for frame in frames:
+        dataframe_to_csv_bytes(frame)
+    assert export._exports.total_bytes == size * 2
+    assert len(export._exports) == 2
+    spy = mocker.spy(export, "_write_csv")
+    dataframe_to_csv_bytes(frames[2])
+    spy.assert_not_called()
+    dataframe_to_csv_bytes(frames[0])
+    spy.assert_called_once()
+    clear_export_cache()
@@ -0,0 +1,202 @@
+import sys
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from streamlit_data_viz_helper import filtering, utils
+from streamlit_data_viz_helper.filtering import (
+    profile_dataframe,
+    coerce_datetimes,
+    clear_profile_cache,
+    FilterSpec,
+    build_mask,
+    apply_filter_spec,
+    CategoryIndex,
+    SortedIndex,
+    DataFrameIndex,
+    index_dataframe,
+)
+from streamlit_data_viz_helper.sketches import SubstringIndex
+
+@pytest.fixture
+def sample_dataframe():
+    return pd.DataFrame({
+        "Name": [f"User{i}" for i in range(20)],
+        "Age": list(range(20, 40)),
+        "City": ["Tokyo", "Osaka"] * 10,
+        "Joined": pd.date_range("2024-01-01", periods=20, tz="Asia/Tokyo").strftime("%Y-%m-%d %H:%M:%S%z"),
+    })
+
+def test_profile_dataframe(sample_dataframe):
+    clear_profile_cache()
+    profiles = profile_dataframe(sample_dataframe)
+
+    assert profiles["Name"].kind == "text"
+    assert profiles["Age"].kind == "numeric"
+    assert (profiles["Age"].min, profiles["Age"].max) == (20, 39)
+    assert profiles["City"].kind == "categorical"
+    assert profiles["City"].values == ["Tokyo", "Osaka"]
+    assert profiles["Joined"].kind == "datetime"
+    assert profiles["Joined"].parse_datetime
+    assert profiles["Joined"].min == pd.Timestamp("2024-01-01")
+
+def test_profile_dataframe_is_memoized(sample_dataframe, mocker):
+    clear_profile_cache()
+    profiles = profile_dataframe(sample_dataframe)
+
+    spy = mocker.spy(filtering, "_profile_column")
+    assert profile_dataframe(sample_dataframe.copy()) is profiles
+    spy.assert_not_called()
+
+    changed = sample_dataframe.assign(Age=sample_dataframe["Age"] + 1)
+    assert profile_dataframe(changed)["Age"].min == 21
+
+    # 抽出サンプル外の行だけが変わっても古いプロファイルを返さない
+    large = pd.DataFrame({"x": np.arange(10_000, dtype=float)})
+    edited = large.copy()
+    edited.loc[1, "x"] = -5.0
+    assert profile_dataframe(large)["x"].min == 0.0
+    assert profile_dataframe(edited)["x"].min == -5.0
+
+def test_profile_dataframe_reuses_the_frame_key(mocker):
+    clear_profile_cache()
+    df = pd.DataFrame({"x": np.arange(100), "y": ["a", "b"] * 50})
+    spy = mocker.spy(utils, "dataframe_content_hash")
+    profiles = profile_dataframe(df)
+    # 同じオブジェクトでの再実行では内容を読み直さない
+    assert profile_dataframe(df) is profiles
+    assert spy.call_count == 1
+
+    # 列の構成が変われば再計算する
+    df["z"] = 1.0
+    assert "z" in profile_dataframe(df)
+    assert spy.call_count == 2
+
+def test_coerce_datetimes(sample_dataframe):
+    df = coerce_datetimes(sample_dataframe)
+    assert pd.api.types.is_datetime64_dtype(df["Joined"])
+    assert df["Name"].equals(sample_dataframe["Name"])
+    # The original frame is left untouched
+    assert not pd.api.types.is_datetime64_any_dtype(sample_dataframe["Joined"])
+
+def test_apply_filter_spec(sample_dataframe):
+    df = coerce_datetimes(sample_dataframe)
+    spec = (
+        FilterSpec()
+        .isin("City", ["Tokyo"])
+        .between("Age", 22, 30)
+        .contains("Name", r"User[2-6]$")
+        .between("Joined", pd.Timestamp("2024-01-05"), pd.Timestamp("2024-01-31"))
+    )
+    result = apply_filter_spec(df, spec)
+
+    expected = df[
+        (df["City"] == "Tokyo")
+        & df["Age"].between(22, 30)
+        & df["Name"].str.contains(r"User[2-6]$")
+        & (df["Joined"] >= "2024-01-05")
+    ]
+    pd.testing.assert_frame_equal(result, expected)
+    assert list(result["Name"]) == ["User4", "User6"]
+
+def test_apply_filter_spec_handles_missing_values():
+    df = pd.DataFrame({"Score": [1.0, None, 3.0], "Tag": ["a", None, "b"]})
+    assert list(build_mask(df, FilterSpec().between("Score", 0, 5))) == [True, False, True]
+    assert len(apply_filter_spec(df, FilterSpec().contains("Tag", "a"))) == 1
+    assert apply_filter_spec(df, FilterSpec()) is df
+
+def test_filter_spec_invalid_op():
+    with pytest.raises(ValueError):
+        FilterSpec().add("Age", "greater", 3)
+
+def test_filter_spec_from_dict(sample_dataframe):
+    spec = FilterSpec.from_dict({"Age": (25, 30), "City": ["Tokyo"], "Name": "User6"})
+    assert [condition.op for condition in spec.conditions] == ["between", "isin", "isin"]
+    assert spec.columns == ["Age", "City", "Name"]
+    assert list(apply_filter_spec(sample_dataframe, spec)["Name"]) == ["User6"]
+    assert FilterSpec.from_dict(spec) is spec
+
+def test_build_mask_with_datetime_bounds_on_text():
+    df = pd.DataFrame({"Date": ["2024-01-01", "2024-01-15", "not a date", "2024-02-01"]})
+    spec = FilterSpec().between("Date", pd.Timestamp("2024-01-10"), pd.Timestamp("2024-02-01"))
+    assert build_mask(df, spec).tolist() == [False, True, False, True]
+
+def test_dataframe_index_matches_build_mask(sample_dataframe):
+    df = sample_dataframe.assign(Score=[None if i % 7 == 0 else i / 2 for i in range(20)])
+    index = DataFrameIndex(df)
+    spec = (
+        FilterSpec()
+        .isin("City", ["Osaka"])
+        .between("Score", 2, 8)
+        .between("Joined", pd.Timestamp("2024-01-03"), pd.Timestamp("2024-01-15"))
+        .contains("Name", "1")
+    )
+    expected = build_mask(coerce_datetimes(df), spec)
+    assert list(index.mask(df, spec)) == list(expected)
+    pd.testing.assert_frame_equal(apply_filter_spec(df, spec, index=index), df[expected])
+
+def test_dataframe_index_column_indexes(sample_dataframe):
+    index = DataFrameIndex(sample_dataframe)
+
+    category_index = index.column(sample_dataframe, "City")
+    assert isinstance(category_index, CategoryIndex)
+    assert category_index.values == ["Tokyo", "Osaka"]
+
+    sorted_index = index.column(sample_dataframe, "Age")
+    assert isinstance(sorted_index, SortedIndex)
+    assert (sorted_index.min, sorted_index.max) == (20, 39)
+    assert isinstance(index.column(sample_dataframe, "Name"), SubstringIndex)
+
+def test_index_dataframe_is_memoized(sample_dataframe):
+    clear_profile_cache()
+    index = index_dataframe(sample_dataframe)
+    assert index_dataframe(sample_dataframe.copy()) is index
+    assert index_dataframe(sample_dataframe, key=utils.dataframe_key(sample_dataframe)) is index
+
+def test_index_dataframe_detects_changes_outside_the_sample():
+    # 抽出サンプルに含まれない行だけが違うフレームに、別のフレームのインデックスを使わない
+    clear_profile_cache()
+    a = pd.DataFrame({"x": np.arange(10_000) % 10})
+    b = a.copy()
+    b.loc[1, "x"] = 999_999
+    spec = FilterSpec().between("x", 0, 10)
+    assert len(apply_filter_spec(a, spec, index_dataframe(a))) == 10_000
+    assert index_dataframe(b) is not index_dataframe(a)
+    assert 999_999 not in apply_filter_spec(b, spec, index_dataframe(b))["x"].tolist()
+
+def test_category_index_with_many_categories():
+    values = pd.Series([f"code{i % 100}" for i in range(1000)], dtype="category")
+    index = CategoryIndex(values)
+    assert index.bitmaps is None
+    mask = index.mask(FilterSpec().isin("code", ["code3", "code7"]).conditions[0])
+    assert mask.sum() == 20
+
+def test_coerce_datetimes_does_not_copy():
+    df = pd.DataFrame({"Value": range(3), "Date": ["2024-01-01", "2024-01-02", "2024-01-03"]})
+    coerced = coerce_datetimes(df)
+    assert pd.api.types.is_datetime64_any_dtype(coerced["Date"])
+    assert df["Date"].dtype != coerced["Date"].dtype
+    # 変換しない列はコピーせずに共有する
+    assert np.shares_memory(coerced["Value"].to_numpy(), df["Value"].to_numpy())
+
+    numbers = pd.DataFrame({"Value": range(3)})
+    assert coerce_datetimes(numbers) is numbers
+
+def test_large_category_columns_are_not_multiselects():
+    clear_profile_cache()
+    df = pd.DataFrame({
+        "Prefecture": pd.Series([f"P{i % 47}" for i in range(1000)], dtype="category"),
+        "Code": pd.Series([f"C{i % 500}" for i in range(1000)], dtype="category"),
+    })
+    profiles = profile_dataframe(df)
+    assert profiles["Prefecture"].kind == "categorical"
+    assert len(profiles["Prefecture"].values) == 47
+    assert profiles["Code"].kind == "text"
+    assert profiles["Code"].values == []
+
+    spec = FilterSpec().contains("Code", "C49")
+    assert len(apply_filter_spec(df, spec, index_dataframe(df))) == len(apply_filter_spec(df, spec))
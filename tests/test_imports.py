@@ -0,0 +1,37 @@
+import sys
+import os
+import subprocess
+
+import pytest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Seconds a fresh interpreter may spend importing data_processing (mostly pandas)
+IMPORT_TIME_BUDGET = 2.0
+
+HEAVY_MODULES = ('streamlit', 'plotly.express', 'plotly.graph_objects', 'chardet')
+
+def _run(code):
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True)
+    return result.stdout.splitlines()
+
+def test_data_processing_import_time():
+    elapsed, loaded = _run(
+        "import sys, time\n"
+        "start = time.perf_counter()\n"
+        "import streamlit_data_viz_helper.data_processing\n"
+        "print(time.perf_counter() - start)\n"
+        f"print(','.join(name for name in {HEAVY_MODULES!r} if name in sys.modules))\n"
+    )
+    assert loaded == ''
+    assert float(elapsed) < IMPORT_TIME_BUDGET
+
+@pytest.mark.parametrize("module", ["visualization", "streamlit_helpers"])
+def test_ui_modules_defer_heavy_imports(module):
+    loaded, = _run(
+        "import sys\n"
+        "import streamlit_data_viz_helper\n"
+        f"streamlit_data_viz_helper.{module}\n"
+        f"print(','.join(name for name in {HEAVY_MODULES!r} if name in sys.modules))\n"
+    )
+    assert loaded == ''
@@ -0,0 +1,55 @@
+import sys
+import os
+import logging
+
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from streamlit_data_viz_helper.instrumentation import instrument, measure, record, current_recorder
+from streamlit_data_viz_helper.data_processing import load_csv_to_dataframe
+from streamlit_data_viz_helper.filtering import coerce_datetimes
+
+@instrument
+def double(df):
+    return pd.concat([df, df])
+
+def test_instrument_is_inactive_outside_record():
+    assert current_recorder() is None
+    assert len(double(pd.DataFrame({"a": [1]}))) == 2
+
+def test_record_collects_nested_calls(tmp_path):
+    file_path = tmp_path / "data.csv"
+    file_path.write_text("Name,Joined\nAlice,2024-01-01\nBob,2024-02-01\n", encoding="utf-8")
+
+    with record() as recorder:
+        df = load_csv_to_dataframe(file_path)
+        with measure("app.prepare") as entry:
+            df = coerce_datetimes(double(df))
+            entry.rows_out = len(df)
+    assert current_recorder() is None
+
+    names = [entry.name for entry in recorder.records]
+    assert names[0] == "data_processing.load_csv_to_dataframe"
+    assert names.index("app.prepare") < names.index("test_instrumentation.double")
+    prepare = recorder.records[names.index("app.prepare")]
+    assert prepare.depth == 0 and prepare.rows_out == 4
+    assert recorder.records[names.index("test_instrumentation.double")].depth == 1
+    assert recorder.records[0].rows_out == 2
+    assert all(entry["bytes_allocated"] is None for entry in recorder.to_dicts())
+
+    summary = recorder.summary()
+    assert summary["seconds"].is_monotonic_decreasing
+    assert summary.set_index("name").loc["test_instrumentation.double", "rows_in"] == 2
+
+def test_record_traces_memory():
+    with record(trace_memory=True) as recorder:
+        double(pd.DataFrame({"a": range(100_000)}))
+    assert recorder.records[0].bytes_allocated >= 100_000 * 8
+
+def test_recorder_log(caplog):
+    with record() as recorder:
+        double(pd.DataFrame({"a": [1]}))
+    with caplog.at_level(logging.INFO):
+        recorder.log()
+    assert caplog.records[0].instrumentation["name"] == "test_instrumentation.double"
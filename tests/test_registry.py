@@ -0,0 +1,78 @@
+import sys
+import os
+import gc
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from streamlit_data_viz_helper.data_processing import load_csv_to_dataframe
+from streamlit_data_viz_helper.registry import DatasetRegistry
+
+@pytest.fixture
+def sales_csv(tmp_path):
+    file_path = tmp_path / "sales.csv"
+    pd.DataFrame({"City": ["Tokyo", "Osaka"] * 50, "Sales": range(100)}).to_csv(file_path, index=False)
+    return str(file_path)
+
+def test_sessions_share_one_dataset(sales_csv):
+    registry = DatasetRegistry()
+    first = registry.acquire(load_csv_to_dataframe, sales_csv)
+    second = registry.acquire(load_csv_to_dataframe, sales_csv)
+
+    assert first.df is not second.df
+    assert np.shares_memory(first.df["Sales"].to_numpy(), second.df["Sales"].to_numpy())
+    assert registry.stats() == {"hits": 1, "misses": 1, "datasets": 1, "in_use": 1, "total_bytes": registry.total_bytes}
+
+    # 書き込みは他のセッションのデータに影響しない
+    first.df.loc[0, "Sales"] = -1
+    first.df["City"] = "Kyoto"
+    assert second.df.loc[0, "Sales"] == 0
+    assert second.df["City"].iloc[0] == "Tokyo"
+
+def test_changed_file_is_reloaded(sales_csv):
+    registry = DatasetRegistry()
+    lease = registry.acquire(load_csv_to_dataframe, sales_csv)
+    pd.DataFrame({"City": ["Nagoya"], "Sales": [1]}).to_csv(sales_csv, index=False)
+    reloaded = registry.acquire(load_csv_to_dataframe, sales_csv)
+
+    assert reloaded.key != lease.key
+    assert reloaded.df["City"].tolist() == ["Nagoya"]
+    assert registry.stats()["misses"] == 2
+
+def test_idle_datasets_are_evicted(tmp_path):
+    registry = DatasetRegistry(max_bytes=2000)
+    paths = []
+    for name in ["a", "b", "c"]:
+        paths.append(str(tmp_path / f"{name}.csv"))
+        pd.DataFrame({"Value": range(100)}).to_csv(paths[-1], index=False)
+
+    with registry.acquire(load_csv_to_dataframe, paths[0]):
+        pass
+    held = registry.acquire(load_csv_to_dataframe, paths[1])
+    registry.acquire(load_csv_to_dataframe, paths[2]).release()
+
+    # 最も古い未使用のデータセットから追い出される
+    assert registry.stats()["datasets"] == 2
+    assert registry.total_bytes <= 2000
+    assert registry.stats()["in_use"] == 1
+    assert registry.acquire(load_csv_to_dataframe, paths[1]).key == held.key
+    assert registry.stats()["hits"] == 1
+
+def test_lease_released_when_collected(sales_csv):
+    registry = DatasetRegistry(max_bytes=0)
+    lease = registry.acquire(load_csv_to_dataframe, sales_csv)
+    assert registry.stats()["in_use"] == 1
+
+    del lease
+    gc.collect()
+    assert registry.stats()["datasets"] == 0
+    assert registry.total_bytes == 0
+
+def test_failed_load_is_not_kept(tmp_path):
+    registry = DatasetRegistry()
+    with pytest.raises(ValueError):
+        registry.acquire(load_csv_to_dataframe, str(tmp_path / "missing.csv"))
+    assert registry.stats()["datasets"] == 0
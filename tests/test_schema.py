@@ -0,0 +1,57 @@
+import sys
+import os
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from streamlit_data_viz_helper.schema import (
+    concat_frames,
+    conform_to_schema,
+    infer_schema,
+    read_sample,
+    unify_dtypes,
+)
+
+def test_unify_dtypes():
+    assert unify_dtypes([np.dtype("int64"), np.dtype("int32")]) == "int64"
+    assert unify_dtypes([np.dtype("int64")], missing=True) == "Int64"
+    assert unify_dtypes([np.dtype("int64"), np.dtype("float64")]) == "float64"
+    assert unify_dtypes([np.dtype("bool")], missing=True) == "boolean"
+    assert unify_dtypes([np.dtype("int64"), pd.StringDtype()]) == "str"
+
+def test_infer_schema(tmp_path):
+    (tmp_path / "a.csv").write_text("Id,Value\n1,2\n", encoding="utf-8")
+    (tmp_path / "b.csv").write_text("Value,Name\n2.5,Alice\n", encoding="utf-8")
+    (tmp_path / "broken.xlsx").write_bytes(b"not an excel file")
+
+    schema = infer_schema(sorted(str(path) for path in tmp_path.iterdir()))
+    assert list(schema) == ["Id", "Value", "Name"]
+    assert schema["Id"] == "Int64"
+    assert schema["Value"] == "float64"
+
+def test_conform_to_schema():
+    df = pd.DataFrame({"B": ["x", "y"], "A": [1, 2], "C": [0, 0]})
+    conformed = conform_to_schema(df, {"A": "float64", "B": "str", "D": "Int64"})
+    assert list(conformed.columns) == ["A", "B", "D"]
+    assert conformed["A"].dtype == "float64"
+    assert conformed["D"].isna().all()
+
+def test_concat_frames_keeps_categories():
+    frames = [
+        pd.DataFrame({"Gender": pd.Categorical(["F", "M"])}),
+        pd.DataFrame({"Gender": pd.Categorical(["X"])}),
+    ]
+    combined = concat_frames(frames, sources=["a.csv", "b.csv"], source_column="Source")
+    assert isinstance(combined["Gender"].dtype, pd.CategoricalDtype)
+    assert list(combined["Gender"]) == ["F", "M", "X"]
+    assert list(combined["Source"].cat.categories) == ["a.csv", "b.csv"]
+    assert list(combined["Source"]) == ["a.csv", "a.csv", "b.csv"]
+
+def test_read_sample_with_late_encoding_error(tmp_path):
+    file_path = tmp_path / "late_cp932.csv"
+    file_path.write_bytes(("Name,Age\n" + "User,1\n" * 100 + "花子,29\n").encode("cp932"))
+
+    sample = read_sample(str(file_path), encodings=["utf-8", "cp932"], sample_size=100)
+    assert sample["Name"].iloc[-1] == "花子"
@@ -0,0 +1,80 @@
+import sys
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from streamlit_data_viz_helper.filtering import FilterSpec, build_mask, clear_profile_cache, profile_dataframe
+from streamlit_data_viz_helper.sketches import (
+    HyperLogLog,
+    SubstringIndex,
+    approx_nunique,
+    sample_nunique,
+    sample_quantiles,
+    sample_values,
+)
+
+@pytest.mark.parametrize("n", [0, 10, 1000, 100_000])
+def test_approx_nunique(n):
+    values = pd.Series(np.arange(n)).repeat(3)
+    assert approx_nunique(values) == pytest.approx(n, rel=0.05)
+    assert approx_nunique(values.astype(str)) == pytest.approx(n, rel=0.05)
+
+def test_hyperloglog_merge():
+    first = HyperLogLog().update(np.arange(0, 6000))
+    second = HyperLogLog().update(np.arange(4000, 10_000))
+    assert first.merge(second).count() == pytest.approx(10_000, rel=0.05)
+    with pytest.raises(ValueError):
+        first.merge(HyperLogLog(precision=10))
+
+def test_sample_quantiles():
+    series = pd.Series(np.arange(1_000_000))
+    assert len(sample_values(series, 1000)) <= 1000
+    quantiles = sample_quantiles(series)
+    assert quantiles[0.5] == pytest.approx(500_000, rel=0.05)
+
+def test_substring_index_matches_contains():
+    names = pd.Series([f"user_{i % 700}" for i in range(5000)] + [None, "東京タワー", "ab"])
+    index = SubstringIndex(names)
+    assert len(index.values) == 702
+
+    # リテラルも正規表現もstr.containsと同じ結果になる
+    for pattern in ["user_12", "12", "9", "user_(12|34)5$", "zzz", "京タワ", "ab"]:
+        condition = FilterSpec().contains("Name", pattern).conditions[0]
+        expected = names.str.contains(pattern).to_numpy(dtype=bool, na_value=False)
+        assert (index.mask(condition) == expected).all(), pattern
+
+def test_substring_index_candidates():
+    index = SubstringIndex(pd.Series(["apple", "application", "banana"]))
+    assert list(index.values[index.candidates("appl")]) == ["apple", "application"]
+    assert len(index.candidates("xyz")) == 0
+
+def test_profile_estimates_high_cardinality():
+    clear_profile_cache()
+    df = pd.DataFrame({"Value": np.arange(50_000, dtype=float), "Code": [f"c{i}" for i in range(50_000)]})
+    profiles = profile_dataframe(df)
+
+    assert profiles["Value"].kind == "numeric"
+    assert profiles["Value"].nunique == pytest.approx(50_000, rel=0.05)
+    assert (profiles["Value"].min, profiles["Value"].max) == (0, 49_999)
+    assert profiles["Value"].quantiles[0.5] == pytest.approx(25_000, rel=0.05)
+    assert profiles["Code"].kind == "text"
+    assert profiles["Code"].nunique == pytest.approx(50_000, rel=0.05)
+
+    spec = FilterSpec().contains("Code", "c123")
+    assert build_mask(df, spec).sum() == 111
+
+def test_sample_nunique():
+    rng = np.random.default_rng(0)
+    unique = pd.Series([f"id{i}" for i in range(200_000)])
+    assert sample_nunique(sample_values(unique), len(unique)) == pytest.approx(200_000, rel=0.05)
+
+    repeated = pd.Series(rng.choice([f"shop{i}" for i in range(500)], 200_000))
+    assert sample_nunique(sample_values(repeated), len(repeated)) == pytest.approx(500, rel=0.1)
+
+    # サンプルが全行を含むときは正確な値
+    small = pd.Series(["a", "b", None, "a"])
+    assert sample_nunique(small, len(small)) == 2
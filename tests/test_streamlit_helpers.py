@@ -2,13 +2,14 @@ import sys
 import os
 import io
 
+import numpy as np
 import pytest
 import plotly.graph_objects as go
 import pandas as pd
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from streamlit_data_viz_helper.streamlit_helpers import download_chart_html, filter_dataframe, download_csv_jis, show_df_with_expander
+from streamlit_data_viz_helper.streamlit_helpers import download_chart_html, filter_dataframe, download_csv_jis, show_df_with_expander, paginate_dataframe
 
 @pytest.fixture
 def sample_plot():
@@ -75,4 +76,188 @@ def test_show_df_with_expander(sample_dataframe, mocker):
         mock_expander.assert_called_once_with("See data!", expanded=False)
         mock_dataframe.assert_called_once_with(sample_dataframe)
     except Exception as e:
-        pytest.fail(f"show_df_with_expander raised an exception: {e}")
\ No newline at end of file
+        pytest.fail(f"show_df_with_expander raised an exception: {e}")
+
+def test_filter_dataframe_app():
+    """Run filter_dataframe in a headless Streamlit app and filter a categorical column."""
+    from streamlit.testing.v1 import AppTest
+
+    def app():
+        import pandas as pd
+        import streamlit as st
+        from streamlit_data_viz_helper.streamlit_helpers import filter_dataframe
+
+        df = pd.DataFrame({
+            "Name": ["Alice", "Bob", "Charlie"],
+            "Age": [25, 30, 35],
+            "Joined": ["2024-01-01", "2024-02-01", "2024-03-01"],
+        })
+        st.session_state["result"] = filter_dataframe(df)
+
+    at = AppTest.from_function(app).run()
+    at.checkbox[0].check().run()
+    at.multiselect[0].select("Name").run()
+    at.multiselect[1].unselect("Bob").run()
+
+    result = at.session_state["result"]
+    assert list(result["Name"]) == ["Alice", "Charlie"]
+    assert pd.api.types.is_datetime64_any_dtype(result["Joined"])
+
+def test_download_csv_jis_is_lazy(mocker):
+    """download_csv_jis passes a callable so the CSV is only encoded on click."""
+    mock_button = mocker.patch("streamlit.download_button")
+    mock_encode = mocker.patch("streamlit_data_viz_helper.streamlit_helpers.dataframe_to_csv_bytes", return_value=b"csv")
+    df = pd.DataFrame({"名前": ["花子"]})
+
+    download_csv_jis(df, "test_file", compression="gzip")
+    mock_encode.assert_not_called()
+
+    kwargs = mock_button.call_args.kwargs
+    assert kwargs["file_name"] == "test_file.csv.gz"
+    assert kwargs["mime"] == "application/gzip"
+    assert kwargs["data"]() == b"csv"
+    mock_encode.assert_called_once()
+
+def test_paginate_dataframe():
+    """Test paginate_dataframe with and without sorting."""
+    df = pd.DataFrame({"Name": list("ABCDEFG"), "Score": [5, 3, None, 7, 1, 6, 2]}, index=list("abcdefg"))
+
+    assert list(paginate_dataframe(df, 2, 3)["Name"]) == ["D", "E", "F"]
+    assert list(paginate_dataframe(df, 3, 3)["Name"]) == ["G"]
+    assert list(paginate_dataframe(df, 1, 3, sort_by="Score")["Name"]) == ["E", "G", "B"]
+    assert list(paginate_dataframe(df, 3, 3, sort_by="Score", ascending=False)["Name"]) == ["C"]
+
+def test_paginate_dataframe_detects_changes_to_any_row():
+    """A frame differing in a single row gets its own sort order."""
+    a = pd.DataFrame({"x": np.arange(10_000, dtype=float)})
+    b = a.copy()
+    b.loc[1, "x"] = -5.0
+    assert list(paginate_dataframe(a, 1, 3, sort_by="x")["x"]) == [0.0, 1.0, 2.0]
+    assert list(paginate_dataframe(b, 1, 3, sort_by="x")["x"]) == [-5.0, 0.0, 2.0]
+
+def test_show_df_with_expander_paged():
+    """Only the current page is sent to the browser when page_size is set."""
+    from streamlit.testing.v1 import AppTest
+
+    def app():
+        import pandas as pd
+        from streamlit_data_viz_helper.streamlit_helpers import show_df_with_expander
+
+        df = pd.DataFrame({"Value": range(250)})
+        show_df_with_expander(df, title="paged", expanded=True, page_size=100)
+
+    at = AppTest.from_function(app).run()
+    assert len(at.dataframe[0].value) == 100
+    assert "250 rows" in at.caption[0].value
+
+    at.number_input(key="page_paged").set_value(3).run()
+    assert list(at.dataframe[0].value["Value"]) == list(range(200, 250))
+
+    at.selectbox(key="sort_by_paged").select("Value").run()
+    at.toggle(key="ascending_paged").set_value(False).run()
+    assert list(at.dataframe[0].value["Value"]) == list(range(49, -1, -1))
+
+def test_show_instrumentation_panel():
+    """The sidebar panel lists the calls recorded during the rerun."""
+    from streamlit.testing.v1 import AppTest
+
+    def app():
+        import pandas as pd
+        from streamlit_data_viz_helper.instrumentation import record
+        from streamlit_data_viz_helper.streamlit_helpers import paginate_dataframe, show_instrumentation_panel
+
+        with record() as recorder:
+            paginate_dataframe(pd.DataFrame({"Value": range(50)}), page=1, page_size=10)
+        show_instrumentation_panel(recorder, expanded=True)
+
+    at = AppTest.from_function(app).run()
+    assert at.sidebar.metric[0].label == "Instrumented time"
+    assert list(at.sidebar.dataframe[0].value["name"]) == ["streamlit_helpers.paginate_dataframe"]
+
+def test_show_load_progress(tmp_path):
+    """A running load shows a progress bar and the partial rows; a finished one returns the result."""
+    from streamlit.testing.v1 import AppTest
+
+    (tmp_path / "a.csv").write_text("City,Sales\nTokyo,1\nOsaka,2\n", encoding="utf-8")
+
+    def app(folder_path):
+        import streamlit as st
+        from streamlit_data_viz_helper.background import start_folder_load
+        from streamlit_data_viz_helper.streamlit_helpers import show_load_progress
+
+        job = start_folder_load(folder_path)
+        job.result(timeout=10)
+        df = show_load_progress(job)
+        st.write(f"{len(df)} rows")
+
+    at = AppTest.from_function(app, args=(str(tmp_path),)).run()
+    assert not at.exception
+    assert at.markdown[0].value == "2 rows"
+
+    def running_app(folder_path):
+        import threading
+        import streamlit as st
+        from streamlit_data_viz_helper import background
+        from streamlit_data_viz_helper.streamlit_helpers import show_load_progress
+
+        job = background.LoadJob("test", "folder", folder_path)
+        job.files_total, job.files_done = 4, 1
+        job._combine = lambda parts: parts[0]
+        job._parts = [background.pd.DataFrame({"City": ["Tokyo"]})]
+        job._future = background._executor().submit(threading.Event().wait, 0)
+        df = show_load_progress(job, render=lambda partial: st.write(f"{len(partial)} rows so far"), poll_interval=60)
+        st.write(df["City"].tolist())
+
+    at = AppTest.from_function(running_app, args=(str(tmp_path),)).run()
+    assert not at.exception
+    assert "1/4 files" in at.get("progress")[0].proto.text
+    assert at.markdown[0].value == "1 rows so far"
+
+def test_load_shared_dataframe(tmp_path):
+    """Sessions and reruns share one loaded dataset from the registry."""
+    from streamlit.testing.v1 import AppTest
+    from streamlit_data_viz_helper.registry import dataset_registry
+
+    file_path = tmp_path / "sales.csv"
+    file_path.write_text("City,Sales\nTokyo,1\nOsaka,2\n", encoding="utf-8")
+
+    def app(file_path):
+        import streamlit as st
+        from streamlit_data_viz_helper.data_processing import load_csv_to_dataframe
+        from streamlit_data_viz_helper.streamlit_helpers import load_shared_dataframe
+
+        df = load_shared_dataframe(load_csv_to_dataframe, file_path)
+        st.write(f"{len(df)} rows")
+
+    dataset_registry.clear()
+    first = AppTest.from_function(app, args=(str(file_path),)).run()
+    first.run()
+    second = AppTest.from_function(app, args=(str(file_path),)).run()
+    assert second.markdown[0].value == "2 rows"
+    stats = dataset_registry.stats()
+    assert (stats["misses"], stats["hits"]) == (1, 1)
+    assert stats["in_use"] == 1
+
+def test_filter_dataset(tmp_path):
+    """Filters built from the dataset profiles are run as a DuckDB query."""
+    pytest.importorskip("duckdb")
+    from streamlit.testing.v1 import AppTest
+
+    (tmp_path / "sales.csv").write_text("City,Sales\nTokyo,1\nOsaka,2\nTokyo,3\n", encoding="utf-8")
+
+    def app(folder_path):
+        import streamlit as st
+        from streamlit_data_viz_helper.dataset import FolderDataset
+        from streamlit_data_viz_helper.streamlit_helpers import filter_dataset
+
+        with FolderDataset(folder_path) as dataset:
+            df, spec = filter_dataset(dataset, limit=10, return_spec=True)
+            st.write(f"{len(df)} rows, {dataset.count(spec)} matching")
+
+    at = AppTest.from_function(app, args=(str(tmp_path),)).run()
+    assert at.markdown[0].value == "3 rows, 3 matching"
+
+    at.checkbox[0].check().run()
+    at.multiselect[0].select("City").run()
+    at.multiselect[1].unselect("Osaka").run()
+    assert at.markdown[0].value == "2 rows, 2 matching"
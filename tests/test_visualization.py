@@ -1,12 +1,14 @@
 import sys
 import os
+import json
 
+import numpy as np
 import pytest
 import pandas as pd
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from streamlit_data_viz_helper.visualization import create_scatter_plot, create_bar_chart, create_line_chart, create_histogram
+from streamlit_data_viz_helper.visualization import create_scatter_plot, create_bar_chart, create_line_chart, create_histogram, create_histogram_from_bins, figure_cache, FigureCache
 
 def test_create_scatter_plot():
     # Create a sample DataFrame
@@ -95,3 +97,118 @@ def test_create_histogram():
     title = "Test Histogram"
     fig_with_title = create_histogram(df, x="x", title=title)
     assert fig_with_title.layout.title.text == title
+
+def test_create_plots_with_max_points():
+    df = pd.DataFrame({
+        "x": pd.date_range("2024-01-01", periods=20_000, freq="min"),
+        "y": range(20_000),
+        "category": ["A", "B"] * 10_000,
+    })
+
+    fig = create_line_chart(df, x="x", y="y", legend="category", max_points=1000)
+    assert sum(len(trace.x) for trace in fig.data) <= 1000
+    assert set(trace.name for trace in fig.data) == {"A", "B"}
+
+    fig = create_scatter_plot(df, x="x", y="y", max_points=500, reduction="density")
+    assert len(fig.data[0].x) <= 500
+
+    with pytest.raises(ValueError):
+        create_scatter_plot(df, x="x", y="y", max_points=500, reduction="unknown")
+
+def test_render_mode_selection():
+    small = pd.DataFrame({"x": range(10), "y": range(10)})
+    large = pd.DataFrame({"x": range(2000), "y": range(2000)})
+
+    assert create_scatter_plot(small, x="x", y="y").data[0].type == "scatter"
+    assert create_scatter_plot(large, x="x", y="y").data[0].type == "scattergl"
+    assert create_line_chart(large, x="x", y="y", webgl_threshold=5000).data[0].type == "scatter"
+    assert create_line_chart(small, x="x", y="y", render_mode="webgl").data[0].type == "scattergl"
+
+    with pytest.raises(ValueError):
+        create_scatter_plot(small, x="x", y="y", render_mode="canvas")
+
+def test_create_bar_chart_aggregate():
+    df = pd.DataFrame({
+        "x": ["A", "B", "A", "B", "C"],
+        "y": [1, 2, 3, 4, 5],
+        "category": ["P", "P", "Q", "Q", "Q"],
+    })
+
+    fig = create_bar_chart(df, x="x", y="y", aggregate="sum")
+    assert list(fig.data[0].x) == ["A", "B", "C"]
+    assert list(fig.data[0].y) == [4, 6, 5]
+
+    fig_with_legend = create_bar_chart(df, x="x", y="y", legend="category", aggregate="mean")
+    assert {trace.name: list(trace.y) for trace in fig_with_legend.data} == {"P": [1, 2], "Q": [3, 4, 5]}
+
+    with pytest.raises(ValueError):
+        create_bar_chart(df, x="x", y="y", aggregate="mode")
+
+def test_create_histogram_aggregate():
+    df = pd.DataFrame({
+        "value": [0.5, 1.5, 1.7, 2.5, 2.6, 2.9],
+        "count": [1, 2, 2, 3, 3, 3],
+        "label": ["a", "b", "b", "c", "c", "c"],
+    })
+
+    fig = create_histogram(df, x="value", nbins=3, aggregate=True)
+    assert fig.data[0].type == "bar"
+    assert list(fig.data[0].y) == [1, 2, 3]
+
+    # Small integer ranges are counted with one bar per value
+    fig = create_histogram(df, x="count", aggregate=True)
+    assert list(fig.data[0].x) == [1, 2, 3]
+    assert list(fig.data[0].y) == [1, 2, 3]
+
+    fig = create_histogram(df, x="label", aggregate=True)
+    assert dict(zip(fig.data[0].x, fig.data[0].y)) == {"a": 1, "b": 2, "c": 3}
+
+    # int8 columns, as produced by optimize_dtypes, must not overflow
+    small = pd.DataFrame({"t": np.arange(-90, 91, dtype=np.int8)})
+    fig = create_histogram(small, x="t", aggregate=True)
+    assert list(fig.data[0].x) == list(range(-90, 91))
+    assert set(fig.data[0].y) == {1}
+    wide = pd.DataFrame({"t": np.arange(-100, 101, dtype=np.int8)})
+    fig = create_histogram(wide, x="t", aggregate=True)
+    assert sum(fig.data[0].y) == 201
+
+def test_create_histogram_from_bins():
+    bins = pd.DataFrame({"value": [1.0, 3.0], "count": [4, 6]})
+    fig = create_histogram_from_bins(bins, "value", widths=[2.0, 2.0], title="Bins")
+    assert fig.data[0].type == "bar"
+    assert list(fig.data[0].y) == [4, 6]
+    assert list(fig.data[0].width) == [2.0, 2.0]
+    assert fig.layout.title.text == "Bins"
+
+def test_figure_cache():
+    df = pd.DataFrame({"x": [1, 2, 3], "y": [4, 5, 6], "unused": ["a", "b", "c"]})
+    figure_cache.clear()
+
+    fig = create_line_chart(df, x="x", y="y", title="Cached", use_cache=True)
+    cached = create_line_chart(df.assign(unused="z"), x="x", y="y", title="Cached", use_cache=True)
+    assert figure_cache.stats()["hits"] == 1
+    assert cached is not fig
+    assert json.loads(cached.to_json()) == json.loads(fig.to_json())
+
+    # Mutating a returned figure does not affect the cache
+    cached.update_layout(title="Changed")
+    assert create_line_chart(df, x="x", y="y", title="Cached", use_cache=True).layout.title.text == "Cached"
+
+    # Different data or arguments miss
+    create_line_chart(df.assign(y=[4, 5, 7]), x="x", y="y", title="Cached", use_cache=True)
+    create_line_chart(df, x="x", y="y", title="Other", use_cache=True)
+    create_histogram(df, x="x", use_cache=True)
+    assert figure_cache.stats()["misses"] == 4
+
+    # Without use_cache the cache is not consulted
+    create_line_chart(df, x="x", y="y", title="Cached")
+    assert figure_cache.stats()["hits"] == 2
+
+def test_figure_cache_eviction():
+    cache = FigureCache(max_bytes=40)  # room for one figure with two int64 arrays of length 2
+    small = create_line_chart(pd.DataFrame({"x": [1, 2], "y": [3, 4]}), x="x", y="y")
+    cache.put("a", small)
+    cache.put("b", small)
+    assert cache.stats()["entries"] == 1
+    assert cache.get("a") is None
+    assert cache.get("b") is not None